@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Conversation, Message, ConversationMetadata
+from .models import Conversation, Message, ConversationMetadata, Device, TelemetrySample
 
 
 class MessageInline(admin.TabularInline):
@@ -44,3 +44,17 @@ class ConversationMetadataAdmin(admin.ModelAdmin):
     list_display = ['conversation', 'total_messages', 'total_tokens', 'resolution_status']
     list_filter = ['resolution_status', 'issue_category']
     search_fields = ['conversation__title']
+
+
+@admin.register(Device)
+class DeviceAdmin(admin.ModelAdmin):
+    list_display = ['device_id', 'hostname', 'platform', 'agent_version', 'last_seen']
+    search_fields = ['device_id', 'hostname']
+    readonly_fields = ['first_seen', 'last_seen']
+
+
+@admin.register(TelemetrySample)
+class TelemetrySampleAdmin(admin.ModelAdmin):
+    list_display = ['device', 'collected_at', 'received_at']
+    list_filter = ['device']
+    readonly_fields = ['received_at']
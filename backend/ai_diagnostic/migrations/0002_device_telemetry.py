@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_diagnostic', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Device',
+            fields=[
+                ('device_id', models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ('hostname', models.CharField(blank=True, max_length=255)),
+                ('platform', models.CharField(blank=True, max_length=255)),
+                ('agent_version', models.CharField(blank=True, max_length=50)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-last_seen'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TelemetrySample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collected_at', models.DateTimeField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField()),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='samples', to='ai_diagnostic.device')),
+            ],
+            options={
+                'ordering': ['-collected_at'],
+                'indexes': [models.Index(fields=['device', '-collected_at'], name='ai_diagnost_device__57aafe_idx')],
+            },
+        ),
+    ]
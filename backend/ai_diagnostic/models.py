@@ -80,3 +80,40 @@ class ConversationMetadata(models.Model):
     
     def __str__(self):
         return f"Metadata for {self.conversation.title}"
+
+
+class Device(models.Model):
+    """A remote machine that pushes telemetry through the agent"""
+    device_id = models.CharField(max_length=200, primary_key=True)
+    hostname = models.CharField(max_length=255, blank=True)
+    platform = models.CharField(max_length=255, blank=True)
+    agent_version = models.CharField(max_length=50, blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-last_seen']
+    
+    def __str__(self):
+        return f"{self.device_id} ({self.hostname})"
+
+
+class TelemetrySample(models.Model):
+    """One telemetry snapshot collected on a remote device"""
+    device = models.ForeignKey(
+        Device,
+        on_delete=models.CASCADE,
+        related_name='samples'
+    )
+    collected_at = models.DateTimeField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField()
+    
+    class Meta:
+        ordering = ['-collected_at']
+        indexes = [
+            models.Index(fields=['device', '-collected_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.device_id} @ {self.collected_at.strftime('%Y-%m-%d %H:%M:%S')}"
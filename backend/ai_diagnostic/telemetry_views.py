@@ -0,0 +1,202 @@
+"""
+Remote telemetry ingestion
+
+Devices running telemetry_agent.py push gzip-compressed JSON or CBOR
+batches of samples here; predict can then diagnose a device from its most recent sample
+instead of collecting telemetry on the server.
+"""
+
+import hmac
+import json
+import os
+import zlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+
+from pc_diagnostic.telemetry_codec import CBOR_MEDIA_TYPE, decode_cbor, decompress
+
+from .models import Device, TelemetrySample
+
+# Decompressed size limit for one batch (guards against gzip bombs)
+MAX_BATCH_BYTES = int(os.getenv("TELEMETRY_INGEST_MAX_BYTES", str(20 * 1024 * 1024)))
+# Samples kept per device; older ones are pruned on ingest
+MAX_SAMPLES_PER_DEVICE = int(os.getenv("TELEMETRY_INGEST_MAX_SAMPLES", "500"))
+DEVICE_ID_MAX_LENGTH = Device._meta.get_field('device_id').max_length
+
+
+def _parse_collected_at(value):
+    """Sample timestamps are epoch seconds or ISO 8601 strings"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+        except (OverflowError, OSError):
+            raise ValueError(f"collected_at out of range: {value!r}")
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value)
+        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+    raise ValueError(f"Invalid collected_at: {value!r}")
+
+
+def _ingest_open():
+    """Whether agents may push without a token (explicit opt-in, for trusted networks only)"""
+    return os.getenv("TELEMETRY_INGEST_ALLOW_OPEN", "false").lower() in ("1", "true", "yes")
+
+
+def _authorized(request):
+    token = os.getenv("TELEMETRY_INGEST_TOKEN")
+    if not token:
+        return _ingest_open()
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    return hmac.compare_digest(header, f"Bearer {token}")
+
+
+def _auth_error(request):
+    """Error response for requests without a valid agent token, or None if authorized"""
+    if not os.getenv("TELEMETRY_INGEST_TOKEN") and not _ingest_open():
+        return Response({
+            'success': False,
+            'error': 'Telemetry ingestion is disabled: set TELEMETRY_INGEST_TOKEN on the server'
+        }, status=status.HTTP_403_FORBIDDEN)
+    if not _authorized(request):
+        return Response({
+            'success': False,
+            'error': 'Invalid or missing agent token'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    return None
+
+
+def latest_device_telemetry(device_id):
+    """Most recent pushed sample for a device as (telemetry dict, collected_at), or None"""
+    sample = TelemetrySample.objects.filter(device_id=device_id).order_by('-collected_at').first()
+    if sample is None:
+        return None
+    return sample.data, sample.collected_at
+
+
+@api_view(['POST'])
+def ingest_telemetry(request):
+    """
+    Store a batch of telemetry samples pushed by a device agent
+
+    Headers:
+        Content-Encoding: gzip (or deflate / identity)
+        Content-Type: application/json or application/cbor
+        Authorization: Bearer <TELEMETRY_INGEST_TOKEN>  // Required unless TELEMETRY_INGEST_ALLOW_OPEN=true
+
+    Request Body (JSON or CBOR, usually gzip-compressed):
+        {
+            "device_id": "workstation-042",
+            "hostname": "WS-042",
+            "platform": "Windows-10-10.0.19045-SP0",
+            "agent_version": "1.0",
+            "samples": [
+                {"collected_at": 1730000000.0, "telemetry": {...}},
+                ...
+            ]
+        }
+    """
+    auth_error = _auth_error(request)
+    if auth_error is not None:
+        return auth_error
+
+    try:
+        raw = decompress(request.body, request.META.get('HTTP_CONTENT_ENCODING', ''), MAX_BATCH_BYTES)
+        if request.content_type == CBOR_MEDIA_TYPE:
+            batch = decode_cbor(raw)
+        else:
+            batch = json.loads(raw)
+        if not isinstance(batch, dict):
+            raise ValueError("Batch must be an object")
+        device_id = str(batch.get('device_id') or '').strip()
+        samples = batch.get('samples')
+        if not device_id or not isinstance(samples, list):
+            raise ValueError("Batch needs a device_id and a samples list")
+        if len(device_id) > DEVICE_ID_MAX_LENGTH:
+            raise ValueError(f"device_id is longer than {DEVICE_ID_MAX_LENGTH} characters")
+        rows = []
+        for sample in samples:
+            if not isinstance(sample, dict) or not isinstance(sample.get('telemetry'), dict):
+                raise ValueError("Each sample needs a telemetry object")
+            rows.append((_parse_collected_at(sample['collected_at']), sample['telemetry']))
+    except (ValueError, KeyError, TypeError, zlib.error) as e:
+        return Response({
+            'success': False,
+            'error': f'Invalid telemetry batch: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        with transaction.atomic():
+            device, _ = Device.objects.get_or_create(device_id=device_id)
+            # Descriptive fields are cut to their column size rather than rejecting the batch
+            for field in ('hostname', 'platform', 'agent_version'):
+                value = str(batch.get(field, getattr(device, field)) or '')
+                setattr(device, field, value[:Device._meta.get_field(field).max_length])
+            device.last_seen = timezone.now()
+            device.save()
+
+            TelemetrySample.objects.bulk_create([
+                TelemetrySample(device=device, collected_at=collected_at, data=telemetry)
+                for collected_at, telemetry in rows
+            ])
+
+            # Keep only the newest MAX_SAMPLES_PER_DEVICE samples (by key, so samples
+            # sharing the cutoff timestamp are not all deleted with it)
+            stale = list(TelemetrySample.objects.filter(device=device)
+                         .order_by('-collected_at', '-pk')
+                         .values_list('pk', flat=True)[MAX_SAMPLES_PER_DEVICE:])
+            if stale:
+                TelemetrySample.objects.filter(pk__in=stale).delete()
+
+        return Response({
+            'success': True,
+            'device_id': device_id,
+            'accepted': len(rows)
+        })
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': f'Failed to store telemetry: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def list_devices(request):
+    """
+    List devices that have pushed telemetry, most recently seen first
+
+    Headers:
+        Authorization: Bearer <TELEMETRY_INGEST_TOKEN>  // Same rules as ingestion
+    """
+    auth_error = _auth_error(request)
+    if auth_error is not None:
+        return auth_error
+
+    try:
+        devices = Device.objects.annotate(sample_count=Count('samples'))
+        return Response({
+            'success': True,
+            'devices': [
+                {
+                    'device_id': device.device_id,
+                    'hostname': device.hostname,
+                    'platform': device.platform,
+                    'agent_version': device.agent_version,
+                    'first_seen': device.first_seen,
+                    'last_seen': device.last_seen,
+                    'sample_count': device.sample_count,
+                }
+                for device in devices
+            ]
+        })
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -9,8 +9,22 @@ import re
 from typing import Dict, List, Optional
 import logging
 
+from pc_diagnostic.keyword_classifier import KeywordClassifier
+
 logger = logging.getLogger(__name__)
 
+# Task keywords per specialist category (declaration order = routing order)
+TASK_CLASSIFIER = KeywordClassifier({
+    'thermal': ['cpu', 'thermal', 'temperature*', 'overheat*', 'cooling'],
+    'disk': ['disk', 'storage', 'drive', 'ssd', 'hdd', 'partition'],
+    'event_log': ['event', 'log', 'logging', 'error message', 'crash*', 'blue screen', 'bsod'],
+    'system_files': ['system file', 'sfc', 'corrupt*', 'integrity', 'dism'],
+    'power': ['power', 'battery', 'batteries', 'sleep', 'hibernat*', 'energy'],
+    'network': ['network*', 'internet', 'wifi', 'ethernet', 'connect*'],
+    'memory': ['memory', 'ram', 'virtual memory', 'page file', 'pagefile'],
+    'gpu': ['gpu', 'graphics', 'video', 'display', 'monitor', 'screen'],
+}, default='general')
+
 
 class MCPTaskParser:
     """Parser for extracting MCP tasks from model output"""
@@ -100,65 +114,11 @@ class MCPTaskParser:
         Returns:
             Dictionary mapping categories to task lists
         """
-        categories = {
-            'thermal': [],
-            'disk': [],
-            'event_log': [],
-            'system_files': [],
-            'power': [],
-            'network': [],
-            'memory': [],
-            'gpu': [],
-            'general': []
-        }
+        categories = {category: [] for category in TASK_CLASSIFIER.categories + ['general']}
         
         for task in tasks:
-            task_lower = task.lower()
-            categorized = False
-            
-            # Thermal/CPU
-            if any(word in task_lower for word in ['cpu', 'thermal', 'temperature', 'overheat', 'cooling']):
-                categories['thermal'].append(task)
-                categorized = True
-            
-            # Disk/Storage
-            if any(word in task_lower for word in ['disk', 'storage', 'drive', 'ssd', 'hdd', 'partition']):
-                categories['disk'].append(task)
-                categorized = True
-            
-            # Event Logs
-            if any(word in task_lower for word in ['event', 'log', 'error message', 'crash', 'blue screen', 'bsod']):
-                categories['event_log'].append(task)
-                categorized = True
-            
-            # System Files
-            if any(word in task_lower for word in ['system file', 'sfc', 'corruption', 'integrity', 'dism']):
-                categories['system_files'].append(task)
-                categorized = True
-            
-            # Power Management
-            if any(word in task_lower for word in ['power', 'battery', 'sleep', 'hibernation', 'energy']):
-                categories['power'].append(task)
-                categorized = True
-            
-            # Network
-            if any(word in task_lower for word in ['network', 'internet', 'wifi', 'ethernet', 'connection']):
-                categories['network'].append(task)
-                categorized = True
-            
-            # Memory
-            if any(word in task_lower for word in ['memory', 'ram', 'virtual memory', 'page file']):
-                categories['memory'].append(task)
-                categorized = True
-            
-            # GPU
-            if any(word in task_lower for word in ['gpu', 'graphics', 'video', 'display', 'monitor', 'screen']):
-                categories['gpu'].append(task)
-                categorized = True
-            
-            # If not categorized, add to general
-            if not categorized:
-                categories['general'].append(task)
+            for category in TASK_CLASSIFIER.classify(task):
+                categories[category].append(task)
         
         # Remove empty categories
         categories = {k: v for k, v in categories.items() if v}
@@ -10,6 +10,8 @@ import platform
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 
+from pc_diagnostic import shell_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,8 +42,8 @@ class EventLogAnalyzer:
             
             # Get System errors (last 50)
             try:
-                cmd = 'powershell -Command "Get-EventLog -LogName System -Newest 50 -EntryType Error | Select-Object TimeGenerated, Source, EventID, Message | ConvertTo-Json"'
-                output = subprocess.check_output(cmd, shell=True, text=True, timeout=30)
+                cmd = 'Get-EventLog -LogName System -Newest 50 -EntryType Error | Select-Object TimeGenerated, Source, EventID, Message | ConvertTo-Json'
+                output = shell_pool.check_output(cmd, timeout=30, shell="powershell")
                 
                 import json
                 system_errors = json.loads(output) if output.strip() else []
@@ -59,8 +61,8 @@ class EventLogAnalyzer:
             
             # Get Application errors (last 50)
             try:
-                cmd = 'powershell -Command "Get-EventLog -LogName Application -Newest 50 -EntryType Error | Select-Object TimeGenerated, Source, EventID, Message | ConvertTo-Json"'
-                output = subprocess.check_output(cmd, shell=True, text=True, timeout=30)
+                cmd = 'Get-EventLog -LogName Application -Newest 50 -EntryType Error | Select-Object TimeGenerated, Source, EventID, Message | ConvertTo-Json'
+                output = shell_pool.check_output(cmd, timeout=30, shell="powershell")
                 
                 import json
                 app_errors = json.loads(output) if output.strip() else []
@@ -78,8 +80,8 @@ class EventLogAnalyzer:
             
             # Look for critical events (BSOD, crashes)
             try:
-                cmd = 'powershell -Command "Get-EventLog -LogName System -Newest 100 | Where-Object {$_.EventID -in @(41, 1001, 6008)} | Select-Object TimeGenerated, Source, EventID, Message | ConvertTo-Json"'
-                output = subprocess.check_output(cmd, shell=True, text=True, timeout=30)
+                cmd = 'Get-EventLog -LogName System -Newest 100 | Where-Object {$_.EventID -in @(41, 1001, 6008)} | Select-Object TimeGenerated, Source, EventID, Message | ConvertTo-Json'
+                output = shell_pool.check_output(cmd, timeout=30, shell="powershell")
                 
                 import json
                 critical_events = json.loads(output) if output.strip() else []
@@ -159,8 +161,8 @@ class EventLogAnalyzer:
             matches = []
             for keyword in keywords:
                 try:
-                    cmd = f'powershell -Command "Get-EventLog -LogName System -After \\"{start_time_str}\\" | Where-Object {{$_.Message -like \\"*{keyword}*\\"}} | Select-Object TimeGenerated, Source, EventID, EntryType, Message | ConvertTo-Json"'
-                    output = subprocess.check_output(cmd, shell=True, text=True, timeout=30)
+                    cmd = f'Get-EventLog -LogName System -After "{start_time_str}" | Where-Object {{$_.Message -like "*{keyword}*"}} | Select-Object TimeGenerated, Source, EventID, EntryType, Message | ConvertTo-Json'
+                    output = shell_pool.check_output(cmd, timeout=30, shell="powershell")
                     
                     if output.strip():
                         import json
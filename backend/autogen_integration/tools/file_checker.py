@@ -10,6 +10,8 @@ import platform
 import os
 from typing import Dict, Any
 
+from pc_diagnostic import shell_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,7 +69,7 @@ class SystemFileChecker:
                 # Full scan: sfc /scannow
                 # Verify only: sfc /verifyonly
                 cmd = "sfc /verifyonly"
-                output = subprocess.check_output(cmd, shell=True, text=True, timeout=600)  # 10 minute timeout
+                output = shell_pool.check_output(cmd, timeout=600, shell=shell_pool.SYSTEM_SHELL)  # 10 minute timeout
                 
                 result["data"]["scan_output"] = output
                 
@@ -150,7 +152,7 @@ class SystemFileChecker:
             # Run DISM CheckHealth (quick check)
             try:
                 cmd = "DISM /Online /Cleanup-Image /CheckHealth"
-                output = subprocess.check_output(cmd, shell=True, text=True, timeout=120)
+                output = shell_pool.check_output(cmd, timeout=120, shell=shell_pool.SYSTEM_SHELL)
                 
                 result["data"]["check_output"] = output
                 
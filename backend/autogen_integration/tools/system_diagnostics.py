@@ -11,6 +11,11 @@ import logging
 from typing import Dict, Any, List
 import platform
 
+from pc_diagnostic.cpu_sampler import get_cpu_sampler
+from pc_diagnostic.process_table import get_process_table
+from pc_diagnostic.rate_engine import get_rate_engine
+from pc_diagnostic import shell_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,26 +37,26 @@ class SystemDiagnostics:
                 "data": {}
             }
             
-            # Get CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1, percpu=True)
-            cpu_freq = psutil.cpu_freq(percpu=False)
+            # Get CPU usage from the shared sampling window (reused if recent)
+            cpu_stats = get_cpu_sampler().sample()
             
-            result["data"]["cpu_usage_per_core"] = cpu_percent
-            result["data"]["cpu_usage_average"] = sum(cpu_percent) / len(cpu_percent)
-            result["data"]["cpu_count"] = psutil.cpu_count()
+            result["data"]["cpu_usage_per_core"] = cpu_stats["usage_per_core"]
+            result["data"]["cpu_usage_average"] = cpu_stats["total_usage"]
+            result["data"]["cpu_usage_window"] = cpu_stats["window_stats"]
+            result["data"]["cpu_count"] = cpu_stats["total_cores"]
             
-            if cpu_freq:
+            if "current_frequency" in cpu_stats:
                 result["data"]["cpu_frequency_mhz"] = {
-                    "current": cpu_freq.current,
-                    "min": cpu_freq.min,
-                    "max": cpu_freq.max
+                    "current": cpu_stats["current_frequency"],
+                    "min": cpu_stats["min_frequency"],
+                    "max": cpu_stats["max_frequency"]
                 }
             
             # Try to get temperature using WMI (Windows)
             if platform.system() == "Windows":
                 try:
                     cmd = 'wmic /namespace:\\\\root\\wmi PATH MSAcpi_ThermalZoneTemperature get CurrentTemperature'
-                    output = subprocess.check_output(cmd, shell=True, text=True, timeout=10)
+                    output = shell_pool.check_output(cmd, timeout=10, shell=shell_pool.SYSTEM_SHELL)
                     
                     # Parse temperature (in tenths of Kelvin)
                     temps = []
@@ -129,37 +134,19 @@ class SystemDiagnostics:
             
             result["data"]["partitions"] = disk_info
             
-            # Get disk I/O statistics
-            disk_io = psutil.disk_io_counters()
-            if disk_io:
-                result["data"]["disk_io"] = {
-                    "read_count": disk_io.read_count,
-                    "write_count": disk_io.write_count,
-                    "read_bytes": disk_io.read_bytes,
-                    "write_bytes": disk_io.write_bytes,
-                    "read_time_ms": disk_io.read_time,
-                    "write_time_ms": disk_io.write_time
-                }
+            # Get current per-disk I/O rates (throughput, IOPS, latency)
+            result["data"]["disk_io"] = get_rate_engine().disk()
             
-            # Get top processes by disk I/O (requires elevated permissions)
+            # Get top processes by current disk I/O rate (requires elevated permissions)
             try:
-                processes = []
-                for proc in psutil.process_iter(['pid', 'name', 'io_counters']):
-                    try:
-                        io = proc.info['io_counters']
-                        if io:
-                            processes.append({
-                                "pid": proc.info['pid'],
-                                "name": proc.info['name'],
-                                "read_bytes": io.read_bytes,
-                                "write_bytes": io.write_bytes
-                            })
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
-                
-                # Sort by total I/O
-                processes.sort(key=lambda x: x['read_bytes'] + x['write_bytes'], reverse=True)
-                result["data"]["top_disk_processes"] = processes[:10]
+                result["data"]["top_disk_processes"] = [
+                    {
+                        "pid": proc["pid"],
+                        "name": proc["name"],
+                        "io_bytes_per_sec": proc["io_bytes_per_sec"]
+                    }
+                    for proc in get_process_table().top("io", 10)
+                ]
                 
             except Exception as e:
                 result["data"]["process_note"] = f"Process I/O data requires admin: {str(e)}"
@@ -212,7 +199,7 @@ class SystemDiagnostics:
             # Get active power scheme
             try:
                 cmd = "powercfg /getactivescheme"
-                output = subprocess.check_output(cmd, shell=True, text=True, timeout=10)
+                output = shell_pool.check_output(cmd, timeout=10, shell=shell_pool.SYSTEM_SHELL)
                 result["data"]["active_scheme"] = output.strip()
                 
                 # Parse scheme GUID
@@ -229,7 +216,7 @@ class SystemDiagnostics:
             # Get power scheme list
             try:
                 cmd = "powercfg /list"
-                output = subprocess.check_output(cmd, shell=True, text=True, timeout=10)
+                output = shell_pool.check_output(cmd, timeout=10, shell=shell_pool.SYSTEM_SHELL)
                 result["data"]["available_schemes"] = output.strip()
             except Exception as e:
                 result["data"]["list_note"] = f"Could not list schemes: {str(e)}"
@@ -298,20 +285,15 @@ class SystemDiagnostics:
             }
             
             # Get top memory-consuming processes
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'memory_info', 'memory_percent']):
-                try:
-                    processes.append({
-                        "pid": proc.info['pid'],
-                        "name": proc.info['name'],
-                        "memory_mb": round(proc.info['memory_info'].rss / (1024**2), 2),
-                        "memory_percent": round(proc.info['memory_percent'], 2)
-                    })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            processes.sort(key=lambda x: x['memory_mb'], reverse=True)
-            result["data"]["top_memory_processes"] = processes[:10]
+            result["data"]["top_memory_processes"] = [
+                {
+                    "pid": proc["pid"],
+                    "name": proc["name"],
+                    "memory_mb": proc["memory_mb"],
+                    "memory_percent": proc["memory_percent"]
+                }
+                for proc in get_process_table().top("memory", 10)
+            ]
             
             # Analysis
             if vm.percent > 90:
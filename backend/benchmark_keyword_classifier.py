@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: keyword classifier vs. the old substring scans
+
+Compares HardwareMonitor's issue typing done with nested any(keyword in text)
+scans against the single-pass KeywordClassifier, and lists the inputs
+where the substring scans reported a false match (e.g. "ram" in "program").
+
+Usage: python benchmark_keyword_classifier.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.keyword_classifier import KeywordClassifier
+
+# The keyword table identify_issue_type used to scan with substring checks
+LEGACY_ISSUE_TYPES = {
+    'display': ['screen', 'display', 'monitor', 'flicker', 'black screen', 'graphics', 'video', 'visual', 'resolution', 'brightness'],
+    'performance': ['slow', 'lag', 'freeze', 'hang', 'performance', 'speed', 'fast', 'cpu', 'memory', 'ram'],
+    'network': ['wifi', 'internet', 'network', 'connection', 'ethernet', 'connect', 'online', 'download', 'upload'],
+    'audio': ['sound', 'audio', 'speaker', 'microphone', 'headphone', 'music', 'volume', 'noise'],
+    'storage': ['disk', 'drive', 'storage', 'hard drive', 'ssd', 'hdd', 'space', 'file'],
+    'hardware': ['usb', 'port', 'device', 'keyboard', 'mouse', 'printer', 'hardware']
+}
+
+CLASSIFIER = KeywordClassifier({
+    'display': ['screen', 'display', 'monitor', 'flicker*', 'black screen', 'graphics', 'video', 'visual', 'resolution', 'brightness'],
+    'performance': ['slow*', 'lag', 'lagging', 'laggy', 'freez*', 'frozen', 'hang', 'hanging', 'hung', 'performance', 'speed', 'fast', 'cpu', 'memory', 'ram'],
+    'network': ['wifi', 'wi-fi', 'internet', 'network*', 'connect*', 'ethernet', 'online', 'download*', 'upload*'],
+    'audio': ['sound', 'audio', 'speaker', 'microphone', 'headphone', 'music', 'volume', 'noise', 'noisy'],
+    'storage': ['disk', 'drive', 'storage', 'hard drive', 'ssd', 'hdd', 'space', 'file'],
+    'hardware': ['usb', 'port', 'device', 'keyboard', 'mouse', 'mice', 'printer', 'hardware']
+}, default='general')
+
+SAMPLES = [
+    "My computer is very slow and programs freeze when I open Chrome",
+    "The screen flickers with green lines after the graphics driver update",
+    "Wi-Fi keeps dropping, the internet connection is unstable",
+    "No sound from the speakers but headphones work",
+    "The hard drive makes a clicking noise and files take forever to open",
+    "My USB keyboard is not recognised by Windows",
+    "The program crashes on startup, I already reinstalled it",
+    "I want to report that the brand new laptop overheats",
+    "Fragmented frames in every game, transport layer errors in the logs",
+    "Everything is fine, just checking",
+]
+
+
+def legacy_classify(text):
+    text = text.lower()
+    detected = [t for t, keywords in LEGACY_ISSUE_TYPES.items() if any(k in text for k in keywords)]
+    return detected or ['general']
+
+
+def main():
+    # Long inputs matter most: users paste logs into the description
+    long_text = " ".join(SAMPLES) * 20
+    # Worst case for the any() scans: no keyword anywhere, so nothing exits early
+    no_match_text = "the quick brown fox jumps over the lazy dog again and again " * 200
+    number = 2000
+
+    print("=" * 60)
+    print("⏱️  Keyword classifier micro-benchmark")
+    print("=" * 60)
+
+    for label, texts in (("short descriptions", SAMPLES), ("long pasted text", [long_text]),
+                        ("long text, no keywords", [no_match_text])):
+        legacy = timeit.timeit(lambda: [legacy_classify(t) for t in texts], number=number)
+        compiled = timeit.timeit(lambda: [CLASSIFIER.classify(t) for t in texts], number=number)
+        per_call = 1e6 / (number * len(texts))
+        print(f"\n📋 {label} ({len(texts)} text(s), {number} rounds)")
+        print(f"   substring scans: {legacy * per_call:8.2f} µs/text")
+        print(f"   hash tables:     {compiled * per_call:8.2f} µs/text  ({legacy / compiled:.2f}x)")
+
+    print("\n🔍 Classification differences")
+    for text in SAMPLES:
+        old, new = legacy_classify(text), CLASSIFIER.classify(text)
+        if old != new:
+            print(f"   {text!r}\n      substring:  {old}\n      classifier: {new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Micro-benchmark: pooled keep-alive session vs. bare requests.post for LocalLlamaProvider
+
+Starts a local stub of the llama.cpp /v1/chat/completions endpoint and
+sends concurrent completions through it the old way, with one
+requests.post and so one new connection per call, and through
+LocalLlamaProvider's pooled session. The stub can add a delay to every new
+connection (--connect-delay) to stand in for the TCP/TLS handshake to a
+remote server or tunnel, and a delay to every answer (--answer-delay) for
+the model's generation time.
+
+Usage: python benchmark_llama_session.py [--threads N] [--requests N] [--connect-delay MS] [--answer-delay MS]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.llm.local_llama import LocalLlamaProvider
+
+PROMPT = "You are an AI PC Diagnostic Expert.\n\nUser Problem: my computer is slow"
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, connect_delay, answer_delay):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.connect_delay = connect_delay
+        self.answer_delay = answer_delay
+        self.connections = 0
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every reused connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_delay)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.answer_delay)
+        body = json.dumps({
+            "id": "stub", "object": "chat.completion", "model": request["model"],
+            "choices": [{"message": {"content": "CPU is fine."}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def bare_post(api_base, model_id):
+    """What LocalLlamaProvider.complete used to do: a new connection for every call"""
+    def call():
+        response = requests.post(
+            f"{api_base}/v1/chat/completions",
+            json={"model": model_id, "messages": [{"role": "user", "content": PROMPT}],
+                  "temperature": 0.7, "max_tokens": 4000},
+            timeout=600,
+            verify=False
+        )
+        return response.json()["choices"][0]["message"]["content"]
+    return call
+
+
+def run(label, call, server, threads, total):
+    server.connections = 0
+    latencies = []
+
+    def timed(_):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return (f"{label:<26}{server.connections:>8}{elapsed:>10.2f}{total / elapsed:>10.1f}"
+            f"{statistics.mean(latencies) * 1000:>11.1f}{p95 * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent callers')
+    parser.add_argument('--requests', type=int, default=400, help='Completions per run')
+    parser.add_argument('--connect-delay', type=float, default=20, help='Milliseconds added to every new connection')
+    parser.add_argument('--answer-delay', type=float, default=5, help='Milliseconds added to every answer')
+    args = parser.parse_args()
+
+    server = StubServer(args.connect_delay / 1000, args.answer_delay / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ["LLAMA_API_BASE"] = api_base
+    os.environ.setdefault("LLAMA_POOL_SIZE", str(args.threads))
+    provider = LocalLlamaProvider()
+
+    print("=" * 75)
+    print("🔌 llama.cpp client connection benchmark")
+    print("=" * 75)
+    print(f"{args.threads} threads, {args.requests} completions, "
+          f"{args.connect_delay:g} ms per new connection, {args.answer_delay:g} ms per answer\n")
+    print(f"{'client':<26}{'conns':>8}{'total s':>10}{'req/s':>10}{'mean ms':>11}{'p95 ms':>10}")
+
+    for label, call in (("requests.post (old)", bare_post(api_base, provider.model_id)),
+                        ("pooled session", lambda: provider.complete(PROMPT))):
+        # complete() logs every call; keep the table readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            row = run(label, call, server, args.threads, args.requests)
+        print(row)
+
+    provider.close()
+    server.shutdown()
+    print("\nconns = TCP connections the stub accepted; the pooled session opens at most one per thread")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Micro-benchmark: telemetry wire encodings
+
+Collects one full telemetry payload (every core and issue-specific
+collector, like telemetry_agent.py sends) and compares encode/decode time
+and wire size of the current JSON path against CBOR with and without string
+references, each optionally gzip-compressed.
+
+Usage: python benchmark_telemetry_codec.py [--repeat N]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.hardware_monitor import HardwareMonitor
+from pc_diagnostic.telemetry_codec import CBOR2_AVAILABLE, decode_cbor, encode_cbor
+
+
+def collect_payload():
+    monitor = HardwareMonitor()
+    sections = list(monitor.CORE_SECTIONS) + monitor.registry.issue_sections()
+    telemetry = monitor.get_system_health('general', collectors=sections)
+    # Same normalization get_telemetry applies before responding
+    return json.loads(json.dumps(telemetry, default=str))
+
+
+CODECS = {
+    'json (indent=2)': (
+        lambda d: json.dumps(d, indent=2, default=str).encode('utf-8'),
+        lambda b: json.loads(b),
+    ),
+    'json (compact)': (
+        lambda d: json.dumps(d, separators=(',', ':'), default=str).encode('utf-8'),
+        lambda b: json.loads(b),
+    ),
+    'cbor': (
+        lambda d: encode_cbor(d, string_refs=False),
+        decode_cbor,
+    ),
+    'cbor + stringref': (
+        encode_cbor,
+        decode_cbor,
+    ),
+}
+
+
+def scaled(payload, factor):
+    """Payload with the per-process/per-disk arrays repeated, as on a busy workstation"""
+    big = json.loads(json.dumps(payload))
+    for key in ('processes', 'disk'):
+        if isinstance(big.get(key), list):
+            big[key] = [dict(item, pid=i) if 'pid' in item else item
+                        for i, item in enumerate(big[key] * factor)]
+    return big
+
+
+def bench(payload, repeat):
+    print(f"{'codec':<28}{'bytes':>10}{'ratio':>8}{'encode ms':>12}{'decode ms':>12}")
+    baseline = None
+    for name, (encode, decode) in CODECS.items():
+        raw = encode(payload)
+        assert decode(raw) == payload, f"{name} does not round-trip"
+        for compressed in (False, True):
+            if compressed:
+                wire = gzip.compress(raw, compresslevel=6)
+                enc = lambda: gzip.compress(encode(payload), compresslevel=6)
+                dec = lambda: decode(gzip.decompress(wire))
+                label = f"{name} + gzip"
+            else:
+                wire = raw
+                enc = lambda: encode(payload)
+                dec = lambda: decode(wire)
+                label = name
+            enc_ms = min(timeit.repeat(enc, number=1, repeat=repeat)) * 1000
+            dec_ms = min(timeit.repeat(dec, number=1, repeat=repeat)) * 1000
+            baseline = baseline or len(wire)
+            print(f"{label:<28}{len(wire):>10,}{len(wire) / baseline:>8.2f}{enc_ms:>12.2f}{dec_ms:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20, help='Iterations per measurement')
+    parser.add_argument('--scale', type=int, default=20, help='Repeat process/disk arrays this many times for the large payload')
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print("📦 Telemetry encoding benchmark")
+    print("=" * 78)
+    payload = collect_payload()
+    print(f"cbor2 available: {CBOR2_AVAILABLE}")
+
+    print(f"\n🔍 Collected payload ({len(payload.get('processes') or [])} processes)")
+    bench(payload, args.repeat)
+
+    large = scaled(payload, args.scale)
+    print(f"\n🔍 Large payload ({len(large.get('processes') or [])} processes)")
+    bench(large, args.repeat)
+
+    print("\nratio is relative to the indented JSON predict currently builds for the prompt")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,23 +11,142 @@ import os
 import sys
 import subprocess
 import json
+import threading
+import time
+from collections import namedtuple
 from typing import Dict, List, Any, Optional
 
+# One sensor reading from a snapshot
+SensorReading = namedtuple("SensorReading", [
+    "hardware", "hardware_type", "hardware_id", "name", "sensor_type", "identifier", "value", "min", "max"
+])
+
+# Derived views: section name -> (LibreHardwareMonitor sensor type, unit, include lifetime min/max)
+SENSOR_VIEWS = {
+    "thermal_sensors": ("Temperature", "°C", True),
+    "power_sensors": ("Power", "W", False),
+    "fan_sensors": ("Fan", "RPM", False),
+    "voltage_sensors": ("Voltage", "V", False),
+    "clock_sensors": ("Clock", "MHz", False),
+}
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+class SensorSnapshot:
+    """
+    All LibreHardwareMonitor sensors from a single refresh, indexed by
+    sensor type and by hardware identifier so every section derived from
+    it shows the same moment in time.
+    """
+
+    def __init__(self, hardware: List[Dict[str, Any]], readings: List[SensorReading], taken_at: float):
+        self.hardware = hardware
+        self.readings = readings
+        self.taken_at = taken_at
+        self.by_type: Dict[str, List[SensorReading]] = {}
+        self.by_hardware: Dict[str, List[SensorReading]] = {}
+        for reading in readings:
+            self.by_type.setdefault(reading.sensor_type, []).append(reading)
+            self.by_hardware.setdefault(reading.hardware_id, []).append(reading)
+
+    @classmethod
+    def capture(cls, computer) -> "SensorSnapshot":
+        """Update every hardware node (and its sub-hardware) once and read all sensors"""
+        hardware_list, readings = [], []
+        pending = list(computer.Hardware)
+        while pending:
+            hardware = pending.pop(0)
+            hardware.Update()
+            # Fan/voltage sensors usually live on sub-hardware (e.g. the motherboard's Super I/O chip)
+            pending.extend(getattr(hardware, "SubHardware", None) or [])
+
+            hw_info = {
+                "name": hardware.Name,
+                "type": str(hardware.HardwareType),
+                "identifier": str(hardware.Identifier),
+                "sensors": []
+            }
+            for sensor in hardware.Sensors:
+                reading = SensorReading(
+                    hardware=hw_info["name"],
+                    hardware_type=hw_info["type"],
+                    hardware_id=hw_info["identifier"],
+                    name=sensor.Name,
+                    sensor_type=str(sensor.SensorType),
+                    identifier=str(sensor.Identifier),
+                    value=_float(sensor.Value),
+                    min=_float(sensor.Min),
+                    max=_float(sensor.Max),
+                )
+                readings.append(reading)
+                hw_info["sensors"].append({
+                    "name": reading.name,
+                    "type": reading.sensor_type,
+                    "value": reading.value,
+                    "identifier": reading.identifier,
+                    "min": reading.min,
+                    "max": reading.max
+                })
+            hardware_list.append(hw_info)
+        return cls(hardware_list, readings, time.time())
+
+    def get(self, sensor_type: str, hardware_id: Optional[str] = None) -> List[SensorReading]:
+        """Readings of one sensor type, optionally for one hardware node"""
+        readings = self.by_type.get(sensor_type, [])
+        if hardware_id is not None:
+            readings = [r for r in readings if r.hardware_id == hardware_id]
+        return readings
+
+    def view(self, sensor_type: str, unit: str, include_min_max: bool = False) -> Dict[str, Any]:
+        """{"<hardware>_<sensor>": {"value", "unit"[, "min", "max"]}} for sensors with a current value"""
+        data = {}
+        for reading in self.by_type.get(sensor_type, []):
+            if reading.value is None:
+                continue
+            entry = {"value": reading.value}
+            if include_min_max:
+                entry["min"] = reading.min
+                entry["max"] = reading.max
+            entry["unit"] = unit
+            data[f"{reading.hardware}_{reading.name}"] = entry
+        return data
+
+
+
 class AdvancedTelemetry:
     """Advanced hardware telemetry collector with HWiNFO-level detail"""
     
-    def __init__(self):
+    def __init__(self, computer=None, pynvml=None):
+        """
+        Args:
+            computer: Already opened LibreHardwareMonitor Computer (or a test
+                double); skips loading LibreHardwareMonitorLib.dll
+            pynvml: Already initialized pynvml module; skips NVML init
+        """
         self.librehardware_available = False
         self.nvml_available = False
         self.clr = None
         self.computer = None
         self.pynvml = None
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
         
-        # Try to initialize LibreHardwareMonitor
-        self._init_librehardware()
+        if computer is not None:
+            self.computer = computer
+            self.librehardware_available = True
+        else:
+            # Try to initialize LibreHardwareMonitor
+            self._init_librehardware()
         
-        # Try to initialize NVML for NVIDIA GPUs
-        self._init_nvml()
+        if pynvml is not None:
+            self.pynvml = pynvml
+            self.nvml_available = True
+        else:
+            # Try to initialize NVML for NVIDIA GPUs
+            self._init_nvml()
     
     def _init_librehardware(self):
         """Initialize LibreHardwareMonitor via pythonnet"""
@@ -86,56 +205,45 @@ class AdvancedTelemetry:
         except Exception as e:
             print(f"⚠️ NVML initialization failed: {str(e)}")
     
-    def get_all_sensors(self) -> Dict[str, Any]:
-        """Get comprehensive sensor data from all available sources"""
+    def snapshot(self, max_age: float = 0.0) -> Optional[SensorSnapshot]:
+        """
+        Refresh all LibreHardwareMonitor sensors in one pass.
+
+        Args:
+            max_age: Reuse the previous snapshot if it is at most this many seconds old
+
+        Returns:
+            SensorSnapshot, or None if LibreHardwareMonitor is unavailable or
+            the refresh failed (an older snapshot is never passed off as new)
+        """
+        if not self.librehardware_available:
+            return None
+        with self._snapshot_lock:
+            if self._snapshot is not None and time.time() - self._snapshot.taken_at <= max_age:
+                return self._snapshot
+            try:
+                self._snapshot = SensorSnapshot.capture(self.computer)
+            except Exception as e:
+                print(f"Error reading LibreHardware sensors: {str(e)}")
+                return None
+            return self._snapshot
+    
+    def get_all_sensors(self, max_age: float = 0.0) -> Dict[str, Any]:
+        """Get comprehensive sensor data from all available sources (one sensor refresh)"""
+        snapshot = self.snapshot(max_age)
         sensor_data = {
-            "librehardware_sensors": self.get_librehardware_sensors(),
+            "librehardware_sensors": snapshot.hardware if snapshot else [],
             "nvidia_gpu_telemetry": self.get_nvidia_telemetry(),
-            "thermal_sensors": self.get_thermal_sensors(),
-            "power_sensors": self.get_power_sensors(),
-            "fan_sensors": self.get_fan_sensors(),
-            "voltage_sensors": self.get_voltage_sensors(),
-            "clock_sensors": self.get_clock_sensors()
         }
+        for section, (sensor_type, unit, include_min_max) in SENSOR_VIEWS.items():
+            sensor_data[section] = snapshot.view(sensor_type, unit, include_min_max) if snapshot else {}
         
         return sensor_data
     
-    def get_librehardware_sensors(self) -> List[Dict[str, Any]]:
+    def get_librehardware_sensors(self, max_age: float = 0.0) -> List[Dict[str, Any]]:
         """Get all sensors from LibreHardwareMonitor"""
-        if not self.librehardware_available:
-            return []
-        
-        sensors = []
-        try:
-            for hardware in self.computer.Hardware:
-                hardware.Update()
-                
-                # Get hardware info
-                hw_info = {
-                    "name": hardware.Name,
-                    "type": str(hardware.HardwareType),
-                    "identifier": str(hardware.Identifier),
-                    "sensors": []
-                }
-                
-                # Get all sensors for this hardware
-                for sensor in hardware.Sensors:
-                    sensor_info = {
-                        "name": sensor.Name,
-                        "type": str(sensor.SensorType),
-                        "value": float(sensor.Value) if sensor.Value is not None else None,
-                        "identifier": str(sensor.Identifier),
-                        "min": float(sensor.Min) if sensor.Min is not None else None,
-                        "max": float(sensor.Max) if sensor.Max is not None else None
-                    }
-                    hw_info["sensors"].append(sensor_info)
-                
-                sensors.append(hw_info)
-                
-        except Exception as e:
-            print(f"Error reading LibreHardware sensors: {str(e)}")
-        
-        return sensors
+        snapshot = self.snapshot(max_age)
+        return snapshot.hardware if snapshot else []
     
     def get_nvidia_telemetry(self) -> List[Dict[str, Any]]:
         """Get detailed NVIDIA GPU telemetry via NVML"""
@@ -186,117 +294,33 @@ class AdvancedTelemetry:
         
         return gpu_data
     
-    def get_thermal_sensors(self) -> Dict[str, Any]:
-        """Get thermal sensors (temperatures)"""
-        if not self.librehardware_available:
+    def _sensor_view(self, section: str, max_age: float) -> Dict[str, Any]:
+        """One derived view, reusing a snapshot up to max_age seconds old"""
+        snapshot = self.snapshot(max_age)
+        if snapshot is None:
             return {}
-        
-        thermal_data = {}
-        try:
-            for hardware in self.computer.Hardware:
-                hardware.Update()
-                
-                for sensor in hardware.Sensors:
-                    if str(sensor.SensorType) == "Temperature" and sensor.Value is not None:
-                        key = f"{hardware.Name}_{sensor.Name}"
-                        thermal_data[key] = {
-                            "value": float(sensor.Value),
-                            "min": float(sensor.Min) if sensor.Min is not None else None,
-                            "max": float(sensor.Max) if sensor.Max is not None else None,
-                            "unit": "°C"
-                        }
-        except Exception as e:
-            print(f"Error reading thermal sensors: {str(e)}")
-        
-        return thermal_data
+        sensor_type, unit, include_min_max = SENSOR_VIEWS[section]
+        return snapshot.view(sensor_type, unit, include_min_max)
+    
+    def get_thermal_sensors(self, max_age: float = 1.0) -> Dict[str, Any]:
+        """Get thermal sensors (temperatures)"""
+        return self._sensor_view("thermal_sensors", max_age)
     
-    def get_power_sensors(self) -> Dict[str, Any]:
+    def get_power_sensors(self, max_age: float = 1.0) -> Dict[str, Any]:
         """Get power consumption sensors"""
-        if not self.librehardware_available:
-            return {}
-        
-        power_data = {}
-        try:
-            for hardware in self.computer.Hardware:
-                hardware.Update()
-                
-                for sensor in hardware.Sensors:
-                    if str(sensor.SensorType) == "Power" and sensor.Value is not None:
-                        key = f"{hardware.Name}_{sensor.Name}"
-                        power_data[key] = {
-                            "value": float(sensor.Value),
-                            "unit": "W"
-                        }
-        except Exception as e:
-            print(f"Error reading power sensors: {str(e)}")
-        
-        return power_data
+        return self._sensor_view("power_sensors", max_age)
     
-    def get_fan_sensors(self) -> Dict[str, Any]:
+    def get_fan_sensors(self, max_age: float = 1.0) -> Dict[str, Any]:
         """Get fan speed sensors"""
-        if not self.librehardware_available:
-            return {}
-        
-        fan_data = {}
-        try:
-            for hardware in self.computer.Hardware:
-                hardware.Update()
-                
-                for sensor in hardware.Sensors:
-                    if str(sensor.SensorType) == "Fan" and sensor.Value is not None:
-                        key = f"{hardware.Name}_{sensor.Name}"
-                        fan_data[key] = {
-                            "value": float(sensor.Value),
-                            "unit": "RPM"
-                        }
-        except Exception as e:
-            print(f"Error reading fan sensors: {str(e)}")
-        
-        return fan_data
+        return self._sensor_view("fan_sensors", max_age)
     
-    def get_voltage_sensors(self) -> Dict[str, Any]:
+    def get_voltage_sensors(self, max_age: float = 1.0) -> Dict[str, Any]:
         """Get voltage sensors"""
-        if not self.librehardware_available:
-            return {}
-        
-        voltage_data = {}
-        try:
-            for hardware in self.computer.Hardware:
-                hardware.Update()
-                
-                for sensor in hardware.Sensors:
-                    if str(sensor.SensorType) == "Voltage" and sensor.Value is not None:
-                        key = f"{hardware.Name}_{sensor.Name}"
-                        voltage_data[key] = {
-                            "value": float(sensor.Value),
-                            "unit": "V"
-                        }
-        except Exception as e:
-            print(f"Error reading voltage sensors: {str(e)}")
-        
-        return voltage_data
+        return self._sensor_view("voltage_sensors", max_age)
     
-    def get_clock_sensors(self) -> Dict[str, Any]:
+    def get_clock_sensors(self, max_age: float = 1.0) -> Dict[str, Any]:
         """Get clock speed sensors"""
-        if not self.librehardware_available:
-            return {}
-        
-        clock_data = {}
-        try:
-            for hardware in self.computer.Hardware:
-                hardware.Update()
-                
-                for sensor in hardware.Sensors:
-                    if str(sensor.SensorType) == "Clock" and sensor.Value is not None:
-                        key = f"{hardware.Name}_{sensor.Name}"
-                        clock_data[key] = {
-                            "value": float(sensor.Value),
-                            "unit": "MHz"
-                        }
-        except Exception as e:
-            print(f"Error reading clock sensors: {str(e)}")
-        
-        return clock_data
+        return self._sensor_view("clock_sensors", max_age)
     
     def close(self):
         """Clean up resources"""
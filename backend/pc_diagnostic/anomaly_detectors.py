@@ -0,0 +1,234 @@
+"""
+Streaming Anomaly Detectors
+
+Detectors that run over the background sampler's metric stream with O(1)
+state per series: an EWMA baseline with z-score spike detection and a
+sustained-saturation window. Findings are ready at request time, so
+anomaly-aware diagnosis costs no extra collection.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class EWMADetector:
+    """Exponentially weighted mean/variance baseline with z-score spike detection"""
+
+    __slots__ = ("alpha", "z_threshold", "warmup", "min_std", "mean", "variance", "count")
+
+    def __init__(self, alpha: float = 0.1, z_threshold: float = 3.0, warmup: int = 10, min_std: float = 1.0):
+        """
+        Args:
+            alpha: Smoothing factor (higher reacts faster to level changes)
+            z_threshold: |z| at or above which a sample counts as a spike
+            warmup: Samples to observe before reporting spikes
+            min_std: Floor for the standard deviation, so a perfectly flat
+                baseline does not turn tiny wiggles into huge z-scores
+        """
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.min_std = min_std
+        self.mean = None
+        self.variance = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> Optional[float]:
+        """
+        Feed one sample.
+
+        Returns:
+            The sample's z-score against the baseline *before* this sample, or
+            None while warming up
+        """
+        self.count += 1
+        if self.mean is None:
+            self.mean = value
+            return None
+
+        std = max(math.sqrt(self.variance), self.min_std)
+        z_score = (value - self.mean) / std
+
+        # Standard incremental EWMA mean/variance update
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+
+        return z_score if self.count > self.warmup else None
+
+    def is_spike(self, z_score: Optional[float]) -> bool:
+        return z_score is not None and z_score >= self.z_threshold
+
+
+class SaturationWindow:
+    """Tracks how long a series has stayed at or above a threshold"""
+
+    __slots__ = ("threshold", "min_duration", "since", "peak")
+
+    def __init__(self, threshold: float, min_duration: float):
+        self.threshold = threshold
+        self.min_duration = min_duration
+        self.since = None
+        self.peak = None
+
+    def update(self, value: float, timestamp: float) -> Optional[float]:
+        """
+        Feed one sample.
+
+        Returns:
+            Seconds the series has been saturated if that meets min_duration, else None
+        """
+        if value < self.threshold:
+            self.reset()
+            return None
+        if self.since is None:
+            self.since = timestamp
+            self.peak = value
+        self.peak = max(self.peak, value)
+        duration = timestamp - self.since
+        return duration if duration >= self.min_duration else None
+
+    def reset(self):
+        """Forget the current saturation (e.g. after missed samples)"""
+        self.since = None
+        self.peak = None
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not math.isnan(value) else None
+
+
+def _max_disk_rate(snapshot, key):
+    disks = ((snapshot.get("disk_io") or {}).get("disks") or {}).values()
+    values = [rates.get(key) for rates in disks if isinstance(rates, dict)]
+    values = [v for v in values if isinstance(v, (int, float))]
+    return max(values) if values else None
+
+
+def _max_disk_latency(snapshot):
+    read = _max_disk_rate(snapshot, "avg_read_latency_ms")
+    write = _max_disk_rate(snapshot, "avg_write_latency_ms")
+    values = [v for v in (read, write) if v is not None]
+    return max(values) if values else None
+
+
+# name -> (extractor, saturation threshold, sustain seconds, issue type, hardware suspect, description)
+SERIES = {
+    "cpu_total": (lambda s: (s.get("cpu") or {}).get("total_usage"),
+                  95.0, 60, "performance", False, "CPU usage"),
+    "memory_percent": (lambda s: (s.get("memory") or {}).get("percentage"),
+                       90.0, 60, "performance", False, "Memory usage"),
+    "swap_percent": (lambda s: (s.get("memory") or {}).get("swap_percentage"),
+                     80.0, 120, "performance", False, "Swap usage"),
+    "disk_busy_percent": (lambda s: _max_disk_rate(s, "busy_percent"),
+                          90.0, 60, "storage", False, "Disk busy time"),
+    "disk_latency_ms": (_max_disk_latency,
+                        200.0, 60, "storage", True, "Disk I/O latency"),
+    "net_error_rate": (lambda s: ((s.get("network") or {}).get("total") or {}).get("error_rate"),
+                       0.01, 30, "network", True, "Network packet error rate"),
+    "net_drop_rate": (lambda s: ((s.get("network") or {}).get("total") or {}).get("drop_rate"),
+                      0.05, 60, "network", False, "Network packet drop rate"),
+}
+
+
+class _Series:
+    __slots__ = ("extract", "baseline", "saturation", "issue_type", "hardware_suspect",
+                 "description", "last_value", "last_seen", "last_spike")
+
+    def __init__(self, extract, threshold, sustain, issue_type, hardware_suspect, description):
+        self.extract = extract
+        # Rates live on a 0-1 scale; give them a proportionally small std floor
+        self.baseline = EWMADetector(min_std=1.0 if threshold > 1 else 0.001)
+        self.saturation = SaturationWindow(threshold, sustain)
+        self.issue_type = issue_type
+        self.hardware_suspect = hardware_suspect
+        self.description = description
+        self.last_value = None
+        self.last_seen = None
+        self.last_spike = None
+
+
+class AnomalyMonitor:
+    """Runs the detectors for every series over sampler snapshots"""
+
+    def __init__(self, series: Optional[Dict[str, tuple]] = None, spike_ttl: float = 300.0,
+                 stale_after: float = 30.0):
+        """
+        Args:
+            series: Series definitions (defaults to SERIES)
+            spike_ttl: Seconds a detected spike keeps being reported
+            stale_after: Seconds without a sample after which a series'
+                saturation is no longer reported (and its window restarts)
+        """
+        self.spike_ttl = spike_ttl
+        self.stale_after = stale_after
+        self._series = {name: _Series(*spec) for name, spec in (series or SERIES).items()}
+        self._lock = threading.Lock()
+
+    def observe(self, snapshot: Dict[str, Any]):
+        """Sampler listener: feed one snapshot to every detector"""
+        timestamp = snapshot.get("sampled_at")
+        with self._lock:
+            for series in self._series.values():
+                value = _number(series.extract(snapshot))
+                if value is None:
+                    # A missed sample breaks "sustained"
+                    series.saturation.reset()
+                    continue
+                if series.last_seen is not None and timestamp - series.last_seen > self.stale_after:
+                    series.saturation.reset()
+                series.last_value = value
+                series.last_seen = timestamp
+                baseline = series.baseline.mean
+                z_score = series.baseline.update(value)
+                if series.baseline.is_spike(z_score):
+                    series.last_spike = {
+                        "timestamp": timestamp,
+                        "value": round(value, 4),
+                        "baseline": round(baseline, 4),
+                        "z_score": round(z_score, 2),
+                    }
+                series.saturation.update(value, timestamp)
+
+    def findings(self) -> List[Dict[str, Any]]:
+        """Currently active spikes and sustained saturations"""
+        findings = []
+        now = time.time()
+        with self._lock:
+            for name, series in self._series.items():
+                common = {
+                    "series": name,
+                    "issue_type": series.issue_type,
+                    "hardware_suspect": series.hardware_suspect,
+                }
+                saturation = series.saturation
+                # Only series that are still reporting; duration is what was actually observed
+                fresh = series.last_seen is not None and now - series.last_seen <= self.stale_after
+                duration = series.last_seen - saturation.since if fresh and saturation.since is not None else None
+                if duration is not None and duration >= saturation.min_duration:
+                    findings.append(dict(
+                        common,
+                        kind="sustained_saturation",
+                        value=round(series.last_value, 4),
+                        peak=round(saturation.peak, 4),
+                        threshold=saturation.threshold,
+                        duration_seconds=round(duration, 1),
+                        message=f"{series.description} at or above {saturation.threshold:g} for {duration:.0f}s",
+                    ))
+                spike = series.last_spike
+                if spike is not None and now - spike["timestamp"] <= self.spike_ttl:
+                    findings.append(dict(
+                        common,
+                        kind="spike",
+                        seconds_ago=round(now - spike["timestamp"], 1),
+                        message=f"{series.description} spiked to {spike['value']:g} (baseline {spike['baseline']:g}, z={spike['z_score']:g})",
+                        **{k: v for k, v in spike.items() if k != "timestamp"},
+                    ))
+        return findings
+
+    def hardware_findings(self) -> List[Dict[str, Any]]:
+        """Findings that point at a failing component rather than software load"""
+        return [f for f in self.findings() if f["hardware_suspect"] and f["kind"] == "sustained_saturation"]
@@ -3,6 +3,10 @@ ASGI config for pc_diagnostic project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. ``uvicorn pc_diagnostic.asgi:application``
+or ``daphne pc_diagnostic.asgi:application``) so /api/predict/async/ can keep
+many slow LLM completions in flight without a worker thread each.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
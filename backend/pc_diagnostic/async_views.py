@@ -0,0 +1,120 @@
+"""
+Async Prediction Endpoint
+
+Async version of /api/predict/ for deployments served through
+pc_diagnostic/asgi.py (e.g. `uvicorn pc_diagnostic.asgi:application`).
+While the model generates, which can take up to LLAMA_READ_TIMEOUT
+seconds, the request is only a suspended coroutine waiting on
+LLMProvider.acomplete. It holds neither a worker nor a thread, so many
+slow diagnoses can be in flight at once. Telemetry collection, MCP task
+execution and report generation are short blocking steps and run in
+worker threads.
+
+Under WSGI (runserver) the view still works. Django runs it in its own
+event loop per request, which gives no concurrency gain.
+"""
+
+import json
+import uuid
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+
+from .telemetry_codec import decompress
+from .views import (
+    OFFLINE_PROVIDER_NAME, DiagnosisCompletion, build_diagnosis_prompt, gather_prediction_telemetry,
+    generate_prediction_report, offline_completion, parse_use_cache, prediction_response, run_mcp_tasks
+)
+
+
+def _error(message, status):
+    return JsonResponse({'success': False, 'error': message}, status=status)
+
+
+async def apredict(request):
+    """
+    Handle prediction requests asynchronously
+
+    Same JSON request body and response as /api/predict/ (the body may be
+    gzip-compressed with Content-Encoding: gzip).
+    """
+    if request.method != 'POST':
+        return _error('Method not allowed', 405)
+
+    try:
+        data = json.loads(decompress(request.body, request.META.get('HTTP_CONTENT_ENCODING', '')) or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError('Request body must be a JSON object')
+    except (ValueError, zlib.error) as e:
+        return _error(f'Invalid request body: {str(e)}', 400)
+
+    input_text = data.get('input_text', '')
+    generate_report = data.get('generate_report', False)
+    execute_mcp = data.get('execute_mcp_tasks', True)  # Auto-execute by default
+    if not input_text:
+        return _error('No input provided. Please provide input_text in the request body.', 400)
+
+    session_id = str(uuid.uuid4())
+    print(f"Collecting telemetry data for issue: {input_text}")
+    try:
+        telemetry_data = await sync_to_async(gather_prediction_telemetry, thread_sensitive=False)(data, input_text)
+    except LookupError as e:
+        return _error(str(e), 404)
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    try:
+        full_prompt = build_diagnosis_prompt(input_text, telemetry_data)
+        try:
+            # Provider initialization and the cache's disk tier block, so they run in worker threads
+            completion = await sync_to_async(DiagnosisCompletion, thread_sensitive=False)(
+                input_text, telemetry_data, parse_use_cache(data)
+            )
+            provider_name = completion.provider_name
+            print(f"[LLM] Using {provider_name} for async prediction")
+            llm_result = completion.cached
+            if llm_result is None:
+                try:
+                    llm_result = await completion.provider.acomplete(
+                        prompt=full_prompt, temperature=completion.temperature, max_tokens=completion.max_tokens
+                    )
+                except Exception as completion_error:
+                    completion.failed(completion_error)
+                    raise
+                await sync_to_async(completion.succeeded, thread_sensitive=False)(llm_result)
+        except Exception as provider_error:
+            # Provider failed - fall back to offline mock analysis
+            print(f"⚠️ LLM Provider Error: {str(provider_error)}")
+            provider_name = OFFLINE_PROVIDER_NAME
+            llm_result = offline_completion(input_text, telemetry_data)
+
+        prediction = llm_result['content']
+        if not prediction:
+            return _error('No content in model response', 500)
+        response_data = prediction_response(input_text, telemetry_data, provider_name, llm_result, session_id)
+
+        # MCP tasks only run for model answers, as in predict
+        if execute_mcp and provider_name != OFFLINE_PROVIDER_NAME:
+            response_data['mcp_execution'] = await sync_to_async(run_mcp_tasks, thread_sensitive=False)(prediction)
+        if generate_report:
+            response_data.update(await sync_to_async(generate_prediction_report, thread_sensitive=False)(
+                input_text, telemetry_data, prediction, session_id
+            ))
+
+        return JsonResponse(response_data)
+
+    except Exception as outer_error:
+        print(f"💥 Unexpected error in apredict endpoint: {str(outer_error)}")
+        import traceback
+        traceback.print_exc()
+        return JsonResponse({
+            'success': False,
+            'error': f'Unexpected error: {str(outer_error)}',
+            'type': type(outer_error).__name__
+        }, status=500)
+
+
+# Django 4.2's csrf_exempt wraps views in a sync function, which would make
+# Django run apredict in a thread; set its flag directly instead
+apredict.csrf_exempt = True
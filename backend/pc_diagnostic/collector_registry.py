@@ -0,0 +1,187 @@
+"""
+Collector Registry
+
+Every telemetry collector declares the platforms it supports, its expected
+cost, how long its result may be cached and how relevant it is to each
+issue type. The scheduler uses those declarations to pick which collectors
+to run for a request: fresh cached results are reused, and under a latency
+budget the most relevant collectors that fit are run while the rest are
+served from (stale) cache or skipped with a reason.
+"""
+
+import heapq
+import platform
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class Collector:
+    """A telemetry collector and what it costs to run"""
+
+    def __init__(self, name: str, func: Callable[[], Any], platforms: Optional[Iterable[str]] = None,
+                 cost_ms: float = 100.0, ttl: float = 0.0, relevance: Optional[Dict[str, float]] = None,
+                 issue_specific: bool = False):
+        """
+        Args:
+            name: Section name the result is reported under
+            func: Zero-argument callable gathering the data
+            platforms: platform.system() values the collector supports (None = all)
+            cost_ms: Expected steady-state run time; refined from observed run
+                times (the first run, which may prime counters, is not counted)
+            ttl: Seconds a successful result may be reused (0 = always collect)
+            relevance: Issue type -> relevance in [0, 1]; "*" applies to any issue
+            issue_specific: Reported under issue_specific rather than top level
+        """
+        self.name = name
+        self.func = func
+        self.platforms = tuple(platforms) if platforms else None
+        self.cost_ms = cost_ms
+        self.declared_cost_ms = cost_ms
+        self.runs = 0
+        self.ttl = ttl
+        self.relevance = relevance or {"*": 1.0}
+        self.issue_specific = issue_specific
+        self.cached_result = None
+        self.cached_at = None
+
+    def supports(self, system: str) -> bool:
+        return self.platforms is None or system in self.platforms
+
+    def relevance_for(self, issue_types: Iterable[str]) -> float:
+        default = self.relevance.get("*", 0.0)
+        return max([self.relevance.get(t, default) for t in issue_types] or [default])
+
+    def cache_age(self) -> Optional[float]:
+        return None if self.cached_at is None else time.monotonic() - self.cached_at
+
+
+class SchedulePlan:
+    """Outcome of scheduling: what to run, what to answer from cache, what to skip"""
+
+    def __init__(self):
+        self.run: List[str] = []
+        # name -> (result, age in seconds, stale)
+        self.cached: Dict[str, Tuple[Any, float, bool]] = {}
+        self.skipped: Dict[str, str] = {}
+        self.estimated_ms = 0.0
+
+
+class CollectorRegistry:
+    """Registered collectors plus their observed costs and cached results"""
+
+    # Weight of the newest observation in the running cost estimate
+    COST_SMOOTHING = 0.3
+    # Share of the gap to the declared cost closed each time a collector is
+    # left out for the budget, so one slow run does not exclude it for good
+    SKIP_DECAY = 0.2
+
+    def __init__(self, system: Optional[str] = None):
+        self.system = system or platform.system()
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def register(self, collector: Collector) -> Collector:
+        self._collectors[collector.name] = collector
+        return collector
+
+    def get(self, name: str) -> Optional[Collector]:
+        return self._collectors.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._collectors
+
+    def names(self) -> List[str]:
+        return list(self._collectors)
+
+    def issue_sections(self, issue_types: Optional[Iterable[str]] = None) -> List[str]:
+        """Issue-specific sections, optionally only those relevant to the given issue types"""
+        return [
+            name for name, collector in self._collectors.items()
+            if collector.issue_specific and (issue_types is None or collector.relevance_for(issue_types) > 0)
+        ]
+
+    def relevance_map(self) -> Dict[str, Dict[str, float]]:
+        """Section name -> issue relevance, for consumers ranking collected sections"""
+        return {name: dict(collector.relevance) for name, collector in self._collectors.items()}
+
+    def record(self, name: str, elapsed_ms: float, result: Any = None, ok: bool = True):
+        """
+        Fold an observed run time into the cost estimate and cache a successful result.
+
+        The first run is left out of the estimate: it pays one-time setup
+        (the rate engine's priming window, the process table's first scan).
+        """
+        collector = self._collectors.get(name)
+        if collector is None:
+            return
+        with self._lock:
+            collector.runs += 1
+            if collector.runs > 1:
+                collector.cost_ms += self.COST_SMOOTHING * (elapsed_ms - collector.cost_ms)
+            if ok and collector.ttl > 0 and not (isinstance(result, dict) and "error" in result):
+                collector.cached_result = result
+                collector.cached_at = time.monotonic()
+
+    def costs(self) -> Dict[str, float]:
+        """Current expected cost per collector in milliseconds"""
+        return {name: round(collector.cost_ms, 1) for name, collector in self._collectors.items()}
+
+    def schedule(self, names: Iterable[str], issue_types: Iterable[str] = (),
+                 budget_ms: Optional[float] = None, workers: int = 1) -> SchedulePlan:
+        """
+        Decide how to serve each requested collector.
+
+        Args:
+            names: Collectors the request needs
+            issue_types: Detected issue types (orders collectors by relevance)
+            budget_ms: Latency budget for the whole collection, or None for no limit
+            workers: Collectors that can run at once (the collector pool size)
+
+        Returns:
+            SchedulePlan. With a budget, collectors are placed most relevant
+            (then cheapest) first onto the least loaded worker; ones that would
+            push a worker past the budget are answered from stale cache if
+            there is one, otherwise skipped. Their estimates decay toward the
+            declared cost, so they are run (and measured) again eventually.
+        """
+        plan = SchedulePlan()
+        issue_types = list(issue_types)
+        candidates = []
+        with self._lock:
+            for name in names:
+                collector = self._collectors.get(name)
+                if collector is None:
+                    plan.skipped[name] = "unknown collector"
+                elif not collector.supports(self.system):
+                    plan.skipped[name] = f"not supported on {self.system}"
+                else:
+                    age = collector.cache_age()
+                    if age is not None and age <= collector.ttl:
+                        plan.cached[name] = (collector.cached_result, age, False)
+                    else:
+                        candidates.append(collector)
+
+            if budget_ms is None:
+                plan.run = [collector.name for collector in candidates]
+                return plan
+
+            candidates.sort(key=lambda c: (-c.relevance_for(issue_types), c.cost_ms))
+            loads = [0.0] * max(workers, 1)
+            for collector in candidates:
+                least = heapq.heappop(loads)
+                if least + collector.cost_ms <= budget_ms:
+                    heapq.heappush(loads, least + collector.cost_ms)
+                    plan.run.append(collector.name)
+                    continue
+                heapq.heappush(loads, least)
+                estimate = collector.cost_ms
+                collector.cost_ms += self.SKIP_DECAY * (collector.declared_cost_ms - collector.cost_ms)
+                if collector.cached_at is not None:
+                    plan.cached[collector.name] = (collector.cached_result, collector.cache_age(), True)
+                elif estimate > budget_ms:
+                    plan.skipped[collector.name] = f"expected {estimate:.0f}ms exceeds {budget_ms:g}ms budget"
+                else:
+                    plan.skipped[collector.name] = f"no capacity left in {budget_ms:g}ms budget"
+            plan.estimated_ms = round(max(loads), 1)
+        return plan
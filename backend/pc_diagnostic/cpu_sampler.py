@@ -0,0 +1,165 @@
+"""
+CPU Sampling Engine
+
+Takes a single CPU measurement window and derives per-core, total,
+min/max/p95 and frequency statistics from it. Concurrent callers share the
+in-flight window and recent results are reused, so the telemetry path and
+the MCP task path no longer each block on their own 1-second samples.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+
+def _busy_and_total(times) -> tuple:
+    """Split a cpu_times() entry into (busy, total) seconds, mirroring psutil's own math"""
+    total = sum(times)
+    # guest time is already accounted for in user/nice on Linux
+    total -= getattr(times, "guest", 0) + getattr(times, "guest_nice", 0)
+    busy = total - times.idle - getattr(times, "iowait", 0)
+    return busy, total
+
+
+def _percent(start, end) -> float:
+    """CPU busy percentage between two cpu_times() entries"""
+    busy_start, total_start = _busy_and_total(start)
+    busy_end, total_end = _busy_and_total(end)
+    total_delta = total_end - total_start
+    if total_delta <= 0:
+        return 0.0
+    busy_delta = max(busy_end - busy_start, 0.0)
+    return round(min(busy_delta / total_delta * 100.0, 100.0), 1)
+
+
+def _p95(values: List[float]) -> float:
+    """95th percentile using nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(0.95 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class CPUSampler:
+    """Shared windowed CPU sampler"""
+
+    def __init__(self, window: float = 1.0, ticks: int = 5, max_age: float = 1.0):
+        """
+        Args:
+            window: Length of one measurement window in seconds
+            ticks: Number of sub-samples taken inside the window (for min/max/p95)
+            max_age: Seconds a finished measurement is reused before re-sampling
+        """
+        self.window = window
+        self.ticks = max(int(ticks), 1)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._sampling = False
+        self._last_result = None
+        self._last_finished = 0.0
+        self._generation = 0  # Bumped for every finished measurement
+
+    def sample(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get CPU statistics for one measurement window.
+
+        If another thread is already measuring, wait for its window instead of
+        starting a new one. A result younger than max_age is returned as-is.
+
+        Args:
+            max_age: Override for how old a reused result may be (seconds)
+
+        Returns:
+            Dictionary with per-core usage, total usage, window statistics and frequency
+        """
+        max_age = self.max_age if max_age is None else max_age
+
+        with self._lock:
+            while True:
+                if self._last_result is not None and time.monotonic() - self._last_finished <= max_age:
+                    return self._last_result
+                if not self._sampling:
+                    break
+                # Join the in-flight window; if it fails, measure ourselves
+                generation = self._generation
+                while self._sampling:
+                    self._done.wait()
+                if self._generation != generation:
+                    return self._last_result
+            self._sampling = True
+
+        result = None
+        try:
+            result = self._measure()
+        finally:
+            with self._lock:
+                # Publish before waking the callers that joined this window
+                if result is not None:
+                    self._last_result = result
+                    self._last_finished = time.monotonic()
+                    self._generation += 1
+                self._sampling = False
+                self._done.notify_all()
+        return result
+
+    def _measure(self) -> Dict[str, Any]:
+        tick_length = self.window / self.ticks
+        window_start = psutil.cpu_times(percpu=True)
+        previous = window_start
+        tick_totals = []
+        tick_per_core = []
+
+        for _ in range(self.ticks):
+            time.sleep(tick_length)
+            current = psutil.cpu_times(percpu=True)
+            per_core = [_percent(a, b) for a, b in zip(previous, current)]
+            tick_per_core.append(per_core)
+            tick_totals.append(round(sum(per_core) / len(per_core), 1) if per_core else 0.0)
+            previous = current
+
+        usage_per_core = [_percent(a, b) for a, b in zip(window_start, previous)]
+        total_usage = round(sum(usage_per_core) / len(usage_per_core), 1) if usage_per_core else 0.0
+        core_peaks = [max(values) for values in zip(*tick_per_core)] if tick_per_core else []
+
+        result = {
+            "physical_cores": psutil.cpu_count(logical=False),
+            "total_cores": psutil.cpu_count(logical=True),
+            "usage_per_core": usage_per_core,
+            "total_usage": total_usage,
+            "window_seconds": self.window,
+            "window_stats": {
+                "samples": len(tick_totals),
+                "min": min(tick_totals) if tick_totals else 0.0,
+                "max": max(tick_totals) if tick_totals else 0.0,
+                "p95": _p95(tick_totals),
+                "peak_per_core": core_peaks,
+                "busiest_core": core_peaks.index(max(core_peaks)) if core_peaks else None,
+            },
+            "sampled_at": time.time(),
+        }
+
+        try:
+            freq = psutil.cpu_freq()
+        except Exception:
+            freq = None
+        if freq:
+            result.update({
+                "current_frequency": freq.current,
+                "min_frequency": freq.min,
+                "max_frequency": freq.max
+            })
+
+        return result
+
+
+# Process-wide engine shared by HardwareMonitor and SystemDiagnostics
+cpu_sampler = CPUSampler()
+
+
+def get_cpu_sampler() -> CPUSampler:
+    """Get the shared CPU sampling engine"""
+    return cpu_sampler
@@ -0,0 +1,256 @@
+"""
+Hardware Inventory Cache
+
+WMI inventory classes (GPUs, monitors, sound devices, drives, USB topology)
+mostly describe hardware that never changes between requests. This cache
+splits each class into static fields, loaded once and refreshed in the
+background after a TTL, and volatile fields (status, current resolution, ...)
+which are the only ones re-queried per request. Classes describing hot-plugged
+hardware (USB) have no volatile fields and set a short TTL of their own.
+
+The WMI connection comes from an injectable factory, so the cache can be
+exercised with a fake connection object (see test_hardware_inventory.py).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _text(value):
+    return str(value) if value is not None else None
+
+
+# Inventory name -> WMI class, key property and static/dynamic fields, plus an
+# optional "ttl" overriding the inventory-wide one. Fields map output key ->
+# WMI property, or (WMI property, converter).
+INVENTORY_CLASSES = {
+    "monitors": {
+        "wmi_class": "Win32_DesktopMonitor",
+        "key": "DeviceID",
+        "static": {
+            "name": "Name",
+            "device_id": "DeviceID",
+            "pnp_device_id": "PNPDeviceID",
+            "monitor_type": "MonitorType",
+        },
+        "dynamic": {
+            "screen_width": "ScreenWidth",
+            "screen_height": "ScreenHeight",
+            "status": "Status",
+            "availability": "Availability",
+        },
+    },
+    "graphics_cards": {
+        "wmi_class": "Win32_VideoController",
+        "key": "DeviceID",
+        "static": {
+            "name": "Name",
+            "device_id": "DeviceID",
+            "adapter_ram": "AdapterRAM",
+            "driver_version": "DriverVersion",
+            "driver_date": ("DriverDate", _text),
+        },
+        "dynamic": {
+            "status": "Status",
+            "current_refresh_rate": "CurrentRefreshRate",
+            "current_horizontal_resolution": "CurrentHorizontalResolution",
+            "current_vertical_resolution": "CurrentVerticalResolution",
+        },
+    },
+    "sound_devices": {
+        "wmi_class": "Win32_SoundDevice",
+        "key": "DeviceID",
+        "static": {
+            "name": "Name",
+            "description": "Description",
+            "manufacturer": "Manufacturer",
+            "device_id": "DeviceID",
+        },
+        "dynamic": {
+            "status": "Status",
+        },
+    },
+    "disk_drives": {
+        "wmi_class": "Win32_DiskDrive",
+        "key": "DeviceID",
+        "static": {
+            "model": "Model",
+            "size": "Size",
+            "interface_type": "InterfaceType",
+            "media_type": "MediaType",
+        },
+        "dynamic": {
+            "status": "Status",
+        },
+    },
+    "usb_devices": {
+        "wmi_class": "Win32_USBControllerDevice",
+        "key": None,
+        # USB devices come and go; with no volatile fields to re-query, the
+        # topology itself has to expire quickly
+        "ttl": 30.0,
+        "static": {
+            "dependent": ("Dependent", _text),
+            "antecedent": ("Antecedent", _text),
+        },
+        "dynamic": {},
+    },
+}
+
+
+def _extract(obj, fields: Dict[str, Any]) -> Dict[str, Any]:
+    row = {}
+    for output, source in fields.items():
+        prop, convert = source if isinstance(source, tuple) else (source, None)
+        value = getattr(obj, prop, None)
+        row[output] = convert(value) if convert else value
+    return row
+
+
+def _properties(fields: Dict[str, Any]) -> List[str]:
+    return [source[0] if isinstance(source, tuple) else source for source in fields.values()]
+
+
+class HardwareInventory:
+    """Static WMI inventory with TTL background refresh and per-request volatile fields"""
+
+    def __init__(self, connection_factory: Callable[[], Any], ttl: float = 3600.0,
+                 classes: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            connection_factory: Returns a WMI connection usable on the calling
+                thread (or None if WMI is unavailable)
+            ttl: Seconds before static inventory is refreshed in the background
+            classes: Inventory definitions (defaults to INVENTORY_CLASSES)
+        """
+        self.connection_factory = connection_factory
+        self.ttl = ttl
+        self.classes = classes or INVENTORY_CLASSES
+        # name -> {"rows": [(key, static row)], "loaded_at": monotonic time}
+        self._static: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Signalled whenever a background load of a class finishes
+        self._loaded = threading.Condition(self._lock)
+        self._refreshing = set()
+
+    def _query(self, conn, spec, properties=None):
+        wmi_class = getattr(conn, spec["wmi_class"])
+        return wmi_class(properties) if properties else wmi_class()
+
+    def load_static(self, name: str) -> List[Dict[str, Any]]:
+        """Query the static fields of one inventory class and store them"""
+        spec = self.classes[name]
+        conn = self.connection_factory()
+        if conn is None:
+            return []
+        rows = []
+        for obj in self._query(conn, spec):
+            key = getattr(obj, spec["key"], None) if spec["key"] else None
+            rows.append((key, _extract(obj, spec["static"])))
+        with self._lock:
+            self._static[name] = {"rows": rows, "loaded_at": time.monotonic()}
+        return [row for _, row in rows]
+
+    def refresh(self):
+        """Reload every inventory class (errors are reported, not raised)"""
+        errors = {}
+        for name in self.classes:
+            try:
+                self.load_static(name)
+            except Exception as e:
+                errors[name] = str(e)
+        return errors
+
+    def refresh_async(self, names=None):
+        """Reload inventory classes on a background thread (no-op for ones already refreshing)"""
+        with self._lock:
+            pending = [name for name in (names or self.classes) if name not in self._refreshing]
+            self._refreshing.update(pending)
+        if not pending:
+            return None
+
+        def run():
+            _init_com()
+            for name in pending:
+                try:
+                    self.load_static(name)
+                except Exception as e:
+                    print(f"⚠️ Hardware inventory refresh failed for {name}: {str(e)}")
+                finally:
+                    with self._lock:
+                        self._refreshing.discard(name)
+                        self._loaded.notify_all()
+
+        thread = threading.Thread(target=run, name="hardware-inventory-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def age(self, name: str) -> Optional[float]:
+        """Seconds since the static inventory for `name` was loaded, or None"""
+        with self._lock:
+            entry = self._static.get(name)
+        return None if entry is None else time.monotonic() - entry["loaded_at"]
+
+    def ttl_for(self, name: str) -> float:
+        """Static inventory TTL for one class (its own "ttl", else the inventory-wide one)"""
+        return self.classes[name].get("ttl", self.ttl)
+
+    def _static_rows(self, name: str):
+        with self._lock:
+            entry = self._static.get(name)
+            # A background load (e.g. the startup warm-up) is already querying
+            # this class; wait for it rather than running the same query twice
+            while entry is None and name in self._refreshing:
+                self._loaded.wait()
+                entry = self._static.get(name)
+        if entry is None:
+            # First use: nothing to serve yet, so load synchronously
+            self.load_static(name)
+            with self._lock:
+                entry = self._static.get(name)
+            return entry["rows"] if entry else []
+        if time.monotonic() - entry["loaded_at"] > self.ttl_for(name):
+            # Serve the current inventory while a fresh copy loads
+            self.refresh_async([name])
+        return entry["rows"]
+
+    def rows(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Inventory rows for one class: cached static fields merged with
+        freshly queried volatile fields.
+
+        A device present in only one of the two (hot-plugged or removed since
+        the last static load) triggers a background refresh; newly seen
+        devices are still returned with their volatile fields.
+        """
+        spec = self.classes[name]
+        static_rows = self._static_rows(name)
+        if not spec["dynamic"] or not spec["key"]:
+            return [dict(row) for _, row in static_rows]
+
+        conn = self.connection_factory()
+        if conn is None:
+            return [dict(row) for _, row in static_rows]
+        properties = [spec["key"]] + _properties(spec["dynamic"])
+        live = {}
+        for obj in self._query(conn, spec, properties):
+            live[getattr(obj, spec["key"], None)] = _extract(obj, spec["dynamic"])
+
+        merged = []
+        for key, row in static_rows:
+            if key in live:
+                merged.append(dict(row, **live.pop(key)))
+        if live or len(merged) != len(static_rows):
+            self.refresh_async([name])
+            merged.extend(live.values())
+        return merged
+
+
+def _init_com():
+    """WMI needs COM initialized on every thread that talks to it"""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
@@ -6,6 +6,8 @@ import socket
 import time
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 
 try:
@@ -28,14 +30,150 @@ except ImportError:
     ADVANCED_TELEMETRY_AVAILABLE = False
     print("⚠️ Advanced telemetry not available. Install: pip install pythonnet nvidia-ml-py3")
 
+from .telemetry_sampler import TelemetrySampler
+from .sensor_poller import SensorPoller
+from .cpu_sampler import get_cpu_sampler
+from .process_table import get_process_table
+from .rate_engine import get_rate_engine
+from .connection_summary import summarize_connections
+from .keyword_classifier import KeywordClassifier
+from .collector_registry import Collector, CollectorRegistry
+from .hardware_inventory import HardwareInventory
+from . import linux_collectors
+from . import shell_pool
+
+# Shared pool that runs telemetry collectors concurrently for every request
+COLLECTOR_POOL_SIZE = 12
+_collector_pool = None
+_collector_pool_lock = threading.Lock()
+
+
+def _init_collector_thread():
+    """Initialize COM on pool threads so WMI queries work off the main thread"""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+
+
+def get_collector_pool():
+    """Get (or lazily create) the shared collector thread pool"""
+    global _collector_pool
+    with _collector_pool_lock:
+        if _collector_pool is None:
+            _collector_pool = ThreadPoolExecutor(
+                max_workers=COLLECTOR_POOL_SIZE,
+                thread_name_prefix="telemetry-collector",
+                initializer=_init_collector_thread
+            )
+        return _collector_pool
+
+
+class _CollectorRun:
+    """A collector submitted to the pool; started is set when a worker picks it up"""
+
+    __slots__ = ("future", "submitted", "started")
+
+    def __init__(self):
+        self.future = None
+        self.submitted = time.monotonic()
+        self.started = None
+
+
+def project_fields(health_data, fields):
+    """
+    Project health data down to the given dotted field paths.
+
+    Request metadata (timestamp, detected issue types, collector status, ...)
+    is always kept. Paths that do not exist are silently skipped; list items
+    addressed by position (e.g. "disk.0.device") come back keyed by that index.
+    """
+    projected = {key: health_data[key] for key in HardwareMonitor.METADATA_FIELDS if key in health_data}
+    for field in fields:
+        parts = field.split(".")
+        source = health_data
+        for part in parts:
+            if isinstance(source, dict) and part in source:
+                source = source[part]
+            elif isinstance(source, list) and part.isdigit() and int(part) < len(source):
+                source = source[int(part)]
+            else:
+                break
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+                if not isinstance(target, dict):
+                    break
+            else:
+                target[parts[-1]] = source
+    return projected
+
+
 class HardwareMonitor:
+    # Top-level telemetry sections, in the order they appear in health data
+    CORE_SECTIONS = ("system_info", "cpu", "memory", "disk", "disk_io", "network", "processes", "process_rankings")
+    # Sensor, history and trend sections gathered alongside the core ones
+    EXTENDED_SECTIONS = ("advanced_sensors", "history_trends", "sensor_history")
+    # Sections the background sampler can answer from its snapshot
+    SAMPLED_SECTIONS = ("cpu", "memory", "disk", "disk_io", "network", "processes")
+    # Keyword mappings for the different issue types (see keyword_classifier for syntax)
+    ISSUE_CLASSIFIER = KeywordClassifier({
+        'display': ['screen', 'display', 'monitor', 'flicker*', 'black screen', 'graphics', 'video', 'visual', 'resolution', 'brightness'],
+        'performance': ['slow*', 'lag', 'lagging', 'laggy', 'freez*', 'frozen', 'hang', 'hanging', 'hung', 'performance', 'speed', 'fast', 'cpu', 'memory', 'ram'],
+        'network': ['wifi', 'wi-fi', 'internet', 'network*', 'connect*', 'ethernet', 'online', 'download*', 'upload*'],
+        'audio': ['sound', 'audio', 'speaker', 'microphone', 'headphone', 'music', 'volume', 'noise', 'noisy'],
+        'storage': ['disk', 'drive', 'storage', 'hard drive', 'ssd', 'hdd', 'space', 'file'],
+        'hardware': ['usb', 'port', 'device', 'keyboard', 'mouse', 'mice', 'printer', 'hardware']
+    }, default='general')
+
+    # Keys always present regardless of projection
+    METADATA_FIELDS = (
+        "timestamp", "issue_types_detected", "user_description", "telemetry_source",
+        "collector_status", "timed_out_collectors", "skipped_collectors", "cached_collectors",
+        "snapshot_timestamp", "snapshot_age_seconds",
+    )
+
+    # Per-collector deadlines in seconds; anything slower is reported as timed out
+    DEFAULT_COLLECTOR_DEADLINE = 10.0
+    COLLECTOR_DEADLINES = {
+        "system_info": 2.0,
+        "cpu": 5.0,
+        "memory": 2.0,
+        "disk": 5.0,
+        "disk_io": 3.0,
+        "network": 3.0,
+        "processes": 5.0,
+        "process_rankings": 5.0,
+        "advanced_sensors": 10.0,
+        "display": 8.0,
+        "network_detailed": 5.0,
+        "audio": 8.0,
+        "storage_detailed": 8.0,
+        "usb_devices": 8.0,
+    }
+
     def __init__(self):
-        self.wmi_conn = None
-        if WMI_AVAILABLE and platform.system() == "Windows":
-            try:
-                self.wmi_conn = wmi.WMI()
-            except:
-                pass
+        # WMI COM objects are bound to the thread that created them, so every
+        # collector thread gets its own connection (see the wmi_conn property)
+        self._wmi_enabled = WMI_AVAILABLE and platform.system() == "Windows"
+        self._wmi_local = threading.local()
+        # Collectors still running on the pool, by name; a hung one is joined
+        # by later calls instead of taking another worker
+        self._collector_runs = {}
+        self._collector_runs_lock = threading.Lock()
+        # On Linux the issue-specific collectors read sysfs/procfs instead of WMI
+        self._linux = platform.system() == "Linux"
+
+        # Static WMI inventory (GPU names, drive models, ...) is cached and only
+        # volatile fields are re-queried per request, see hardware_inventory
+        self.inventory = HardwareInventory(
+            lambda: self.wmi_conn,
+            ttl=float(os.getenv("HARDWARE_INVENTORY_TTL", "3600"))
+        )
+        if self._wmi_enabled:
+            self.inventory.refresh_async()  # warm up off the request path
         
         # Initialize advanced telemetry if available
         self.advanced_telemetry = None
@@ -46,26 +184,143 @@ class HardwareMonitor:
             except Exception as e:
                 print(f"⚠️ Advanced telemetry initialization failed: {str(e)}")
 
+        self.registry = self._build_registry()
+
+        # Background sampler is opt-in, see enable_background_sampling()
+        self.sampler = None
+        # Optional TelemetryHistoryStore fed by the sampler (used for trends)
+        self.history = None
+        # Optional AnomalyMonitor fed by the sampler (findings go under issue_specific)
+        self.anomaly_monitor = None
+        # Optional SensorPoller keeping windowed sensor history, see enable_sensor_polling()
+        self.sensor_poller = None
+
+    @property
+    def wmi_conn(self):
+        """WMI connection for the calling thread, or None if WMI is unavailable"""
+        if not self._wmi_enabled:
+            return None
+        if not hasattr(self._wmi_local, "conn"):
+            try:
+                self._wmi_local.conn = wmi.WMI()
+            except:
+                self._wmi_local.conn = None
+        return self._wmi_local.conn
+
+    def run_collectors(self, collectors, deadlines=None):
+        """
+        Run collectors concurrently on the shared pool, each with its own deadline.
+
+        A collector's deadline counts from when a worker starts it, not from
+        submission; one that has not even started within its deadline (pool
+        busy) times out as well. A collector still running from an earlier
+        call, e.g. a hung WMI query, is not submitted again: this call waits
+        on that run, against the deadline measured from its start.
+
+        Args:
+            collectors: Mapping of collector name to a zero-argument callable
+            deadlines: Optional per-name deadline overrides in seconds
+
+        Returns:
+            Tuple of (results, status). Collectors that miss their deadline or
+            raise get an error dict as their result instead of stalling the call.
+        """
+        deadlines = dict(self.COLLECTOR_DEADLINES, **(deadlines or {}))
+        runs = {name: self._submit_collector(name, func) for name, func in collectors.items()}
+
+        results = {}
+        status = {}
+        for name, run in runs.items():
+            deadline = deadlines.get(name, self.DEFAULT_COLLECTOR_DEADLINE)
+            try:
+                while True:
+                    started = run.started
+                    remaining = (started if started is not None else run.submitted) + deadline - time.monotonic()
+                    try:
+                        results[name] = run.future.result(timeout=max(remaining, 0.0))
+                        break
+                    except FutureTimeoutError:
+                        if started is None and run.started is not None:
+                            continue  # began while we waited; its deadline starts now
+                        raise
+                status[name] = "ok"
+            except FutureTimeoutError:
+                if run.started is None and run.future.cancel():
+                    message = f"Collector did not start within {deadline:g}s (collector pool busy)"
+                else:
+                    # The worker keeps running in the background; we just stop waiting
+                    message = f"Collector timed out after {deadline:g}s"
+                results[name] = {"error": message, "timed_out": True}
+                status[name] = "timeout"
+            except Exception as e:
+                results[name] = {"error": str(e)}
+                status[name] = "error"
+
+        return results, status
+
+    def _submit_collector(self, name, func):
+        """Submit a collector to the pool, or return its run if one is still in flight"""
+        with self._collector_runs_lock:
+            run = self._collector_runs.get(name)
+            if run is not None and not run.future.done():
+                return run
+            run = _CollectorRun()
+            run.future = get_collector_pool().submit(self._timed, name, func, run)
+            self._collector_runs[name] = run
+        run.future.add_done_callback(lambda _: self._forget_collector_run(name, run))
+        return run
+
+    def _forget_collector_run(self, name, run):
+        with self._collector_runs_lock:
+            if self._collector_runs.get(name) is run:
+                del self._collector_runs[name]
+
+    def _timed(self, name, func, run):
+        """Run a collector and feed its run time (and result, for caching) to the registry"""
+        started = run.started = time.monotonic()
+        try:
+            result = func()
+        except Exception:
+            self.registry.record(name, (time.monotonic() - started) * 1000, ok=False)
+            raise
+        self.registry.record(name, (time.monotonic() - started) * 1000, result)
+        return result
+
+    def enable_background_sampling(self, interval=5.0, capacity=120):
+        """Start the background telemetry sampler so requests can answer from snapshots"""
+        if self.sampler is None:
+            self.sampler = TelemetrySampler(self, interval=interval, capacity=capacity)
+        self.sampler.start()
+        return self.sampler
+
+    def enable_sensor_polling(self, interval=1.0, window_seconds=300.0):
+        """Start the windowed sensor poller (needs LibreHardwareMonitor or NVML)"""
+        if self.advanced_telemetry is None or not (
+                self.advanced_telemetry.librehardware_available or self.advanced_telemetry.nvml_available):
+            print("⚠️ Sensor poller not started: no LibreHardwareMonitor or NVML sensors available")
+            return None
+        if self.sensor_poller is None:
+            self.sensor_poller = SensorPoller(self.advanced_telemetry, interval=interval, window_seconds=window_seconds)
+        self.sensor_poller.start()
+        return self.sensor_poller
+
+    def _get_advanced_sensors(self):
+        """Advanced sensors, reusing the poller's latest LibreHardwareMonitor refresh when it is running"""
+        max_age = 0.0
+        if self.sensor_poller is not None and self.sensor_poller.is_running():
+            max_age = self.sensor_poller.staleness_limit()
+        return self.advanced_telemetry.get_all_sensors(max_age=max_age)
+
+    def get_latest_snapshot(self):
+        """Get the latest background snapshot, or None if sampling is off or the snapshot is stale"""
+        if self.sampler is None or not self.sampler.is_running():
+            return None
+        return self.sampler.latest(max_age=self.sampler.staleness_limit())
+
     def run_terminal_command(self, command, timeout=10):
-        """Execute terminal command and return output"""
+        """Execute terminal command in a pooled PowerShell (Windows) or bash session and return output"""
         try:
-            if platform.system() == "Windows":
-                # Use PowerShell for Windows
-                result = subprocess.run(
-                    ["powershell", "-Command", command],
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-            else:
-                # Use bash for Unix-like systems
-                result = subprocess.run(
-                    ["bash", "-c", command],
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout
-                )
+            result = shell_pool.run(command, timeout=timeout)
             
             return {
                 "command": command,
@@ -93,64 +348,189 @@ class HardwareMonitor:
 
     def identify_issue_type(self, user_input):
         """Identify the type of issue based on user input"""
-        user_input_lower = user_input.lower()
-        
-        # Define keyword mappings for different issue types
-        issue_types = {
-            'display': ['screen', 'display', 'monitor', 'flicker', 'black screen', 'graphics', 'video', 'visual', 'resolution', 'brightness'],
-            'performance': ['slow', 'lag', 'freeze', 'hang', 'performance', 'speed', 'fast', 'cpu', 'memory', 'ram'],
-            'network': ['wifi', 'internet', 'network', 'connection', 'ethernet', 'connect', 'online', 'download', 'upload'],
-            'audio': ['sound', 'audio', 'speaker', 'microphone', 'headphone', 'music', 'volume', 'noise'],
-            'storage': ['disk', 'drive', 'storage', 'hard drive', 'ssd', 'hdd', 'space', 'file'],
-            'hardware': ['usb', 'port', 'device', 'keyboard', 'mouse', 'printer', 'hardware']
-        }
-        
-        detected_types = []
-        for issue_type, keywords in issue_types.items():
-            if any(keyword in user_input_lower for keyword in keywords):
-                detected_types.append(issue_type)
-        
-        return detected_types if detected_types else ['general']
+        return self.ISSUE_CLASSIFIER.classify(user_input)
+
+    def _build_registry(self):
+        """
+        Register every telemetry collector with its platform support, expected
+        cost (ms, refined as collectors run), cache TTL and issue relevance.
+        Nothing runs here; get_system_health only invokes what it schedules.
+        """
+        registry = CollectorRegistry()
+        registry.register(Collector("system_info", self.get_system_info, cost_ms=5, ttl=60))
+        registry.register(Collector("cpu", self.get_cpu_info, cost_ms=1000))
+        registry.register(Collector("memory", self.get_memory_info, cost_ms=5))
+        registry.register(Collector("disk", self.get_disk_info, cost_ms=20))
+        # Rate collectors only pay their priming window on the first call, which
+        # the registry leaves out, so their estimates start at the steady-state cost
+        registry.register(Collector("disk_io", self.get_disk_io_info, cost_ms=50,
+                                    relevance={"*": 0.5, "storage": 1.0, "performance": 1.0}))
+        registry.register(Collector("network", self.get_network_info, cost_ms=50,
+                                    relevance={"*": 0.5, "network": 1.0}))
+        registry.register(Collector("processes", self.get_top_processes, cost_ms=300,
+                                    relevance={"*": 0.5, "performance": 1.0}))
+        # Shares the process table refresh with "processes" when both run
+        registry.register(Collector("process_rankings", self.get_process_rankings, cost_ms=300,
+                                    relevance={"*": 0.3, "performance": 1.0, "storage": 0.8}))
+        if self.advanced_telemetry:
+            registry.register(Collector("advanced_sensors", self._get_advanced_sensors, cost_ms=2000,
+                                        relevance={"*": 0.3, "performance": 0.8, "hardware": 0.8}))
+
+        # Issue-specific collectors (reported under issue_specific). WMI queries
+        # cost seconds; the Linux versions are a handful of sysfs reads
+        native = ["Windows", "Linux"]
+        slow = 1500 if self._wmi_enabled else 5
+        registry.register(Collector("display", self.get_display_info, platforms=native, cost_ms=slow,
+                                    ttl=60, relevance={"display": 1.0}, issue_specific=True))
+        registry.register(Collector("network_detailed", self.get_detailed_network_info, cost_ms=200,
+                                    ttl=10, relevance={"network": 1.0}, issue_specific=True))
+        registry.register(Collector("audio", self.get_audio_info, platforms=native, cost_ms=slow,
+                                    ttl=60, relevance={"audio": 1.0}, issue_specific=True))
+        registry.register(Collector("storage_detailed", self.get_detailed_storage_info, platforms=native,
+                                    cost_ms=slow, ttl=60, relevance={"storage": 1.0}, issue_specific=True))
+        registry.register(Collector("usb_devices", self.get_usb_info, platforms=native, cost_ms=slow,
+                                    ttl=30, relevance={"hardware": 1.0}, issue_specific=True))
+        return registry
+
+    def resolve_sections(self, issue_types, collectors=None, fields=None):
+        """
+        Work out which telemetry sections a request needs.
+
+        Args:
+            issue_types: Detected issue types (selects issue-specific sections)
+            collectors: Optional section names; "issue_specific" expands to the
+                sections for the detected issue types
+            fields: Optional dotted field paths (e.g. "memory.percentage"); their
+                top-level section is added to the selection
 
-    def get_system_health(self, issue_description="general"):
-        """Get comprehensive system health data based on issue type"""
+        Returns:
+            Set of section names to collect
+
+        Raises:
+            ValueError: If an unknown section is requested
+        """
+        issue_sections = self.registry.issue_sections(issue_types)
+        if collectors is None and fields is None:
+            return set(self.CORE_SECTIONS) | set(self.EXTENDED_SECTIONS) | set(issue_sections)
+
+        requested = list(collectors or [])
+        for field in fields or []:
+            parts = field.split(".")
+            if parts[0] == "issue_specific" and len(parts) > 1:
+                requested.append(parts[1])
+            else:
+                requested.append(parts[0])
+
+        valid = set(self.CORE_SECTIONS) | set(self.EXTENDED_SECTIONS) | {"issue_specific"}
+        valid |= set(self.registry.issue_sections())
+        unknown = [name for name in requested if name not in valid and name not in self.METADATA_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown telemetry section(s): {', '.join(unknown)}. Valid sections: {', '.join(sorted(valid))}")
+
+        wanted = {name for name in requested if name in valid}
+        if "issue_specific" in wanted:
+            wanted.discard("issue_specific")
+            wanted |= set(issue_sections)
+        return wanted
+
+    def get_system_health(self, issue_description="general", collectors=None, fields=None, budget_ms=None):
+        """
+        Get system health data based on issue type.
+
+        By default every section is gathered. Passing `collectors` (section names)
+        or `fields` (dotted paths) gathers only what is asked for; with `fields`
+        the result is also projected down to those paths. With `budget_ms` the
+        registry only runs the collectors expected to finish within that many
+        milliseconds and reports the rest under skipped_collectors.
+        """
         issue_types = self.identify_issue_type(issue_description)
-        
+        wanted = self.resolve_sections(issue_types, collectors, fields)
+
+        # Answer sampled sections from the background sampler when it has a fresh snapshot
+        snapshot = None
+        if wanted & set(self.SAMPLED_SECTIONS):
+            snapshot = self.get_latest_snapshot()
+
+        needed = [
+            section for section in wanted
+            if section in self.registry and not (snapshot and section in self.SAMPLED_SECTIONS)
+        ]
+        plan = self.registry.schedule(needed, issue_types, budget_ms=budget_ms, workers=COLLECTOR_POOL_SIZE)
+
+        to_run = {name: self.registry.get(name).func for name in plan.run}
+        deadlines = None
+        if budget_ms is not None:
+            # Hold collectors to the budget even if they run slower than expected
+            deadlines = {name: min(self.COLLECTOR_DEADLINES.get(name, self.DEFAULT_COLLECTOR_DEADLINE), budget_ms / 1000)
+                         for name in to_run}
+        results, collector_status = self.run_collectors(to_run, deadlines) if to_run else ({}, {})
+        for name, (result, _, _) in plan.cached.items():
+            results[name] = result
+            collector_status[name] = "cached"
+        for name in plan.skipped:
+            collector_status[name] = "skipped"
+
         health_data = {
             "timestamp": datetime.now().isoformat(),
             "issue_types_detected": issue_types,
             "user_description": issue_description,
-            "system_info": self.get_system_info(),
-            "cpu": self.get_cpu_info(),
-            "memory": self.get_memory_info(),
-            "disk": self.get_disk_info(),
-            "network": self.get_network_info(),
-            "processes": self.get_top_processes(),
-            "issue_specific": {},
-            "advanced_sensors": None  # Will contain HWiNFO-level sensor data
         }
-        
-        # Collect advanced sensor data if available
-        if self.advanced_telemetry:
-            try:
-                print("📊 Collecting advanced sensor telemetry (LibreHardwareMonitor + NVML)...")
-                health_data["advanced_sensors"] = self.advanced_telemetry.get_all_sensors()
+        for section in self.CORE_SECTIONS:
+            if section not in wanted:
+                continue
+            if snapshot and section in self.SAMPLED_SECTIONS:
+                health_data[section] = snapshot[section]
+            elif section in results:
+                health_data[section] = results[section]
+
+        issue_sections = self.registry.issue_sections()
+        # Asking for "issue_specific" keeps the anomaly findings even when no issue section applies
+        requested = {item.split(".")[0] for item in (collectors or []) + (fields or [])}
+        if (collectors is None and fields is None) or "issue_specific" in requested or wanted & set(issue_sections):
+            health_data["issue_specific"] = {
+                section: results[section] for section in issue_sections if section in results
+            }
+            if self.anomaly_monitor is not None:
+                health_data["issue_specific"]["anomalies"] = self.anomaly_monitor.findings()
+
+        if "advanced_sensors" in wanted:
+            health_data["advanced_sensors"] = None  # Will contain HWiNFO-level sensor data
+            sensor_status = collector_status.get("advanced_sensors")
+            if sensor_status in ("ok", "cached"):
+                health_data["advanced_sensors"] = results["advanced_sensors"]
                 print("✅ Advanced sensor data collected successfully")
+            elif sensor_status in ("timeout", "error"):
+                print(f"⚠️ Advanced sensor collection failed: {results['advanced_sensors'].get('error')}")
+
+        health_data["telemetry_source"] = "background_sampler" if snapshot else "live"
+        health_data["collector_status"] = collector_status
+        health_data["timed_out_collectors"] = [name for name, state in collector_status.items() if state == "timeout"]
+        health_data["skipped_collectors"] = plan.skipped
+        health_data["cached_collectors"] = {
+            name: {"age_seconds": round(age, 3), "stale": stale} for name, (_, age, stale) in plan.cached.items()
+        }
+        if budget_ms is not None:
+            health_data["collection_budget_ms"] = budget_ms
+
+        if snapshot:
+            health_data["snapshot_timestamp"] = snapshot["timestamp"]
+            health_data["snapshot_age_seconds"] = round(TelemetrySampler.snapshot_age(snapshot), 3)
+
+        if "history_trends" in wanted and self.history is not None:
+            try:
+                health_data["history_trends"] = self.history.trends()
             except Exception as e:
-                print(f"⚠️ Advanced sensor collection failed: {str(e)}")
-
-        # Collect issue-specific telemetry
-        for issue_type in issue_types:
-            if issue_type == 'display':
-                health_data["issue_specific"]["display"] = self.get_display_info()
-            elif issue_type == 'network':
-                health_data["issue_specific"]["network_detailed"] = self.get_detailed_network_info()
-            elif issue_type == 'audio':
-                health_data["issue_specific"]["audio"] = self.get_audio_info()
-            elif issue_type == 'storage':
-                health_data["issue_specific"]["storage_detailed"] = self.get_detailed_storage_info()
-            elif issue_type == 'hardware':
-                health_data["issue_specific"]["usb_devices"] = self.get_usb_info()
+                print(f"⚠️ Telemetry history trends unavailable: {str(e)}")
+
+        if "sensor_history" in wanted and self.sensor_poller is not None and self.sensor_poller.is_running():
+            # Window stats and throttle counts come from the poller; nothing is polled here
+            health_data["sensor_history"] = self.sensor_poller.summary()
+
+        if health_data["timed_out_collectors"]:
+            print(f"⚠️ Collectors timed out: {', '.join(health_data['timed_out_collectors'])}")
+
+        if fields:
+            health_data = project_fields(health_data, fields)
 
         return health_data
 
@@ -168,37 +548,15 @@ class HardwareMonitor:
         try:
             # Advanced Windows display diagnostics
             if self.wmi_conn:
-                # Monitor information with detailed specs
-                for monitor in self.wmi_conn.Win32_DesktopMonitor():
-                    monitor_info = {
-                        "name": monitor.Name,
-                        "device_id": monitor.DeviceID,
-                        "pnp_device_id": monitor.PNPDeviceID,
-                        "screen_width": monitor.ScreenWidth,
-                        "screen_height": monitor.ScreenHeight,
-                        "status": monitor.Status,
-                        "availability": monitor.Availability,
-                        "monitor_type": monitor.MonitorType,
-                    }
-                    display_data["monitors"].append(monitor_info)
-
-                # Graphics card information with detailed specs
-                for gpu in self.wmi_conn.Win32_VideoController():
-                    gpu_info = {
-                        "name": gpu.Name,
-                        "device_id": gpu.DeviceID,
-                        "adapter_ram": gpu.AdapterRAM,
-                        "driver_version": gpu.DriverVersion,
-                        "driver_date": str(gpu.DriverDate),
-                        "status": gpu.Status,
-                        "current_refresh_rate": gpu.CurrentRefreshRate,
-                        "current_horizontal_resolution": gpu.CurrentHorizontalResolution,
-                        "current_vertical_resolution": gpu.CurrentVerticalResolution,
-                    }
-                    display_data["graphics_cards"].append(gpu_info)
+                # Monitor and graphics card specs come from the inventory cache;
+                # status, resolution and refresh rate are queried live
+                display_data["monitors"] = self.inventory.rows("monitors")
+                display_data["graphics_cards"] = self.inventory.rows("graphics_cards")
+            elif self._linux:
+                display_data.update(linux_collectors.display_info())
 
         except Exception as e:
-            display_data["errors"].append(f"WMI display info error: {str(e)}")
+            display_data["errors"].append(f"Display info error: {str(e)}")
 
         # Enhanced GPU utilization using GPUtil
         if GPU_AVAILABLE:
@@ -243,22 +601,9 @@ class HardwareMonitor:
     def get_cpu_info(self):
         """Get detailed CPU information and diagnostics"""
         try:
-            cpu_info = {
-                "physical_cores": psutil.cpu_count(logical=False),
-                "total_cores": psutil.cpu_count(logical=True),
-                "usage_per_core": psutil.cpu_percent(percpu=True, interval=1),
-                "total_usage": psutil.cpu_percent(interval=1),
-            }
-            
-            # Add frequency if available
-            freq = psutil.cpu_freq()
-            if freq:
-                cpu_info.update({
-                    "current_frequency": freq.current,
-                    "min_frequency": freq.min,
-                    "max_frequency": freq.max
-                })
-            
+            # One shared measurement window instead of two back-to-back 1s samples
+            cpu_info = dict(get_cpu_sampler().sample())
+            cpu_info.pop("sampled_at", None)
             return cpu_info
         except Exception as e:
             return {"error": str(e)}
@@ -311,35 +656,32 @@ class HardwareMonitor:
             return {"error": str(e)}
 
     def get_network_info(self):
-        """Get basic network information"""
+        """Get current per-interface network throughput, error and drop rates"""
         try:
-            network_stats = psutil.net_io_counters()
-            return {
-                "bytes_sent": network_stats.bytes_sent,
-                "bytes_recv": network_stats.bytes_recv,
-                "packets_sent": network_stats.packets_sent,
-                "packets_recv": network_stats.packets_recv,
-                "errors_in": network_stats.errin,
-                "errors_out": network_stats.errout,
-                "dropin": network_stats.dropin if hasattr(network_stats, 'dropin') else 0,
-                "dropout": network_stats.dropout if hasattr(network_stats, 'dropout') else 0,
-            }
+            # Rates over the window since the previous sample, not totals since boot
+            return get_rate_engine().network()
+        except Exception as e:
+            return {"error": str(e)}
+
+    def get_disk_io_info(self):
+        """Get current per-disk throughput, IOPS and average latency"""
+        try:
+            return get_rate_engine().disk()
         except Exception as e:
             return {"error": str(e)}
 
     def get_top_processes(self, limit=10):
         """Get top processes by CPU usage"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status']):
-                try:
-                    processes.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-            
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x.get('cpu_percent', 0), reverse=True)
-            return processes[:limit]
+            # Persistent table: primed handles give real CPU deltas between calls
+            return get_process_table().top("cpu", limit)
+        except Exception as e:
+            return {"error": str(e)}
+
+    def get_process_rankings(self, limit=10):
+        """Get top processes by CPU, memory and I/O rate (one table refresh)"""
+        try:
+            return get_process_table().rankings(limit)
         except Exception as e:
             return {"error": str(e)}
 
@@ -350,15 +692,12 @@ class HardwareMonitor:
         if self.wmi_conn:
             try:
                 # Get sound devices
-                for device in self.wmi_conn.Win32_SoundDevice():
-                    device_info = {
-                        "name": device.Name,
-                        "description": device.Description,
-                        "manufacturer": device.Manufacturer,
-                        "device_id": device.DeviceID,
-                        "status": device.Status,
-                    }
-                    audio_data["devices"].append(device_info)
+                audio_data["devices"] = self.inventory.rows("sound_devices")
+            except Exception as e:
+                audio_data["errors"].append(f"Audio device error: {str(e)}")
+        elif self._linux:
+            try:
+                audio_data.update(linux_collectors.audio_info())
             except Exception as e:
                 audio_data["errors"].append(f"Audio device error: {str(e)}")
         
@@ -366,20 +705,24 @@ class HardwareMonitor:
 
     def get_detailed_network_info(self):
         """Get comprehensive network adapter and connectivity information"""
-        network_data = {"adapters": [], "connections": [], "errors": []}
+        network_data = {"adapters": [], "connections": {}, "errors": []}
         
         try:
-            # Basic network connections
-            connections = psutil.net_connections()
-            for conn in connections[:20]:
-                network_data["connections"].append({
-                    "family": str(conn.family),
-                    "type": str(conn.type),
-                    "local_address": conn.laddr,
-                    "remote_address": conn.raddr,
-                    "status": conn.status,
-                    "pid": conn.pid
+            # Link state per adapter
+            for name, stats in psutil.net_if_stats().items():
+                network_data["adapters"].append({
+                    "name": name,
+                    "is_up": stats.isup,
+                    "speed_mbps": stats.speed,
+                    "mtu": stats.mtu,
+                    "duplex": getattr(stats.duplex, "name", str(stats.duplex))
                 })
+        except Exception as e:
+            network_data["errors"].append(f"Network adapter error: {str(e)}")
+        
+        try:
+            # Aggregate the socket table instead of listing arbitrary sockets
+            network_data["connections"] = summarize_connections(psutil.net_connections())
         except Exception as e:
             network_data["errors"].append(f"Network connections error: {str(e)}")
         
@@ -392,15 +735,12 @@ class HardwareMonitor:
         if self.wmi_conn:
             try:
                 # Get physical disk drives
-                for drive in self.wmi_conn.Win32_DiskDrive():
-                    drive_info = {
-                        "model": drive.Model,
-                        "size": drive.Size,
-                        "interface_type": drive.InterfaceType,
-                        "media_type": drive.MediaType,
-                        "status": drive.Status,
-                    }
-                    storage_data["drives"].append(drive_info)
+                storage_data["drives"] = self.inventory.rows("disk_drives")
+            except Exception as e:
+                storage_data["errors"].append(f"Storage device error: {str(e)}")
+        elif self._linux:
+            try:
+                storage_data.update(linux_collectors.storage_info())
             except Exception as e:
                 storage_data["errors"].append(f"Storage device error: {str(e)}")
         
@@ -412,12 +752,12 @@ class HardwareMonitor:
         
         if self.wmi_conn:
             try:
-                for usb_device in self.wmi_conn.Win32_USBControllerDevice():
-                    device_info = {
-                        "dependent": str(usb_device.Dependent),
-                        "antecedent": str(usb_device.Antecedent)
-                    }
-                    usb_data["devices"].append(device_info)
+                usb_data["devices"] = self.inventory.rows("usb_devices")
+            except Exception as e:
+                usb_data["errors"].append(f"USB device error: {str(e)}")
+        elif self._linux:
+            try:
+                usb_data.update(linux_collectors.usb_info())
             except Exception as e:
                 usb_data["errors"].append(f"USB device error: {str(e)}")
         
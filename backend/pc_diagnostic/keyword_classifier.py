@@ -0,0 +1,142 @@
+"""
+Keyword Classifier
+
+Compiles every keyword of every category into lookup tables once, then
+classifies a text in a single pass: the text is split into words, which are
+counted and matched against the tables by hashing. Matching is on whole
+words, so short keywords no longer match inside other words ("ram" in
+"program"), and the per-text Python work grows with the number of distinct
+words rather than with the text length.
+
+Keyword syntax:
+    "disk"          whole word, optional plural ("disks")
+    "hard drive"    phrase; any run of whitespace/punctuation between the words
+    "overheat*"     prefix ("overheats", "overheating", "overheated"); only for
+                    stems no unrelated word starts with ("hang*" would match "hangar")
+    ("screen", 0.5) keyword with a weight (default 1.0)
+"""
+
+import string
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+Keyword = Union[str, Tuple[str, float]]
+
+# Everything except letters, digits and apostrophes separates words
+# ("hard-drive" and "hard drive" both match the phrase "hard drive");
+# apostrophes stay for contractions ("won't"), possessive 's is dropped
+_SEPARATORS = str.maketrans({char: " " for char in string.punctuation + string.whitespace if char != "'"})
+
+
+def _plurals(word: str) -> Tuple[str, ...]:
+    return (word, word + "s", word + "es") if word[-1].isalpha() else (word,)
+
+
+def _words(text: str) -> List[str]:
+    words = []
+    for word in text.lower().replace("\u2019", "'").translate(_SEPARATORS).split():
+        # Quotes around a word and possessives ("disk's", "drives'") don't change it
+        word = word.strip("'")
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word:
+            words.append(word)
+    return words
+
+
+class KeywordClassifier:
+    """Weighted multi-category keyword matcher backed by precompiled hash tables"""
+
+    def __init__(self, categories: Dict[str, Iterable[Keyword]], default: Optional[str] = None,
+                 threshold: float = 1.0):
+        """
+        Args:
+            categories: Category -> keywords (see module docstring for syntax).
+                Declaration order is the order classify() reports categories in.
+            default: Category returned by classify() when nothing reaches the threshold
+            threshold: Minimum summed weight for a category to be reported
+        """
+        self.categories = list(categories)
+        self.default = default
+        self.threshold = threshold
+
+        # Keyword -> [(category, weight)]; a keyword may feed several categories
+        self._targets: Dict[str, List[Tuple[str, float]]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                word, weight = (keyword, 1.0) if isinstance(keyword, str) else keyword
+                word = " ".join(_words(word.rstrip("*"))) + ("*" if word.endswith("*") else "")
+                self._targets.setdefault(word, []).append((category, weight))
+
+        # Word form -> keyword, for single words (plural forms included)
+        self._exact: Dict[str, str] = {}
+        # Prefix -> keyword, probed longest first
+        self._prefixes: Dict[str, str] = {}
+        # First word -> [(keyword, forms to search for in the normalized text)]
+        self._phrases: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {}
+        for keyword in self._targets:
+            stem = keyword.rstrip("*")
+            if " " in stem:
+                forms = (f" {stem}",) if keyword.endswith("*") else tuple(f" {form} " for form in _plurals(stem))
+                self._phrases.setdefault(stem.split()[0], []).append((keyword, forms))
+            elif keyword.endswith("*"):
+                self._prefixes[stem] = keyword
+            else:
+                for form in _plurals(stem):
+                    self._exact.setdefault(form, keyword)
+        self._prefix_lengths = sorted({len(stem) for stem in self._prefixes}, reverse=True)
+
+    def _keyword_counts(self, text: str) -> Dict[str, int]:
+        """Keyword -> number of occurrences in the text"""
+        words = _words(text)
+        counts = Counter(words)
+        found: Dict[str, int] = {}
+
+        for word, count in counts.items():
+            keyword = self._exact.get(word)
+            if keyword is None:
+                for length in self._prefix_lengths:
+                    if length <= len(word):
+                        keyword = self._prefixes.get(word[:length])
+                        if keyword is not None:
+                            break
+            if keyword is not None:
+                found[keyword] = found.get(keyword, 0) + count
+
+        # Phrases are only searched for when their first word occurs at all
+        candidates = [entry for word in counts if word in self._phrases for entry in self._phrases[word]]
+        if candidates:
+            normalized = f" {' '.join(words)} "
+            for keyword, forms in candidates:
+                count = sum(normalized.count(form) for form in forms)
+                if count:
+                    found[keyword] = count
+        return found
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Category -> keywords matched in the text"""
+        matched: Dict[str, List[str]] = {}
+        for keyword in self._keyword_counts(text):
+            for category, _ in self._targets[keyword]:
+                matched.setdefault(category, []).append(keyword)
+        return matched
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Category -> summed weight of the keyword occurrences in the text"""
+        totals: Dict[str, float] = {}
+        for keyword, count in self._keyword_counts(text).items():
+            for category, weight in self._targets[keyword]:
+                totals[category] = totals.get(category, 0.0) + weight * count
+        return totals
+
+    def classify(self, text: str) -> List[str]:
+        """Categories whose score reaches the threshold, in declaration order"""
+        scores = self.scores(text)
+        labels = [category for category in self.categories if scores.get(category, 0.0) >= self.threshold]
+        if not labels and self.default is not None:
+            return [self.default]
+        return labels
+
+    def matches(self, text: str, category: str) -> bool:
+        """True if the category's score reaches the threshold"""
+        return self.scores(text).get(category, 0.0) >= self.threshold
@@ -0,0 +1,195 @@
+"""
+Linux sysfs/procfs Collectors
+
+Native equivalents of the WMI-backed issue-specific collectors: DRM
+connectors and modes (/sys/class/drm), ALSA cards (/proc/asound), block
+devices with their queue settings and I/O stats (/sys/block) and USB
+devices (/sys/bus/usb/devices). Everything is read straight from the
+kernel's pseudo-files, no subprocesses.
+
+Every function takes a `root` argument so tests can point it at a fake tree.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+# Fields of /sys/block/<dev>/stat, see Documentation/block/stat.rst
+BLOCK_STAT_FIELDS = (
+    "read_ios", "read_merges", "read_sectors", "read_ticks_ms",
+    "write_ios", "write_merges", "write_sectors", "write_ticks_ms",
+    "in_flight", "io_ticks_ms", "time_in_queue_ms",
+    "discard_ios", "discard_merges", "discard_sectors", "discard_ticks_ms",
+    "flush_ios", "flush_ticks_ms",
+)
+
+# Virtual block devices that say nothing about the hardware. Software RAID
+# (md*) and optical drives (sr*) stay: a degraded array or a failing drive is
+# a storage fault worth reporting
+VIRTUAL_BLOCK_PREFIXES = ("loop", "ram", "zram", "dm-", "nbd")
+
+
+def _path(root: str, *parts: str) -> str:
+    return os.path.join(root, *parts)
+
+
+def _read(path: str) -> Optional[str]:
+    """Whole contents of a sysfs/procfs file, stripped, or None if unreadable"""
+    try:
+        with open(path, "r", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_int(path: str) -> Optional[int]:
+    value = _read(path)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _listdir(path: str) -> List[str]:
+    try:
+        return sorted(os.listdir(path))
+    except OSError:
+        return []
+
+
+def _link_name(path: str) -> Optional[str]:
+    """Basename of a symlink target (e.g. the driver bound to a device)"""
+    try:
+        return os.path.basename(os.readlink(path))
+    except OSError:
+        return None
+
+
+def display_info(root: str = "/") -> Dict[str, Any]:
+    """GPUs (DRM cards) and their connectors with status and modes"""
+    drm = _path(root, "sys/class/drm")
+    cards, connectors = [], []
+    for entry in _listdir(drm):
+        if re.fullmatch(r"card\d+", entry):
+            device = _path(drm, entry, "device")
+            cards.append({
+                "name": entry,
+                "driver": _link_name(_path(device, "driver")),
+                "vendor_id": _read(_path(device, "vendor")),
+                "device_id": _read(_path(device, "device")),
+                "boot_vga": _read_int(_path(device, "boot_vga")) == 1,
+            })
+        elif re.fullmatch(r"card\d+-.+", entry):
+            base = _path(drm, entry)
+            modes = (_read(_path(base, "modes")) or "").splitlines()
+            card, connector = entry.split("-", 1)
+            connectors.append({
+                "name": connector,
+                "card": card,
+                "status": _read(_path(base, "status")),
+                "enabled": _read(_path(base, "enabled")),
+                "dpms": _read(_path(base, "dpms")),
+                # The kernel lists the preferred mode first
+                "preferred_mode": modes[0] if modes else None,
+                "modes": modes[:10],
+                "mode_count": len(modes),
+            })
+    return {"graphics_cards": cards, "monitors": connectors}
+
+
+def _parse_asound_cards(text: str) -> List[Dict[str, Any]]:
+    """Parse /proc/asound/cards: ' 0 [PCH            ]: HDA-Intel - HDA Intel PCH' + long name line"""
+    cards = []
+    header = re.compile(r"^\s*(\d+)\s+\[(.+?)\s*\]:\s*(\S+)\s+-\s+(.*)$")
+    for line in text.splitlines():
+        match = header.match(line)
+        if match:
+            cards.append({
+                "index": int(match.group(1)),
+                "id": match.group(2),
+                "driver": match.group(3),
+                "name": match.group(4).strip(),
+            })
+        elif cards and line.strip():
+            cards[-1]["long_name"] = line.strip()
+    return cards
+
+
+def audio_info(root: str = "/") -> Dict[str, Any]:
+    """ALSA sound cards with their playback/capture PCM devices"""
+    asound = _path(root, "proc/asound")
+    devices = []
+    for card in _parse_asound_cards(_read(_path(asound, "cards")) or ""):
+        entries = _listdir(_path(asound, f"card{card['index']}"))
+        card["playback_devices"] = sum(1 for e in entries if re.fullmatch(r"pcm\d+p", e))
+        card["capture_devices"] = sum(1 for e in entries if re.fullmatch(r"pcm\d+c", e))
+        devices.append(card)
+    return {"devices": devices}
+
+
+def _block_stat(text: Optional[str]) -> Dict[str, int]:
+    values = (text or "").split()
+    return {name: int(value) for name, value in zip(BLOCK_STAT_FIELDS, values)}
+
+
+def storage_info(root: str = "/", include_virtual: bool = False) -> Dict[str, Any]:
+    """Block devices with rotational flag, queue settings, I/O stats and partitions"""
+    block = _path(root, "sys/block")
+    drives, partitions = [], []
+    for name in _listdir(block):
+        if not include_virtual and name.startswith(VIRTUAL_BLOCK_PREFIXES):
+            continue
+        base = _path(block, name)
+        rotational = _read_int(_path(base, "queue", "rotational"))
+        scheduler = _read(_path(base, "queue", "scheduler")) or ""
+        selected = re.search(r"\[(.+?)\]", scheduler)
+        sectors = _read_int(_path(base, "size")) or 0
+        drives.append({
+            "name": name,
+            "model": _read(_path(base, "device", "model")),
+            "vendor": _read(_path(base, "device", "vendor")),
+            "size": sectors * 512,
+            "media_type": "hdd" if rotational == 1 else "ssd" if rotational == 0 else None,
+            "rotational": rotational == 1 if rotational is not None else None,
+            "removable": _read_int(_path(base, "removable")) == 1,
+            "read_only": _read_int(_path(base, "ro")) == 1,
+            "scheduler": selected.group(1) if selected else scheduler or None,
+            "queue_depth": _read_int(_path(base, "device", "queue_depth")),
+            "nr_requests": _read_int(_path(base, "queue", "nr_requests")),
+            "state": _read(_path(base, "device", "state")),
+            "stat": _block_stat(_read(_path(base, "stat"))),
+        })
+        for child in _listdir(base):
+            if child.startswith(name) and os.path.exists(_path(base, child, "partition")):
+                partitions.append({
+                    "name": child,
+                    "disk": name,
+                    "size": (_read_int(_path(base, child, "size")) or 0) * 512,
+                })
+    return {"drives": drives, "partitions": partitions}
+
+
+def usb_info(root: str = "/") -> Dict[str, Any]:
+    """USB devices (not interfaces) with IDs, names, speed and topology"""
+    usb = _path(root, "sys/bus/usb/devices")
+    devices = []
+    for entry in _listdir(usb):
+        # Interfaces are named "<device>:<config>.<interface>"
+        if ":" in entry:
+            continue
+        base = _path(usb, entry)
+        devices.append({
+            "path": entry,
+            "bus": _read_int(_path(base, "busnum")),
+            "device_number": _read_int(_path(base, "devnum")),
+            "vendor_id": _read(_path(base, "idVendor")),
+            "product_id": _read(_path(base, "idProduct")),
+            "manufacturer": _read(_path(base, "manufacturer")),
+            "product": _read(_path(base, "product")),
+            "speed_mbps": _read(_path(base, "speed")),
+            "usb_version": _read(_path(base, "version")),
+            "device_class": _read(_path(base, "bDeviceClass")),
+            "hub_ports": _read_int(_path(base, "maxchild")) or 0,
+            "driver": _link_name(_path(base, "driver")),
+        })
+    return {"devices": devices}
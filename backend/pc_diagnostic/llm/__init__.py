@@ -6,5 +6,7 @@ Provides an abstraction layer for different LLM providers (Gemini, Local LLaMA,
 
 from .factory import get_llm_provider
 from .base import LLMProvider
+from .registry import get_provider_registry
+from .completion_cache import get_completion_cache
 
-__all__ = ['get_llm_provider', 'LLMProvider']
+__all__ = ['get_llm_provider', 'get_provider_registry', 'get_completion_cache', 'LLMProvider']
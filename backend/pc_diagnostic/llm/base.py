@@ -4,8 +4,9 @@ Base LLM Provider Interface
 Defines the abstract interface that all LLM providers must implement.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 
 
 class LLMProvider(ABC):
@@ -36,6 +37,53 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def acomplete(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4000) -> Dict[str, Any]:
+        """
+        Async version of complete() for async views.
+        
+        Providers with a native async client override this so waiting on the
+        model holds no thread; the default runs complete() in a worker thread.
+        
+        Returns:
+            Same dictionary as complete()
+        """
+        return await asyncio.to_thread(self.complete, prompt, temperature, max_tokens)
+    
+    def complete_stream(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4000) -> Iterator[Dict[str, Any]]:
+        """
+        Generate a completion, yielding the text as it is produced.
+        
+        Providers that can stream override this; the default yields the
+        whole complete() result as a single chunk.
+        
+        Args:
+            prompt: The input prompt for the LLM
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
+            
+        Yields:
+            Dictionaries containing:
+                - 'content': Newly generated text (may be empty)
+                - 'finish_reason': None until the final chunk
+                - 'model', 'usage': Set on the final chunk
+        """
+        result = self.complete(prompt, temperature=temperature, max_tokens=max_tokens)
+        yield {
+            'content': result['content'],
+            'finish_reason': result['finish_reason'],
+            'model': result['model'],
+            'usage': result['usage']
+        }
+    
+    def close(self):
+        """
+        Release resources held by the provider (connection pools, ...).
+        
+        Called when the provider registry replaces this instance; the default
+        holds nothing to release.
+        """
+        pass
+    
     @abstractmethod
     def get_provider_name(self) -> str:
         """
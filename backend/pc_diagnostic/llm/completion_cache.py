@@ -0,0 +1,363 @@
+"""
+LLM Completion Cache
+
+Users often ask about the same issue on the same machine again within a
+few minutes. The telemetry sent with the repeat differs only by noise: CPU
+at 37% instead of 41%, a few MB more memory in use. This cache lets such
+repeats reuse the earlier completion instead of another LLM round trip.
+
+The cache key combines:
+    - the provider and model
+    - the issue text, normalized (case, punctuation and whitespace ignored)
+    - a telemetry fingerprint: the machine, the telemetry sections present,
+      and load/temperature readings bucketed to LLM_CACHE_BUCKET_PERCENT
+      (5% of usage, 5 degrees C), plus any hardware anomalies
+
+Telemetry without a machine identity (device_id or system_info.hostname)
+is never cached, so different machines cannot share an answer.
+
+Entries live in an in-memory LRU with a TTL. If LLM_CACHE_DIR is set they
+are also written there as JSON files, so restarts and other worker
+processes share them.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .base import LLMProvider
+
+# Bump when the prompt format changes so old disk entries stop matching
+CACHE_VERSION = 1
+
+# Top-level telemetry keys that describe the collection, not the machine
+COLLECTION_KEYS = frozenset([
+    "collector_status", "cached_collectors", "timed_out_collectors", "skipped_collectors",
+    "issue_types_detected",
+])
+
+# Fields every completion result has (the views read them from cache hits)
+RESULT_KEYS = ("content", "model", "finish_reason", "usage", "metadata")
+
+# (section, key) readings compared by bucket instead of exact value
+BUCKETED_READINGS = [
+    ("cpu", "total_usage"),
+    ("cpu", "temperature"),
+    ("memory", "percentage"),
+    ("memory", "swap_percentage"),
+]
+
+
+def normalize_issue_text(text: str) -> str:
+    """Lowercase the issue text and drop punctuation and extra whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text).lower()).split())
+
+
+def _bucket(value: Any, size: float) -> Optional[int]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value // size)
+
+
+def telemetry_fingerprint(telemetry_data: Dict[str, Any], bucket: float = 5.0) -> Dict[str, Any]:
+    """
+    Noise-tolerant summary of the telemetry, used in the cache key.
+
+    Args:
+        telemetry_data: Telemetry as collected for the prompt
+        bucket: Bucket size for usage percentages and temperatures
+
+    Returns:
+        JSON-serializable dict; telemetry that differs only within buckets
+        gives the same fingerprint
+    """
+    if not isinstance(telemetry_data, dict):
+        return {}
+    system_info = telemetry_data.get("system_info")
+    machine = telemetry_data.get("device_id") or (
+        system_info.get("hostname") if isinstance(system_info, dict) else None
+    )
+    sections = sorted(
+        key for key, value in telemetry_data.items()
+        if isinstance(value, (dict, list)) and key not in COLLECTION_KEYS
+    )
+
+    readings = {}
+    for section, key in BUCKETED_READINGS:
+        values = telemetry_data.get(section)
+        if isinstance(values, dict):
+            readings[f"{section}.{key}"] = _bucket(values.get(key), bucket)
+
+    disks = telemetry_data.get("disk")
+    if isinstance(disks, list):
+        readings["disk"] = sorted(
+            (str(disk.get("mountpoint")), _bucket(disk.get("percentage"), bucket))
+            for disk in disks if isinstance(disk, dict)
+        )
+
+    display = telemetry_data.get("display")
+    if isinstance(display, dict):
+        readings["gpus"] = [
+            (_bucket(card.get("load"), bucket), _bucket(card.get("temperature"), bucket))
+            for card in display.get("graphics_cards", []) if isinstance(card, dict)
+        ]
+
+    issue_specific = telemetry_data.get("issue_specific")
+    anomalies = issue_specific.get("anomalies", []) if isinstance(issue_specific, dict) else []
+    return {
+        "machine": machine,
+        "sections": sections,
+        "readings": readings,
+        "anomalies": sorted(
+            f"{finding.get('issue_type')}:{finding.get('kind')}" for finding in anomalies if isinstance(finding, dict)
+        ),
+    }
+
+
+class CompletionCache:
+    """Thread-safe LRU + TTL cache of LLM completions with an optional disk tier"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 600.0, disk_dir: Optional[str] = None,
+                 bucket: float = 5.0, disk_max_entries: int = 2048):
+        """
+        Args:
+            max_entries: Completions kept in memory (0 disables the cache)
+            ttl: Seconds a completion stays valid
+            disk_dir: Directory for the on-disk tier (None for memory only)
+            bucket: Bucket size for the telemetry fingerprint
+            disk_max_entries: Files kept in disk_dir before the oldest are pruned
+        """
+        self.max_entries = max(int(max_entries), 0)
+        self.ttl = float(ttl)
+        self.disk_dir = disk_dir
+        self.bucket = float(bucket)
+        self.disk_max_entries = max(int(disk_max_entries), 1)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, result)
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "stores": 0, "evictions": 0, "expirations": 0, "disk_errors": 0, "skipped": 0,
+        }
+        self._disk_writes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def key(self, provider: LLMProvider, input_text: str, telemetry_data: Dict[str, Any],
+            **params) -> Optional[str]:
+        """
+        Cache key for a diagnosis.
+
+        Args:
+            provider: Provider that will answer (its name and model are part of the key)
+            input_text: The user's issue description
+            telemetry_data: Telemetry included in the prompt
+            **params: Completion parameters (temperature, max_tokens, ...)
+
+        Returns:
+            The key, or None if the telemetry does not identify the machine
+            (get() and put() skip the cache for a None key)
+        """
+        fingerprint = telemetry_fingerprint(telemetry_data, self.bucket)
+        if not fingerprint.get("machine"):
+            return None
+        material = {
+            "version": CACHE_VERSION,
+            "provider": provider.get_provider_name(),
+            "model": getattr(provider, "model_name", None) or getattr(provider, "model_id", None),
+            "issue": normalize_issue_text(input_text),
+            "telemetry": fingerprint,
+            "params": params,
+        }
+        encoded = json.dumps(material, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Cached completion for `key`, or None.
+
+        The result is a copy of what was stored, plus a "cache" entry with
+        the tier it came from and its age.
+        """
+        if not self.enabled:
+            return None
+        if key is None:
+            with self._lock:
+                self._counters["skipped"] += 1
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    self._counters["memory_hits"] += 1
+                    return self._hit(entry, "memory", now)
+                del self._entries[key]
+                self._counters["expirations"] += 1
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._counters["disk_hits"] += 1
+            self._remember(key, entry)
+        return self._hit(entry, "disk", now)
+
+    def put(self, key: Optional[str], result: Dict[str, Any]):
+        """Store a completion (results without content, or a None key, are not cached)"""
+        if not self.enabled or key is None or not result.get("content"):
+            return
+        entry = (time.time(), {name: value for name, value in result.items() if name != "cache"})
+        with self._lock:
+            self._counters["stores"] += 1
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self):
+        """Drop every cached completion, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    self._remove(os.path.join(self.disk_dir, name))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "enabled": self.enabled,
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "disk_dir": self.disk_dir,
+        })
+        return stats
+
+    def _hit(self, entry: tuple, tier: str, now: float) -> Dict[str, Any]:
+        result = json.loads(json.dumps(entry[1], default=str))
+        result["cache"] = {"hit": True, "tier": tier, "age_seconds": round(now - entry[0], 1)}
+        return result
+
+    def _remember(self, key: str, entry: tuple):
+        # Caller holds the lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[tuple]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self._count_disk_error(f"read {path}: {str(e)}")
+            return None
+        stored_at = stored.get("stored_at") if isinstance(stored, dict) else None
+        result = stored.get("result") if isinstance(stored, dict) else None
+        if (isinstance(stored_at, bool) or not isinstance(stored_at, (int, float))
+                or not isinstance(result, dict) or not all(name in result for name in RESULT_KEYS)):
+            self._count_disk_error(f"read {path}: not a cache entry")
+            self._remove(path)
+            return None
+        if now - stored_at >= self.ttl:
+            self._remove(path)
+            with self._lock:
+                self._counters["expirations"] += 1
+            return None
+        return stored_at, result
+
+    def _write_disk(self, key: str, entry: tuple):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": entry[0], "result": entry[1]}, f, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            self._remove(tmp_path)
+            self._count_disk_error(f"write {path}: {str(e)}")
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % 64 == 0
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Delete expired files, then the oldest ones over disk_max_entries"""
+        now = time.time()
+        files: List[tuple] = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime >= self.ttl:
+                self._remove(path)
+            else:
+                files.append((mtime, path))
+        files.sort()
+        for _, path in files[:max(len(files) - self.disk_max_entries, 0)]:
+            self._remove(path)
+
+    def _count_disk_error(self, message: str):
+        with self._lock:
+            self._counters["disk_errors"] += 1
+        print(f"⚠️ [LLM cache] Disk tier error, {message}")
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    """Get (or lazily create) the process-wide completion cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+            _cache = CompletionCache(
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")) if enabled else 0,
+                ttl=float(os.getenv("LLM_CACHE_TTL", "600")),
+                disk_dir=os.getenv("LLM_CACHE_DIR") or None,
+                bucket=float(os.getenv("LLM_CACHE_BUCKET_PERCENT", "5")),
+                disk_max_entries=int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "2048")),
+            )
+        return _cache
@@ -7,8 +7,11 @@ Creates and returns the appropriate LLM provider based on environment configurat
 import os
 from typing import Optional
 from .base import LLMProvider
-from .gemini import GeminiProvider
-from .local_llama import LocalLlamaProvider
+from .registry import get_provider_registry
+from .completion_cache import get_completion_cache
+
+# LLM_PROVIDER values that select the local llama.cpp server
+LOCAL_ALIASES = ("local", "llama")
 
 
 def get_llm_provider() -> LLMProvider:
@@ -17,6 +20,9 @@ def get_llm_provider() -> LLMProvider:
     
     Determines which provider to use based on the LLM_PROVIDER environment variable.
     Supports automatic fallback if the primary provider fails to initialize.
+    Providers come from the process-wide registry: each is built once and
+    reused until its configuration changes, and providers that recently
+    failed are skipped during their cooldown.
     
     Supported providers:
         - "gemini": Google Gemini (via Google AI Studio)
@@ -32,30 +38,25 @@ def get_llm_provider() -> LLMProvider:
         3. Let calling code handle final mock fallback
     """
     provider_name = os.getenv("LLM_PROVIDER", "local").lower()
+    registry = get_provider_registry()
     
-    print(f"[LLM] Provider requested: {provider_name}")
+    chain = ["local"]
+    if provider_name in registry and provider_name not in LOCAL_ALIASES:
+        chain.insert(0, provider_name)
     
-    # Try to initialize the requested provider
-    if provider_name == "gemini":
+    last_error: Optional[Exception] = None
+    for name in chain:
+        if not registry.available(name):
+            print(f"[FALLBACK] Skipping {name} provider while it cools down")
+            continue
         try:
-            provider = GeminiProvider()
-            print(f"[SUCCESS] Using provider: {provider.get_provider_name()}")
-            return provider
+            return registry.get(name)
         except Exception as e:
-            print(f"[WARNING] Failed to initialize Gemini provider: {str(e)}")
-            print(f"[FALLBACK] Falling back to Local LLaMA provider...")
-            # Fall through to local provider
+            last_error = e
+            print(f"[WARNING] Failed to initialize {name} provider: {str(e)}")
     
-    # Default or fallback: Local LLaMA
-    try:
-        provider = LocalLlamaProvider()
-        print(f"[SUCCESS] Using provider: {provider.get_provider_name()}")
-        return provider
-    except Exception as e:
-        # This shouldn't fail during initialization, but if it does,
-        # re-raise so calling code knows to use mock analysis
-        print(f"[ERROR] Failed to initialize Local LLaMA provider: {str(e)}")
-        raise
+    # Let calling code fall back to mock analysis
+    raise RuntimeError(f"No LLM provider available: {last_error or 'all providers cooling down'}")
 
 
 def get_provider_info() -> dict:
@@ -70,7 +71,9 @@ def get_provider_info() -> dict:
     info = {
         "configured_provider": provider_name,
         "available_providers": ["gemini", "local"],
-        "fallback_enabled": True
+        "fallback_enabled": True,
+        "providers": get_provider_registry().status(),
+        "completion_cache": get_completion_cache().stats()
     }
     
     if provider_name == "gemini":
@@ -5,7 +5,7 @@ Implements LLM provider interface using Google's Gemini API via Google AI Studio
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 import google.generativeai as genai
 from .base import LLMProvider
 
@@ -63,32 +63,81 @@ class GeminiProvider(LLMProvider):
                 generation_config=generation_config
             )
             
-            # Extract response text
-            content = response.text
-            
-            # Build response in OpenAI-compatible format
-            return {
-                'content': content,
-                'model': self.model_name,
-                'finish_reason': 'stop',  # Gemini doesn't provide detailed finish reasons
-                'usage': {
-                    'prompt_tokens': 0,  # Gemini API doesn't expose token counts in free tier
-                    'completion_tokens': 0,
-                    'total_tokens': 0
-                },
-                'metadata': {
-                    'provider': 'Google Gemini',
-                    'id': '',
-                    'created': '',
-                    'object': 'chat.completion',
-                    'system_fingerprint': ''
-                }
-            }
+            return self._build_result(response.text)
             
         except Exception as e:
             # Re-raise with more context
             raise Exception(f"Gemini API error: {str(e)}")
     
+    def _build_result(self, content: str) -> Dict[str, Any]:
+        """Completion dict in the standardized (OpenAI-compatible) format"""
+        # Build response in OpenAI-compatible format
+        return {
+            'content': content,
+            'model': self.model_name,
+            'finish_reason': 'stop',  # Gemini doesn't provide detailed finish reasons
+            'usage': {
+                'prompt_tokens': 0,  # Gemini API doesn't expose token counts in free tier
+                'completion_tokens': 0,
+                'total_tokens': 0
+            },
+            'metadata': {
+                'provider': 'Google Gemini',
+                'id': '',
+                'created': '',
+                'object': 'chat.completion',
+                'system_fingerprint': ''
+            }
+        }
+    
+    async def acomplete(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4000) -> Dict[str, Any]:
+        """
+        Generate a completion from an async view by running complete() in a worker thread.
+        
+        generate_content_async is not used: google-generativeai keeps one
+        process-wide grpc.aio client, bound to the event loop that first used
+        it, and under WSGI Django runs each async request in a new loop that
+        is closed afterwards.
+        
+        Returns:
+            Dictionary with completion results
+        """
+        return await super().acomplete(prompt, temperature=temperature, max_tokens=max_tokens)
+    
+    def complete_stream(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4000) -> Iterator[Dict[str, Any]]:
+        """
+        Generate a completion using Gemini's streaming API, yielding text as it arrives.
+        
+        Yields:
+            Chunk dictionaries, see LLMProvider.complete_stream
+        """
+        try:
+            generation_config = genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+            )
+            response = self.model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                stream=True
+            )
+            for chunk in response:
+                if chunk.text:
+                    yield {'content': chunk.text, 'finish_reason': None}
+        except Exception as e:
+            raise Exception(f"Gemini API error: {str(e)}")
+        
+        yield {
+            'content': '',
+            'finish_reason': 'stop',
+            'model': self.model_name,
+            'usage': {
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'total_tokens': 0
+            }
+        }
+    
     def get_provider_name(self) -> str:
         """Get the provider name."""
         return "Google Gemini"
@@ -6,11 +6,21 @@ This provider connects to a locally-running LLM server using OpenAI-compatible A
 """
 
 import os
+import json
+import asyncio
 import requests
 import urllib3
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Iterator
 from .base import LLMProvider
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 # Disable SSL warnings for cloudflare tunnels
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -28,11 +38,50 @@ class LocalLlamaProvider(LLMProvider):
         # Get configuration from environment or use defaults
         self.api_base = os.getenv("LLAMA_API_BASE", "http://127.0.0.1:1234")
         self.model_id = os.getenv("LLAMA_MODEL_ID", "reasoning-llama-3.1-cot-re1-nmt-v2-orpo-i1")
+        self.pool_size = int(os.getenv("LLAMA_POOL_SIZE", "4"))
+        # (connect, read): fail fast if the server is down, but give reasoning
+        # models up to 10 minutes to answer
+        self.timeout = (
+            float(os.getenv("LLAMA_CONNECT_TIMEOUT", "10")),
+            float(os.getenv("LLAMA_READ_TIMEOUT", "600"))
+        )
+        self.max_retries = int(os.getenv("LLAMA_MAX_RETRIES", "2"))
+        self.session = self._create_session()
+        # httpx clients for acomplete, one per event loop (a client is bound to its loop)
+        self._async_clients = {}
         
         print(f"[SUCCESS] Local LLaMA provider initialized")
         print(f"   API Base: {self.api_base}")
         print(f"   Model ID: {self.model_id}")
     
+    def _create_session(self) -> requests.Session:
+        """
+        Keep-alive session shared by all requests to the server.
+        
+        Connections are pooled (up to LLAMA_POOL_SIZE kept open) so each
+        diagnosis reuses an established TCP/TLS connection. Only failures
+        where the server cannot have started generating are retried: connection
+        errors, and 503 while llama.cpp is still loading the model. Read
+        timeouts are never retried.
+        """
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            status_forcelist=(503,),
+            allowed_methods=frozenset({"GET", "POST"}),
+            backoff_factor=0.5,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.verify = False  # Disable SSL verification for cloudflare tunnels
+        return session
+    
     def complete(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4000) -> Dict[str, Any]:
         """
         Generate a completion using local llama.cpp server.
@@ -57,8 +106,8 @@ class LocalLlamaProvider(LLMProvider):
             # The prompt format should be "System: ...\n\nUser: ..."
             messages = self._parse_prompt_to_messages(prompt)
             
-            # Make request to llama.cpp server
-            response = requests.post(
+            # Make request to llama.cpp server over the pooled keep-alive session
+            response = self.session.post(
                 api_url,
                 json={
                     "model": self.model_id,
@@ -66,8 +115,7 @@ class LocalLlamaProvider(LLMProvider):
                     "temperature": temperature,
                     "max_tokens": max_tokens
                 },
-                timeout=600,  # 10 minutes timeout for reasoning models
-                verify=False  # Disable SSL verification for cloudflare tunnels
+                timeout=self.timeout
             )
             
             print(f"[SUCCESS] Response status: {response.status_code}")
@@ -76,51 +124,204 @@ class LocalLlamaProvider(LLMProvider):
             if response.status_code != 200:
                 raise Exception(f'Model API error: {response.status_code} - {response.text}')
             
-            # Parse the response
-            result = response.json()
+            return self._parse_completion(response.json())
             
-            # Extract the model's response
-            if 'choices' not in result or len(result['choices']) == 0:
-                raise Exception('No choices in model response')
+        except requests.exceptions.ConnectionError as e:
+            raise Exception(f"Failed to connect to local LLaMA server at {self.api_base}: {str(e)}")
+        except requests.exceptions.Timeout as e:
+            raise Exception(f"Timeout connecting to local LLaMA server: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Local LLaMA error: {str(e)}")
+    
+    def _parse_completion(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Standardized completion dict from a /v1/chat/completions response body"""
+        # Extract the model's response
+        if 'choices' not in result or len(result['choices']) == 0:
+            raise Exception('No choices in model response')
+        
+        choice = result['choices'][0]
+        
+        # Get the assistant's message content
+        content = choice.get('message', {}).get('content', '')
+        finish_reason = choice.get('finish_reason', 'unknown')
+        
+        if not content:
+            raise Exception('No content in model response')
+        
+        # Get usage information
+        usage = result.get('usage', {})
+        model_used = result.get('model', self.model_id)
+        
+        # Return in standardized format
+        return {
+            'content': content,
+            'model': model_used,
+            'finish_reason': finish_reason,
+            'usage': {
+                'prompt_tokens': usage.get('prompt_tokens', 0),
+                'completion_tokens': usage.get('completion_tokens', 0),
+                'total_tokens': usage.get('total_tokens', 0)
+            },
+            'metadata': {
+                'provider': 'Local LLaMA',
+                'id': result.get('id', ''),
+                'created': result.get('created', ''),
+                'object': result.get('object', ''),
+                'system_fingerprint': result.get('system_fingerprint', '')
+            }
+        }
+    
+    async def acomplete(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4000) -> Dict[str, Any]:
+        """
+        Generate a completion without holding a thread while the model runs.
+        
+        Uses an httpx.AsyncClient with the same timeouts, pool size and retry
+        policy as the requests session. Without httpx installed, complete()
+        runs in a worker thread instead.
+        
+        Args:
+            prompt: The input prompt (combines system + user messages)
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
             
-            choice = result['choices'][0]
+        Returns:
+            Dictionary with completion results
+        """
+        if not HTTPX_AVAILABLE:
+            return await super().acomplete(prompt, temperature=temperature, max_tokens=max_tokens)
+        
+        try:
+            api_url = f"{self.api_base}/v1/chat/completions"
+            client = self._get_async_client()
+            for attempt in range(self.max_retries + 1):
+                response = await client.post(
+                    api_url,
+                    json={
+                        "model": self.model_id,
+                        "messages": self._parse_prompt_to_messages(prompt),
+                        "temperature": temperature,
+                        "max_tokens": max_tokens
+                    }
+                )
+                # 503 while llama.cpp is still loading the model; nothing was generated yet
+                if response.status_code != 503 or attempt == self.max_retries:
+                    break
+                await asyncio.sleep(0.5 * 2 ** attempt)
             
-            # Get the assistant's message content
-            content = choice.get('message', {}).get('content', '')
-            finish_reason = choice.get('finish_reason', 'unknown')
+            if response.status_code != 200:
+                raise Exception(f'Model API error: {response.status_code} - {response.text}')
             
-            if not content:
-                raise Exception('No content in model response')
+            return self._parse_completion(response.json())
             
-            # Get usage information
-            usage = result.get('usage', {})
-            model_used = result.get('model', self.model_id)
+        except httpx.ConnectError as e:
+            raise Exception(f"Failed to connect to local LLaMA server at {self.api_base}: {str(e)}")
+        except httpx.TimeoutException as e:
+            raise Exception(f"Timeout connecting to local LLaMA server: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Local LLaMA error: {str(e)}")
+    
+    def _get_async_client(self):
+        """
+        httpx.AsyncClient for the running event loop (clients cannot be shared across loops).
+        
+        The client is closed inside its own loop when that loop shuts down:
+        at server shutdown under ASGI, and at the end of each request under
+        WSGI, where Django runs async views in a new loop per request.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                # Keep LLAMA_POOL_SIZE connections alive but never queue callers for one
+                limits=httpx.Limits(max_keepalive_connections=self.pool_size, max_connections=None),
+                # Connection failures are retried by the transport, 503 in acomplete
+                transport=httpx.AsyncHTTPTransport(retries=self.max_retries, verify=False)
+            )
+            # Keep a reference to the closer task, the loop only holds weak ones
+            entry = (client, loop.create_task(self._close_with_loop(loop, client)))
+            self._async_clients[loop] = entry
+        return entry[0]
+    
+    async def _close_with_loop(self, loop, client):
+        """Wait until the loop shuts down (asyncio.run cancels pending tasks), then close the client"""
+        try:
+            await loop.create_future()
+        finally:
+            self._async_clients.pop(loop, None)
+            await client.aclose()
+    
+    def complete_stream(self, prompt: str, temperature: float = 0.7, max_tokens: int = 4000) -> Iterator[Dict[str, Any]]:
+        """
+        Generate a completion with stream=true, yielding tokens as the
+        llama.cpp server sends them (OpenAI-style server-sent events).
+        
+        Args:
+            prompt: The input prompt (combines system + user messages)
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
             
-            # Return in standardized format
-            return {
-                'content': content,
-                'model': model_used,
-                'finish_reason': finish_reason,
-                'usage': {
-                    'prompt_tokens': usage.get('prompt_tokens', 0),
-                    'completion_tokens': usage.get('completion_tokens', 0),
-                    'total_tokens': usage.get('total_tokens', 0)
+        Yields:
+            Chunk dictionaries, see LLMProvider.complete_stream
+        """
+        api_url = f"{self.api_base}/v1/chat/completions"
+        try:
+            response = self.session.post(
+                api_url,
+                json={
+                    "model": self.model_id,
+                    "messages": self._parse_prompt_to_messages(prompt),
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "stream": True
                 },
-                'metadata': {
-                    'provider': 'Local LLaMA',
-                    'id': result.get('id', ''),
-                    'created': result.get('created', ''),
-                    'object': result.get('object', ''),
-                    'system_fingerprint': result.get('system_fingerprint', '')
-                }
-            }
-            
+                timeout=self.timeout,
+                stream=True
+            )
         except requests.exceptions.ConnectionError as e:
             raise Exception(f"Failed to connect to local LLaMA server at {self.api_base}: {str(e)}")
         except requests.exceptions.Timeout as e:
             raise Exception(f"Timeout connecting to local LLaMA server: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Local LLaMA error: {str(e)}")
+        
+        # Closing the response returns the connection to the pool (or drops it
+        # if the client went away mid-stream)
+        with response:
+            if response.status_code != 200:
+                raise Exception(f'Model API error: {response.status_code} - {response.text}')
+            
+            model_used = self.model_id
+            finish_reason = None
+            usage = {}
+            try:
+                for line in response.iter_lines():
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    event = json.loads(data)
+                    model_used = event.get('model', model_used)
+                    usage = event.get('usage') or usage
+                    choices = event.get('choices') or []
+                    if not choices:
+                        continue
+                    content = (choices[0].get('delta') or {}).get('content') or ''
+                    finish_reason = choices[0].get('finish_reason') or finish_reason
+                    if content:
+                        yield {'content': content, 'finish_reason': None}
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Local LLaMA stream interrupted: {str(e)}")
+        
+        yield {
+            'content': '',
+            'finish_reason': finish_reason or 'unknown',
+            'model': model_used,
+            'usage': {
+                'prompt_tokens': usage.get('prompt_tokens', 0),
+                'completion_tokens': usage.get('completion_tokens', 0),
+                'total_tokens': usage.get('total_tokens', 0)
+            }
+        }
     
     def _parse_prompt_to_messages(self, prompt: str) -> list:
         """
@@ -150,6 +351,10 @@ class LocalLlamaProvider(LLMProvider):
         # Fallback: treat entire prompt as user message
         return [{"role": "user", "content": prompt}]
     
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
     def get_provider_name(self) -> str:
         """Get the provider name."""
         return "Local LLaMA"
@@ -0,0 +1,224 @@
+"""
+LLM Provider Registry
+
+Process-wide cache of constructed LLM providers. Each provider is built
+once, on first use, and reused by every request until its configuration
+changes. The registry keeps a fingerprint of each provider's environment
+variables. A changed API key, model, server address or connection setting
+(pool size, timeouts, retries) causes a rebuild on the next request, and
+nothing else does. The instance it replaces is closed, releasing its
+pooled connections.
+
+The registry also tracks provider health. A provider that fails to build,
+or whose completions keep failing, is skipped for a cooldown period so the
+fallback chain moves on at once instead of retrying it on every request.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .base import LLMProvider
+
+
+class ProviderEntry:
+    """Registered provider factory plus its cached instance and health state"""
+
+    def __init__(self, name: str, factory: Callable[[], LLMProvider], env_keys: List[str]):
+        self.name = name
+        self.factory = factory
+        self.env_keys = list(env_keys)
+        self.provider: Optional[LLMProvider] = None
+        self.fingerprint: Optional[str] = None
+        self.built_at: Optional[float] = None
+        self.builds = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.cooldown_until = 0.0
+
+    def cooling_down(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "built": self.provider is not None,
+            "builds": self.builds,
+            "healthy": not self.cooling_down(),
+            "consecutive_failures": self.consecutive_failures,
+            "cooldown_remaining_seconds": round(max(self.cooldown_until - time.monotonic(), 0.0), 1),
+            "last_error": self.last_error,
+        }
+
+
+def _close(provider: Optional[LLMProvider]):
+    """Close a provider the registry no longer hands out"""
+    if provider is None:
+        return
+    try:
+        provider.close()
+    except Exception as e:
+        print(f"⚠️ [LLM] Error closing {provider.get_provider_name()} provider: {str(e)}")
+
+
+class ProviderRegistry:
+    """Thread-safe registry that builds each provider once per configuration"""
+
+    def __init__(self, cooldown: float = 30.0, failure_threshold: int = 1):
+        """
+        Args:
+            cooldown: Seconds an unhealthy provider is skipped (0 disables skipping)
+            failure_threshold: Consecutive completion failures before a provider
+                is considered unhealthy (a failed build always is)
+        """
+        self.cooldown = cooldown
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self._entries: Dict[str, ProviderEntry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], LLMProvider], env_keys: List[str]):
+        """
+        Register a provider.
+
+        Args:
+            name: Provider key (e.g. "gemini", "local")
+            factory: Zero-argument callable that builds the provider
+            env_keys: Environment variables the provider reads; a change in any
+                of them rebuilds it
+        """
+        with self._lock:
+            self._entries[name] = ProviderEntry(name, factory, env_keys)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def fingerprint(self, name: str) -> str:
+        """Hash of the provider's current configuration (secrets are never stored)"""
+        entry = self._entries[name]
+        config = "\0".join(f"{key}={os.getenv(key, '')}" for key in entry.env_keys)
+        return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+    def available(self, name: str) -> bool:
+        """Whether the provider is registered and not cooling down (a configuration change ends a cooldown)"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        return not entry.cooling_down() or entry.fingerprint != self.fingerprint(name)
+
+    def get(self, name: str) -> LLMProvider:
+        """
+        Get the provider, building it if this is the first use or its
+        configuration changed.
+
+        Raises:
+            KeyError: If no provider is registered under `name`
+            Exception: Whatever the provider's constructor raised (the
+                provider then cools down unless its configuration changes)
+        """
+        entry = self._entries[name]
+        fingerprint = self.fingerprint(name)
+        provider = entry.provider
+        if provider is not None and entry.fingerprint == fingerprint:
+            return provider
+
+        with self._lock:
+            # Another thread may have rebuilt it while we waited
+            if entry.provider is not None and entry.fingerprint == fingerprint:
+                return entry.provider
+            if entry.fingerprint == fingerprint and entry.cooling_down():
+                raise RuntimeError(f"{name} provider unavailable: {entry.last_error}")
+
+            reason = "configuration changed" if entry.fingerprint else "first use"
+            print(f"[LLM] Building {name} provider ({reason})")
+            entry.builds += 1
+            previous = entry.provider
+            try:
+                provider = entry.factory()
+            except Exception as e:
+                entry.provider = None
+                entry.fingerprint = fingerprint
+                self._mark_failed(entry, str(e), force=True)
+                _close(previous)
+                raise
+            _close(previous)
+            entry.provider = provider
+            entry.fingerprint = fingerprint
+            entry.built_at = time.time()
+            entry.consecutive_failures = 0
+            entry.cooldown_until = 0.0
+            entry.last_error = None
+            return provider
+
+    def _entry_for(self, provider: LLMProvider) -> Optional[ProviderEntry]:
+        for entry in self._entries.values():
+            if entry.provider is provider:
+                return entry
+        return None
+
+    def _mark_failed(self, entry: ProviderEntry, error: str, force: bool = False):
+        entry.consecutive_failures += 1
+        entry.last_error = error
+        if self.cooldown > 0 and (force or entry.consecutive_failures >= self.failure_threshold):
+            entry.cooldown_until = time.monotonic() + self.cooldown
+            print(f"⚠️ [LLM] {entry.name} provider unhealthy, skipping it for {self.cooldown:g}s: {error}")
+
+    def report_success(self, provider: LLMProvider):
+        """Record a successful completion, clearing any failure streak"""
+        entry = self._entry_for(provider)
+        if entry is not None and entry.consecutive_failures:
+            with self._lock:
+                entry.consecutive_failures = 0
+                entry.cooldown_until = 0.0
+                entry.last_error = None
+
+    def report_failure(self, provider: LLMProvider, error: Exception):
+        """Record a failed completion; enough of them in a row start a cooldown"""
+        entry = self._entry_for(provider)
+        if entry is not None:
+            with self._lock:
+                self._mark_failed(entry, str(error))
+
+    def reload(self, name: Optional[str] = None):
+        """Close and drop cached providers (one or all) and their health state so they rebuild on next use"""
+        with self._lock:
+            for entry in self._entries.values():
+                if name is None or entry.name == name:
+                    _close(entry.provider)
+                    entry.provider = None
+                    entry.fingerprint = None
+                    entry.consecutive_failures = 0
+                    entry.cooldown_until = 0.0
+                    entry.last_error = None
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider build and health state"""
+        return {name: entry.status() for name, entry in self._entries.items()}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_provider_registry() -> ProviderRegistry:
+    """Get (or lazily create) the process-wide provider registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ProviderRegistry(
+                cooldown=float(os.getenv("LLM_PROVIDER_COOLDOWN", "30")),
+                failure_threshold=int(os.getenv("LLM_PROVIDER_FAILURE_THRESHOLD", "2")),
+            )
+            # Imported here so a missing google-generativeai only disables Gemini
+            def build_gemini():
+                from .gemini import GeminiProvider
+                return GeminiProvider()
+
+            def build_local():
+                from .local_llama import LocalLlamaProvider
+                return LocalLlamaProvider()
+
+            _registry.register("gemini", build_gemini, ["GEMINI_API_KEY", "GEMINI_MODEL"])
+            _registry.register("local", build_local, ["LLAMA_API_BASE", "LLAMA_MODEL_ID", "LLAMA_POOL_SIZE",
+                                                         "LLAMA_CONNECT_TIMEOUT", "LLAMA_READ_TIMEOUT", "LLAMA_MAX_RETRIES"])
+        return _registry
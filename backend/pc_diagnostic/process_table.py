@@ -0,0 +1,177 @@
+"""
+Persistent Process Table
+
+Keeps primed psutil.Process handles alive between calls so CPU and I/O
+usage are real deltas rather than the 0.0 psutil reports for a fresh
+Process object. Each refresh only adds new PIDs and drops dead ones, and
+top-K rankings are selected with a heap instead of sorting every process.
+"""
+
+import heapq
+import threading
+import time
+from typing import Any, Dict, List
+
+import psutil
+
+
+class _Entry:
+    """Tracked process handle plus the counters from the previous refresh"""
+
+    __slots__ = ("proc", "name", "status", "cpu_percent", "memory_percent",
+                 "memory_rss", "io_total", "io_rate", "last_io")
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.name = None
+        self.status = None
+        self.cpu_percent = 0.0
+        self.memory_percent = 0.0
+        self.memory_rss = 0
+        self.io_total = None
+        self.io_rate = 0.0
+        self.last_io = None
+
+
+class ProcessTable:
+    """Long-lived process table computing CPU and I/O deltas between refreshes"""
+
+    def __init__(self, prime_interval: float = 0.25, min_refresh_interval: float = 0.5):
+        """
+        Args:
+            prime_interval: Seconds to wait after priming a fresh table so the
+                first ranking already has meaningful CPU deltas
+            min_refresh_interval: Refreshes closer together than this reuse the
+                previous values (very short deltas are mostly noise)
+        """
+        self.prime_interval = prime_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._entries: Dict[int, _Entry] = {}
+        self._lock = threading.Lock()
+        self._last_refresh = None
+
+    def refresh(self) -> int:
+        """
+        Sync the table with the running processes and update CPU/IO deltas.
+
+        Returns:
+            Number of processes currently tracked
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._last_refresh is not None and now - self._last_refresh < self.min_refresh_interval:
+                return len(self._entries)
+
+            fresh_table = self._last_refresh is None
+            self._sync_pids()
+            if fresh_table:
+                time.sleep(self.prime_interval)
+                now = time.monotonic()
+
+            elapsed = now - self._last_refresh if self._last_refresh is not None else self.prime_interval
+            self._update(max(elapsed, 1e-6))
+            self._last_refresh = time.monotonic()
+            return len(self._entries)
+
+    def _sync_pids(self):
+        current = set(psutil.pids())
+        for pid in list(self._entries):
+            if pid not in current:
+                del self._entries[pid]
+
+        for pid in current:
+            entry = self._entries.get(pid)
+            # is_running() also catches PID reuse by comparing create times
+            if entry is not None and entry.proc.is_running():
+                continue
+            try:
+                proc = psutil.Process(pid)
+                entry = _Entry(proc)
+                proc.cpu_percent(None)  # prime: the next call returns a real delta
+                entry.last_io = self._io_total(proc)
+                self._entries[pid] = entry
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self._entries.pop(pid, None)
+
+    def _update(self, elapsed: float):
+        for pid, entry in list(self._entries.items()):
+            proc = entry.proc
+            try:
+                with proc.oneshot():
+                    entry.cpu_percent = proc.cpu_percent(None)
+                    entry.memory_percent = proc.memory_percent()
+                    entry.memory_rss = proc.memory_info().rss
+                    entry.status = proc.status()
+                    if entry.name is None:
+                        entry.name = proc.name()
+                io_total = self._io_total(proc)
+                if io_total is not None and entry.last_io is not None:
+                    entry.io_rate = max(io_total - entry.last_io, 0) / elapsed
+                entry.io_total = io_total
+                entry.last_io = io_total
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                del self._entries[pid]
+            except psutil.AccessDenied:
+                continue
+
+    @staticmethod
+    def _io_total(proc):
+        """Cumulative bytes read + written, or None if unavailable"""
+        try:
+            io = proc.io_counters()
+            return io.read_bytes + io.write_bytes
+        except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess, AttributeError, NotImplementedError):
+            return None
+
+    @staticmethod
+    def _as_dict(pid: int, entry: _Entry) -> Dict[str, Any]:
+        return {
+            "pid": pid,
+            "name": entry.name,
+            "cpu_percent": round(entry.cpu_percent, 1),
+            "memory_percent": round(entry.memory_percent, 2),
+            "memory_mb": round(entry.memory_rss / (1024**2), 2),
+            "io_bytes_per_sec": round(entry.io_rate, 1),
+            "status": entry.status,
+        }
+
+    _RANK_KEYS = {
+        "cpu": lambda item: item[1].cpu_percent,
+        "memory": lambda item: item[1].memory_percent,
+        "io": lambda item: item[1].io_rate,
+    }
+
+    def top(self, by: str = "cpu", limit: int = 10, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        Get the top-K processes ranked by "cpu", "memory" or "io".
+
+        Args:
+            by: Ranking metric
+            limit: Number of processes to return
+            refresh: Refresh the table before ranking
+        """
+        if refresh:
+            self.refresh()
+        key = self._RANK_KEYS[by]
+        with self._lock:
+            ranked = heapq.nlargest(limit, self._entries.items(), key=key)
+            return [self._as_dict(pid, entry) for pid, entry in ranked]
+
+    def rankings(self, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Get top-K processes by CPU, memory and I/O from a single refresh"""
+        self.refresh()
+        return {
+            "by_cpu": self.top("cpu", limit, refresh=False),
+            "by_memory": self.top("memory", limit, refresh=False),
+            "by_io": self.top("io", limit, refresh=False),
+            "tracked_processes": len(self._entries),
+        }
+
+
+# Process-wide table so handles stay primed across requests
+process_table = ProcessTable()
+
+
+def get_process_table() -> ProcessTable:
+    """Get the shared process table"""
+    return process_table
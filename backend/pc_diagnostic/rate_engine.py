@@ -0,0 +1,184 @@
+"""
+Counter Rate Engine
+
+psutil's network and disk counters are cumulative since boot, which says
+nothing about what the machine is doing right now. This engine keeps the
+previous per-NIC and per-disk samples and turns consecutive samples into
+rates: bytes/s, packets/s, IOPS, average I/O latency and error/drop rates.
+A previous sample older than `max_window` (nothing polled in a while, e.g.
+the background sampler is off) is discarded and the counters are primed
+again, so the rates always describe the last few seconds rather than an
+average since the last request.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+import psutil
+
+
+def _per_sec(new, old, attr, elapsed):
+    delta = getattr(new, attr, 0) - getattr(old, attr, 0)
+    # Counters can reset (device re-plugged, driver reload); never report negative rates
+    return round(max(delta, 0) / elapsed, 2)
+
+
+def _delta(new, old, attr):
+    return max(getattr(new, attr, 0) - getattr(old, attr, 0), 0)
+
+
+def network_rates(new, old, elapsed: float) -> Dict[str, Any]:
+    """Rates between two psutil snetio samples"""
+    packets_in = _delta(new, old, "packets_recv")
+    packets_out = _delta(new, old, "packets_sent")
+    errors = _delta(new, old, "errin") + _delta(new, old, "errout")
+    drops = _delta(new, old, "dropin") + _delta(new, old, "dropout")
+    packets = packets_in + packets_out
+    return {
+        "bytes_sent_per_sec": _per_sec(new, old, "bytes_sent", elapsed),
+        "bytes_recv_per_sec": _per_sec(new, old, "bytes_recv", elapsed),
+        "packets_sent_per_sec": _per_sec(new, old, "packets_sent", elapsed),
+        "packets_recv_per_sec": _per_sec(new, old, "packets_recv", elapsed),
+        "errors_in_per_sec": _per_sec(new, old, "errin", elapsed),
+        "errors_out_per_sec": _per_sec(new, old, "errout", elapsed),
+        "drops_in_per_sec": _per_sec(new, old, "dropin", elapsed),
+        "drops_out_per_sec": _per_sec(new, old, "dropout", elapsed),
+        # Fraction of packets in the window that errored / were dropped
+        "error_rate": round(errors / packets, 4) if packets else 0.0,
+        "drop_rate": round(drops / (packets + drops), 4) if packets + drops else 0.0,
+    }
+
+
+def disk_rates(new, old, elapsed: float) -> Dict[str, Any]:
+    """Rates between two psutil sdiskio samples"""
+    reads = _delta(new, old, "read_count")
+    writes = _delta(new, old, "write_count")
+    read_ms = _delta(new, old, "read_time")
+    write_ms = _delta(new, old, "write_time")
+    rates = {
+        "read_bytes_per_sec": _per_sec(new, old, "read_bytes", elapsed),
+        "write_bytes_per_sec": _per_sec(new, old, "write_bytes", elapsed),
+        "read_iops": _per_sec(new, old, "read_count", elapsed),
+        "write_iops": _per_sec(new, old, "write_count", elapsed),
+        "avg_read_latency_ms": round(read_ms / reads, 2) if reads else 0.0,
+        "avg_write_latency_ms": round(write_ms / writes, 2) if writes else 0.0,
+    }
+    if hasattr(new, "busy_time"):
+        # Linux/FreeBSD: time the device had I/O in flight
+        busy_ms = _delta(new, old, "busy_time")
+        rates["busy_percent"] = round(min(busy_ms / (elapsed * 1000) * 100, 100.0), 1)
+    return rates
+
+
+def _is_loopback(name: str, names) -> bool:
+    """True for loopback interfaces (lo, lo0, Windows' "Loopback Pseudo-Interface 1")"""
+    lowered = name.lower()
+    return lowered in ("lo", "lo0") or lowered.startswith("loopback")
+
+
+def _is_partition(name: str, names) -> bool:
+    """True for Linux partition entries (sda1, nvme0n1p2) whose whole disk is also listed"""
+    for parent in names:
+        if parent != name and name.startswith(parent):
+            suffix = name[len(parent):]
+            if suffix.isdigit() or (suffix.startswith("p") and suffix[1:].isdigit()):
+                return True
+    return False
+
+
+class CounterRateEngine:
+    """Derives per-device rates from consecutive cumulative counter samples"""
+
+    def __init__(self, prime_window: float = 0.5, min_window: float = 0.5, max_window: float = 60.0):
+        """
+        Args:
+            prime_window: Seconds to wait between the two samples of a first
+                (or re-primed) call
+            min_window: Calls closer together than this reuse the previous rates
+                (tiny windows amplify counter granularity into noise)
+            max_window: A previous sample older than this is too stale to
+                difference against; the counters are primed again instead
+        """
+        self.prime_window = prime_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _rates(self, kind: str, read_counters, compute, exclude_from_total=None) -> Dict[str, Any]:
+        with self._lock:
+            state = self._state.get(kind)
+            now = time.monotonic()
+
+            if state is None or now - state["taken"] > self.max_window:
+                previous = (now, read_counters())
+                time.sleep(self.prime_window)
+                now = time.monotonic()
+            elif now - state["taken"] < self.min_window and state["result"] is not None:
+                return state["result"]
+            else:
+                previous = (state["taken"], state["counters"])
+
+            counters = read_counters()
+            elapsed = max(now - previous[0], 1e-6)
+            devices = {
+                name: compute(sample, previous[1][name], elapsed)
+                for name, sample in counters.items()
+                if name in previous[1]
+            }
+
+            counted = {
+                name: rates for name, rates in devices.items()
+                if not (exclude_from_total and exclude_from_total(name, devices))
+            }
+            result = {
+                "devices": devices,
+                "total": self._sum(counted),
+                "window_seconds": round(elapsed, 3),
+            }
+            self._state[kind] = {"taken": now, "counters": counters, "result": result}
+            return result
+
+    @staticmethod
+    def _sum(devices: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate per-device rates: sum throughputs, take the worst latency/error figures"""
+        total = {}
+        for rates in devices.values():
+            for key, value in rates.items():
+                if key.endswith("_per_sec") or key.endswith("_iops"):
+                    total[key] = round(total.get(key, 0.0) + value, 2)
+                else:
+                    total[key] = max(total.get(key, 0.0), value)
+        return total
+
+    def network(self) -> Dict[str, Any]:
+        """Per-NIC network rates plus totals"""
+        # Loopback traffic never leaves the machine; it is listed but not totalled
+        result = self._rates("network", lambda: psutil.net_io_counters(pernic=True), network_rates,
+                             exclude_from_total=_is_loopback)
+        return {
+            "interfaces": result["devices"],
+            "total": result["total"],
+            "window_seconds": result["window_seconds"],
+        }
+
+    def disk(self) -> Dict[str, Any]:
+        """Per-disk I/O rates plus totals"""
+        # Partitions are listed alongside their disk on Linux; don't count their I/O twice
+        result = self._rates("disk", lambda: psutil.disk_io_counters(perdisk=True) or {}, disk_rates,
+                             exclude_from_total=_is_partition)
+        return {
+            "disks": result["devices"],
+            "total": result["total"],
+            "window_seconds": result["window_seconds"],
+        }
+
+
+# Process-wide engine so every caller shares the previous samples
+rate_engine = CounterRateEngine()
+
+
+def get_rate_engine() -> CounterRateEngine:
+    """Get the shared counter rate engine"""
+    return rate_engine
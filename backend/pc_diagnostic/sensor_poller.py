@@ -0,0 +1,253 @@
+"""
+Windowed Sensor Poller
+
+Polls AdvancedTelemetry (LibreHardwareMonitor + NVML) on a fixed cadence,
+1 Hz by default, in a daemon thread. Each sensor keeps a rolling window of
+its recent values in a preallocated array('f') ring buffer, so five minutes
+of history costs about 1.5 KB per sensor. The windows provide min/max/avg
+over the window, rather than the lifetime min/max LibreHardwareMonitor
+reports, and throttle-event counts that catch short thermal or power
+throttling bursts an instantaneous reading misses. Requests read the
+windows and never touch the hardware themselves.
+"""
+
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+# LibreHardwareMonitor sensor types that get a window, with their units
+WINDOWED_TYPES = {
+    "Temperature": "°C",
+    "Power": "W",
+    "Clock": "MHz",
+    "Load": "%",
+    "Fan": "RPM",
+}
+
+# Temperature (°C) at or above which a sample counts as throttling, by hardware type
+THROTTLE_TEMPERATURES = {
+    "Cpu": 95.0,
+    "GpuNvidia": 83.0,
+    "GpuAmd": 100.0,
+    "GpuIntel": 95.0,
+    "Storage": 70.0,
+}
+DEFAULT_THROTTLE_TEMPERATURE = 95.0
+
+# NVML clock throttle reason bits that mean the GPU is being held back
+# (idle, application clocks and display clocks are not throttling)
+NVML_THROTTLE_MASK = (
+    0x0000000000000004  # SW power cap
+    | 0x0000000000000008  # HW slowdown
+    | 0x0000000000000020  # SW thermal slowdown
+    | 0x0000000000000040  # HW thermal slowdown
+    | 0x0000000000000080  # HW power brake slowdown
+)
+
+
+class SensorWindow:
+    """Fixed-size ring buffer of float samples plus a throttling flag per sample"""
+
+    __slots__ = ("name", "hardware", "sensor_type", "unit", "capacity", "values", "flags", "head", "count")
+
+    def __init__(self, name: str, hardware: str, sensor_type: str, unit: str, capacity: int):
+        self.name = name
+        self.hardware = hardware
+        self.sensor_type = sensor_type
+        self.unit = unit
+        self.capacity = capacity
+        self.values = array("f", bytes(4 * capacity))
+        self.flags = array("b", bytes(capacity))
+        self.head = 0  # Next slot to write
+        self.count = 0
+
+    def add(self, value: float, throttled: bool = False):
+        self.values[self.head] = value
+        self.flags[self.head] = 1 if throttled else 0
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def ordered(self):
+        """(values, flags) oldest first"""
+        if self.count < self.capacity:
+            return self.values[:self.count], self.flags[:self.count]
+        return self.values[self.head:] + self.values[:self.head], self.flags[self.head:] + self.flags[:self.head]
+
+    def stats(self) -> Dict[str, Any]:
+        values, flags = self.ordered()
+        # Throttle events are entries into the throttled state, so one long
+        # episode counts once and three short bursts count three times
+        events = sum(1 for i, flag in enumerate(flags) if flag and (i == 0 or not flags[i - 1]))
+        return {
+            "name": self.name,
+            "hardware": self.hardware,
+            "type": self.sensor_type,
+            "unit": self.unit,
+            "last": round(values[-1], 2),
+            "min": round(min(values), 2),
+            "max": round(max(values), 2),
+            "avg": round(sum(values) / len(values), 2),
+            "samples": len(values),
+            "throttled_samples": sum(flags),
+            "throttle_events": events,
+        }
+
+
+class SensorPoller:
+    """Opt-in background poller keeping windowed history of every sensor"""
+
+    def __init__(self, telemetry, interval: float = 1.0, window_seconds: float = 300.0):
+        """
+        Args:
+            telemetry: AdvancedTelemetry to poll (LibreHardwareMonitor and/or NVML)
+            interval: Seconds between polls
+            window_seconds: Length of history kept per sensor
+        """
+        self.telemetry = telemetry
+        self.interval = max(float(interval), 0.1)
+        self.window_seconds = float(window_seconds)
+        self.capacity = max(int(self.window_seconds / self.interval), 1)
+        self._windows: Dict[str, SensorWindow] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.last_poll = None
+        self.last_duration = 0.0
+
+    def start(self):
+        """Start the polling thread (no-op if it is already running)"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sensor-poller", daemon=True)
+        self._thread.start()
+        print(f"✅ Sensor poller started (every {self.interval:g}s, {self.window_seconds:g}s window)")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Signal the polling thread to stop and wait for it to exit"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def staleness_limit(self) -> float:
+        """Age after which the latest poll should be treated as stale (a few missed cycles)"""
+        return max(self.interval, self.last_duration) * 3
+
+    def _record(self, key: str, name: str, hardware: str, sensor_type: str, unit: str,
+                value: float, throttled: bool = False):
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = SensorWindow(name, hardware, sensor_type, unit, self.capacity)
+        window.add(value, throttled)
+
+    def _poll_librehardware(self, readings: List[tuple]):
+        snapshot = self.telemetry.snapshot()
+        if snapshot is None:
+            return
+        for sensor_type, unit in WINDOWED_TYPES.items():
+            for reading in snapshot.get(sensor_type):
+                if reading.value is None:
+                    continue
+                throttled = False
+                if sensor_type == "Temperature":
+                    limit = THROTTLE_TEMPERATURES.get(reading.hardware_type, DEFAULT_THROTTLE_TEMPERATURE)
+                    throttled = reading.value >= limit
+                readings.append((reading.identifier, reading.name, reading.hardware, sensor_type, unit,
+                                 reading.value, throttled))
+
+    def _poll_nvml(self, readings: List[tuple]):
+        nvml = self.telemetry.pynvml
+        for i in range(nvml.nvmlDeviceGetCount()):
+            handle = nvml.nvmlDeviceGetHandleByIndex(i)
+            hardware = f"NVIDIA GPU {i}"
+            key = f"/nvml/{i}"
+
+            reasons = 0
+            try:
+                reasons = nvml.nvmlDeviceGetCurrentClocksThrottleReasons(handle)
+            except Exception:
+                pass
+            throttled = bool(reasons & NVML_THROTTLE_MASK)
+
+            try:
+                temperature = nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU)
+                readings.append((f"{key}/temperature", "GPU Core", hardware, "Temperature", "°C",
+                                 float(temperature), throttled))
+            except Exception:
+                pass
+            try:
+                power = nvml.nvmlDeviceGetPowerUsage(handle) / 1000.0  # mW
+                readings.append((f"{key}/power", "GPU Package", hardware, "Power", "W", power, throttled))
+            except Exception:
+                pass
+            try:
+                clock = nvml.nvmlDeviceGetClockInfo(handle, nvml.NVML_CLOCK_SM)
+                readings.append((f"{key}/clock", "GPU Core", hardware, "Clock", "MHz", float(clock), throttled))
+            except Exception:
+                pass
+
+    def poll_once(self):
+        """Read every sensor once and append the values to their windows"""
+        started = time.monotonic()
+        # Read the hardware without holding the lock (a LibreHardwareMonitor
+        # update can take hundreds of ms), so summary() never waits on it
+        readings = []
+        if self.telemetry.librehardware_available:
+            self._poll_librehardware(readings)
+        if self.telemetry.nvml_available:
+            try:
+                self._poll_nvml(readings)
+            except Exception as e:
+                print(f"⚠️ NVML polling failed: {str(e)}")
+
+        with self._lock:
+            for reading in readings:
+                self._record(*reading)
+            self.polls += 1
+            self.last_poll = time.time()
+        self.last_duration = time.monotonic() - started
+
+    def summary(self, sensor_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Window statistics for every sensor seen so far.
+
+        Args:
+            sensor_types: Only include these sensor types (e.g. ["Temperature"])
+
+        Returns:
+            Dict with the window length, per-sensor min/max/avg/last and
+            throttle counts, and the sensors that throttled in the window
+        """
+        with self._lock:
+            sensors = {
+                key: window.stats() for key, window in self._windows.items()
+                if window.count and (sensor_types is None or window.sensor_type in sensor_types)
+            }
+            last_poll = self.last_poll
+
+        throttling = {key: stats["throttle_events"] for key, stats in sensors.items() if stats["throttle_events"]}
+        return {
+            "window_seconds": self.window_seconds,
+            "interval_seconds": self.interval,
+            "last_poll_age_seconds": round(time.time() - last_poll, 3) if last_poll else None,
+            "throttle_events": sum(throttling.values()),
+            "throttling_sensors": throttling,
+            "sensors": sensors,
+        }
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️ Sensor polling failed: {str(e)}")
+            elapsed = time.monotonic() - started
+            self._stop_event.wait(max(self.interval - elapsed, 0.0))
@@ -0,0 +1,379 @@
+"""
+Persistent Shell Session Pool
+
+Diagnostic commands used to start a fresh powershell/bash process each,
+and PowerShell startup alone costs hundreds of milliseconds. This pool
+keeps long-lived shell sessions warm and runs commands in them:
+
+- Framing: each command is sent as one self-delimiting script; the session
+  prints a per-command sentinel (plus the exit code) on stdout and stderr
+  when it finishes, which the reader threads look for.
+- Timeouts: a command that overruns its timeout gets its session killed
+  (whole process tree) and the caller gets subprocess.TimeoutExpired.
+- Crash recovery: dead or killed sessions are discarded and replaced on
+  the next checkout.
+- Concurrency limit: at most `size` commands run at once; the rest wait
+  (the wait counts against their timeout).
+
+The pool is opt-in (SHELL_POOL_ENABLED=true); otherwise, and for commands
+written for cmd.exe (shell=SYSTEM_SHELL), each command gets its own process.
+
+Results mirror the subprocess module (CompletedProcess, TimeoutExpired,
+CalledProcessError) so call sites keep their existing error handling.
+Commands run in a subshell (bash) or child scope (PowerShell), so `cd`,
+variables and `exit` do not leak into later commands.
+"""
+
+import base64
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+IS_WINDOWS = platform.system() == "Windows"
+
+POWERSHELL_INIT = (
+    "[Console]::OutputEncoding = [Text.Encoding]::UTF8; "
+    "$ProgressPreference = 'SilentlyContinue'\n"
+)
+
+# One line per command: decode, run in a child scope, report the exit code
+POWERSHELL_FRAME = (
+    "$__rc = 0; $global:LASTEXITCODE = 0; Push-Location; "
+    "try {{ "
+    "$__cmd = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{payload}')); "
+    "& ([ScriptBlock]::Create($__cmd)) 2>&1 | ForEach-Object {{ "
+    "if ($_ -is [System.Management.Automation.ErrorRecord]) {{ [Console]::Error.WriteLine($_.ToString()) }} "
+    "else {{ $_ }} }} | Out-String -Stream -Width 4096 | ForEach-Object {{ [Console]::Out.WriteLine($_) }}; "
+    "if ($LASTEXITCODE) {{ $__rc = $LASTEXITCODE }} "
+    "}} catch {{ [Console]::Error.WriteLine($_.ToString()); $__rc = 1 }} "
+    "finally {{ Pop-Location }}; "
+    "[Console]::Out.Write(\"{sentinel} $__rc`n\"); [Console]::Out.Flush(); "
+    "[Console]::Error.Write(\"{sentinel}`n\"); [Console]::Error.Flush()\n"
+)
+
+# The command is read from a quoted heredoc (no escaping needed) and run in a subshell
+BASH_FRAME = (
+    "IFS= read -r -d '' __cmd <<'{sentinel}'\n"
+    "{command}\n"
+    "{sentinel}\n"
+    "( eval \"$__cmd\" ) </dev/null\n"
+    "printf '%s %d\\n' '{sentinel}' \"$?\"\n"
+    "printf '%s\\n' '{sentinel}' >&2\n"
+)
+
+
+class SessionDied(Exception):
+    """The shell exited before finishing the command"""
+
+
+class _StreamReader:
+    """Drains one pipe on a daemon thread so the shell never blocks on a full pipe"""
+
+    def __init__(self, pipe):
+        self.pipe = pipe
+        self.buffer = bytearray()
+        self.eof = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        fd = self.pipe.fileno()
+        while True:
+            try:
+                chunk = os.read(fd, 65536)
+            except OSError:
+                chunk = b""
+            with self.cond:
+                if not chunk:
+                    self.eof = True
+                    self.cond.notify_all()
+                    return
+                self.buffer += chunk
+                self.cond.notify_all()
+
+    def read_until(self, marker: bytes, deadline: Optional[float]):
+        """
+        Wait for `marker` followed by a newline.
+
+        Returns (output before the marker, rest of the marker line) and
+        consumes both. Raises TimeoutError at the deadline and SessionDied
+        if the pipe closes first.
+        """
+        with self.cond:
+            while True:
+                index = self.buffer.find(marker)
+                if index != -1:
+                    newline = self.buffer.find(b"\n", index + len(marker))
+                    if newline != -1:
+                        output = bytes(self.buffer[:index])
+                        tail = bytes(self.buffer[index + len(marker):newline])
+                        del self.buffer[:newline + 1]
+                        return output, tail
+                if self.eof:
+                    raise SessionDied()
+                if deadline is None:
+                    self.cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError()
+                self.cond.wait(remaining)
+
+    def take(self) -> bytes:
+        with self.cond:
+            data = bytes(self.buffer)
+            self.buffer.clear()
+            return data
+
+
+def _decode(data: bytes) -> str:
+    # Same newline handling as subprocess text=True
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+class ShellSession:
+    """One long-lived bash or PowerShell process"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.commands_run = 0
+        if kind == "powershell":
+            argv = ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive",
+                    "-ExecutionPolicy", "Bypass", "-Command", "-"]
+            extra = {"creationflags": subprocess.CREATE_NO_WINDOW}
+        else:
+            argv = ["bash", "--noprofile", "--norc"]
+            extra = {"start_new_session": True}
+        self.proc = subprocess.Popen(
+            argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **extra
+        )
+        self.stdout = _StreamReader(self.proc.stdout)
+        self.stderr = _StreamReader(self.proc.stderr)
+        if kind == "powershell":
+            self._send(POWERSHELL_INIT)
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _send(self, script: str):
+        self.proc.stdin.write(script.encode("utf-8"))
+        self.proc.stdin.flush()
+
+    def execute(self, command: str, timeout: Optional[float]) -> subprocess.CompletedProcess:
+        """Run one command; raises subprocess.TimeoutExpired (session must then be killed)"""
+        sentinel = f"__SHELL_POOL_{uuid.uuid4().hex}__"
+        if self.kind == "powershell":
+            payload = base64.b64encode(command.encode("utf-8")).decode("ascii")
+            script = POWERSHELL_FRAME.format(payload=payload, sentinel=sentinel)
+        else:
+            script = BASH_FRAME.format(command=command, sentinel=sentinel)
+
+        deadline = time.monotonic() + timeout if timeout else None
+        marker = sentinel.encode("ascii")
+        self.commands_run += 1
+        try:
+            self._send(script)
+            stdout, code = self.stdout.read_until(marker, deadline)
+            stderr, _ = self.stderr.read_until(marker, deadline)
+            returncode = int(code.strip() or 0)
+        except TimeoutError:
+            raise subprocess.TimeoutExpired(
+                command, timeout, output=_decode(self.stdout.take()), stderr=_decode(self.stderr.take())
+            )
+        except (SessionDied, BrokenPipeError, OSError):
+            # The command took the shell down with it; report what it printed
+            try:
+                returncode = self.proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                returncode = -1
+            stdout, stderr = self.stdout.take(), self.stderr.take()
+        return subprocess.CompletedProcess(command, returncode, _decode(stdout), _decode(stderr))
+
+    def kill(self):
+        """Kill the shell and everything the current command started"""
+        if self.proc.poll() is None:
+            try:
+                if IS_WINDOWS:
+                    subprocess.run(["taskkill", "/F", "/T", "/PID", str(self.proc.pid)],
+                                   capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+                else:
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+            except (OSError, subprocess.SubprocessError):
+                pass
+            try:
+                self.proc.kill()
+            except OSError:
+                pass
+        for pipe in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class ShellPool:
+    """Bounded pool of warm shell sessions of one kind"""
+
+    def __init__(self, kind: str, size: int = 4, max_commands_per_session: int = 500):
+        """
+        Args:
+            kind: "bash" or "powershell"
+            size: Maximum concurrently running commands (and sessions kept)
+            max_commands_per_session: Sessions are recycled after this many
+                commands so leaks in long-lived interpreters stay bounded
+        """
+        self.kind = kind
+        self.size = size
+        self.max_commands_per_session = max_commands_per_session
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[ShellSession] = []
+        self._lock = threading.Lock()
+        self.stats = {"commands": 0, "spawned": 0, "reused": 0, "timeouts": 0, "crashes": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _checkout(self) -> ShellSession:
+        with self._lock:
+            while self._idle:
+                session = self._idle.pop()
+                if session.alive():
+                    self.stats["reused"] += 1
+                    return session
+                self.stats["crashes"] += 1
+                session.kill()
+            self.stats["spawned"] += 1
+        return ShellSession(self.kind)
+
+    def _checkin(self, session: ShellSession):
+        if not session.alive() or session.commands_run >= self.max_commands_per_session:
+            session.kill()
+            return
+        with self._lock:
+            self._idle.append(session)
+
+    def warm(self, count: Optional[int] = None):
+        """Start sessions ahead of the first commands"""
+        sessions = []
+        for _ in range(min(count or self.size, self.size)):
+            with self._lock:
+                self.stats["spawned"] += 1
+            sessions.append(ShellSession(self.kind))
+        with self._lock:
+            self._idle.extend(sessions)
+
+    def run(self, command: str, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run a command in a pooled session.
+
+        Raises:
+            subprocess.TimeoutExpired: if no session frees up or the command
+                does not finish within `timeout` seconds
+        """
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=timeout) if timeout else self._slots.acquire()
+        if not acquired:
+            self._count("timeouts")
+            raise subprocess.TimeoutExpired(command, timeout)
+        try:
+            remaining = timeout - (time.monotonic() - started) if timeout else None
+            session = self._checkout()
+            try:
+                result = session.execute(command, remaining)
+            except subprocess.TimeoutExpired as e:
+                self._count("timeouts")
+                session.kill()
+                e.timeout = timeout
+                raise
+            except BaseException:
+                session.kill()
+                raise
+            self._count("commands")
+            if not session.alive():
+                self._count("crashes")
+            self._checkin(session)
+            return result
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            session.kill()
+
+
+def _env_enabled() -> bool:
+    # Opt-in until the PowerShell sessions have had more testing on Windows
+    return os.getenv("SHELL_POOL_ENABLED", "false").lower() == "true"
+
+
+# Shell kind for commands written for the platform shell (cmd.exe on Windows,
+# /bin/sh elsewhere), as subprocess's shell=True runs them; never pooled
+SYSTEM_SHELL = "system"
+
+
+def default_shell() -> str:
+    return "powershell" if IS_WINDOWS else "bash"
+
+
+_pools: Dict[str, ShellPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_shell_pool(kind: Optional[str] = None) -> ShellPool:
+    """Get the process-wide pool for a shell kind (PowerShell on Windows, bash elsewhere)"""
+    kind = kind or default_shell()
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            pool = ShellPool(kind, size=int(os.getenv("SHELL_POOL_SIZE", "4")))
+            _pools[kind] = pool
+        return pool
+
+
+def run(command: str, timeout: Optional[float] = None, shell: Optional[str] = None) -> subprocess.CompletedProcess:
+    """
+    Run a command in a warm shell session (drop-in for subprocess.run(..., capture_output=True, text=True)).
+
+    Unless SHELL_POOL_ENABLED=true every command gets its own process as
+    before. shell=SYSTEM_SHELL always does, in cmd.exe or /bin/sh.
+    """
+    kind = shell or default_shell()
+    if kind == SYSTEM_SHELL:
+        return subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
+    if not _env_enabled():
+        argv = ["powershell", "-Command", command] if kind == "powershell" else ["bash", "-c", command]
+        extra = {"creationflags": subprocess.CREATE_NO_WINDOW} if IS_WINDOWS else {}
+        return subprocess.run(argv, capture_output=True, text=True, timeout=timeout, **extra)
+    return get_shell_pool(kind).run(command, timeout=timeout)
+
+
+def check_output(command: str, timeout: Optional[float] = None, shell: Optional[str] = None) -> str:
+    """
+    Drop-in for subprocess.check_output(command, shell=True, text=True, timeout=...);
+    pass shell=SYSTEM_SHELL for commands written for cmd.exe.
+
+    Raises:
+        subprocess.TimeoutExpired: on timeout
+        subprocess.CalledProcessError: on a non-zero exit code
+    """
+    result = run(command, timeout=timeout, shell=shell)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+    return result.stdout
@@ -0,0 +1,182 @@
+"""
+Streaming Diagnosis Endpoint
+
+Server-sent events version of /api/predict/. The telemetry and prompt are
+prepared the same way, then the model's tokens are forwarded as they are
+generated, instead of holding the request until the whole (often
+minutes-long) completion is finished.
+
+Events (each `data:` is JSON):
+    meta   - session_id, ai_provider, telemetry_summary and cache, sent before the first token
+    token  - {"content": "..."} for every chunk of generated text
+    done   - finish_reason, model, usage and the hardware-issue verdict
+    error  - {"error": "..."} if the model fails after streaming started
+
+A completion cache hit is sent as a single token event.
+
+MCP task execution and report generation stay on /api/predict/ and
+/api/mcp/execute/; the client can call those with the streamed text.
+"""
+
+import json
+import uuid
+
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from .views import (
+    OFFLINE_PROVIDER_NAME, DiagnosisCompletion, build_diagnosis_prompt, diagnosis_verdict,
+    gather_prediction_telemetry, offline_completion, parse_use_cache, prediction_telemetry_summary
+)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF accept `Accept: text/event-stream` (the body is streamed by the view)"""
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only reached for error responses; send them as a single error event
+        return sse_event("error", data)
+
+
+def sse_event(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+def stream_diagnosis(input_text, telemetry_data, full_prompt, session_id, use_cache=True):
+    """Generator of SSE-encoded events for one diagnosis"""
+    # SSE comment: flushes the headers right away while the model reads the prompt
+    yield b": diagnosis started\n\n"
+    summary = prediction_telemetry_summary(telemetry_data)
+
+    completion = None
+    try:
+        completion = DiagnosisCompletion(input_text, telemetry_data, use_cache)
+        cached = completion.cached
+        if cached is not None:
+            # A cached completion has the fields of a final chunk
+            first, chunks = cached, iter(())
+        else:
+            chunks = completion.provider.complete_stream(prompt=full_prompt, temperature=completion.temperature,
+                                                         max_tokens=completion.max_tokens)
+            # Pull the first chunk before announcing the provider, so a provider
+            # that is down still falls back to offline mode below
+            first = next(chunks)
+    except Exception as provider_error:
+        if completion is not None:
+            completion.failed(provider_error)
+        print(f"⚠️ LLM Provider Error: {str(provider_error)}")
+        llm_result = offline_completion(input_text, telemetry_data)
+        is_hardware_issue, hardware_component, _ = diagnosis_verdict(
+            input_text, telemetry_data, llm_result['content'], offline=True
+        )
+        yield sse_event("meta", {
+            'session_id': session_id,
+            'ai_provider': OFFLINE_PROVIDER_NAME,
+            'telemetry_summary': summary,
+            'cache': {'hit': False}
+        })
+        yield sse_event("token", {'content': llm_result['content']})
+        yield sse_event("done", {
+            'finish_reason': llm_result['finish_reason'],
+            'model': llm_result['model'],
+            'usage': llm_result['usage'],
+            'is_hardware_issue': is_hardware_issue,
+            'hardware_component': hardware_component
+        })
+        return
+
+    print(f"[LLM] Streaming {completion.provider_name} prediction")
+    yield sse_event("meta", {
+        'session_id': session_id,
+        'ai_provider': completion.provider_name,
+        'telemetry_summary': summary,
+        'cache': cached['cache'] if cached is not None else {'hit': False}
+    })
+
+    parts = []
+    final = first
+    try:
+        for chunk in _chain(first, chunks):
+            if chunk.get('content'):
+                parts.append(chunk['content'])
+                yield sse_event("token", {'content': chunk['content']})
+            if chunk.get('finish_reason'):
+                final = chunk
+    except Exception as stream_error:
+        completion.failed(stream_error)
+        print(f"⚠️ LLM stream failed: {str(stream_error)}")
+        yield sse_event("error", {'error': str(stream_error)})
+        return
+
+    prediction = ''.join(parts)
+    if cached is None:
+        completion.succeeded({
+            'content': prediction,
+            'model': final.get('model'),
+            'finish_reason': final.get('finish_reason'),
+            'usage': final.get('usage', {}),
+            'metadata': final.get('metadata', {})
+        })
+    is_hardware_issue, hardware_component, _ = diagnosis_verdict(input_text, telemetry_data, prediction)
+
+    yield sse_event("done", {
+        'finish_reason': final.get('finish_reason'),
+        'model': final.get('model'),
+        'usage': final.get('usage', {}),
+        'is_hardware_issue': is_hardware_issue,
+        'hardware_component': hardware_component
+    })
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+@api_view(['GET', 'POST'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def predict_stream(request):
+    """
+    Stream a diagnosis as server-sent events (text/event-stream)
+
+    Takes the same body as /api/predict/ (input_text, telemetry_data,
+    device_id, collectors, fields, budget_ms, use_cache). GET with query parameters is
+    also accepted so a browser EventSource can connect directly; there
+    telemetry_data is a JSON-encoded object.
+
+    Invalid requests get a plain 400/404 response before streaming starts.
+    """
+    data = request.data if request.method == 'POST' else request.query_params
+    input_text = data.get('input_text', '')
+    if not input_text:
+        return Response(
+            {
+                'success': False,
+                'error': 'No input provided. Please provide input_text.'
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        telemetry_data = gather_prediction_telemetry(data, input_text)
+    except LookupError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    full_prompt = build_diagnosis_prompt(input_text, telemetry_data)
+    response = StreamingHttpResponse(
+        stream_diagnosis(input_text, telemetry_data, full_prompt, str(uuid.uuid4()), parse_use_cache(data)),
+        content_type="text/event-stream"
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,359 @@
+"""
+Compact Telemetry Encoding
+
+CBOR (RFC 8949) encoding for telemetry payloads, plus gzip/deflate for the
+request and response bodies. Telemetry is mostly arrays of same-keyed dicts
+(processes, partitions, connections), so the encoder uses CBOR string
+references (tags 256/25, http://cbor.schmorp.de/stringref): each repeated
+key or value string is sent once and then referenced by index, which gives
+the schema-keyed layout without a separate schema both sides must agree on.
+
+The cbor2 package is used when installed (it writes and reads the same
+string-referenced format); otherwise the built-in encoder/decoder below
+handles the subset telemetry needs. The DRF renderer/parsers built on this
+live in telemetry_renderers.py.
+"""
+
+import math
+import struct
+import zlib
+from datetime import date, datetime, time
+from typing import Any, Optional
+
+try:
+    import cbor2
+    CBOR2_AVAILABLE = True
+except ImportError:
+    CBOR2_AVAILABLE = False
+
+CBOR_MEDIA_TYPE = "application/cbor"
+
+# Decompressed request body limit (guards against gzip bombs)
+DEFAULT_MAX_BODY_BYTES = 20 * 1024 * 1024
+
+_TAG_STRINGREF = 25
+_TAG_STRINGREF_NAMESPACE = 256
+# Telemetry nests a handful of levels; anything deeper is malformed or hostile
+MAX_NESTING_DEPTH = 64
+
+_pack_half = struct.Struct(">e")
+_pack_float = struct.Struct(">f")
+_pack_double = struct.Struct(">d")
+
+
+def _stringref_min_length(index: int) -> int:
+    """Shortest string worth adding to the reference table at this index (stringref spec)"""
+    if index < 24:
+        return 3
+    if index < 256:
+        return 4
+    if index < 65536:
+        return 5
+    if index < 4294967296:
+        return 7
+    return 11
+
+
+def decompress(body: bytes, encoding: str, limit: int = DEFAULT_MAX_BODY_BYTES) -> bytes:
+    """
+    Inflate a request body according to its Content-Encoding.
+
+    Never holds more than `limit` decompressed bytes; raises ValueError for
+    unsupported encodings or bodies over the limit and zlib.error for
+    corrupt data.
+    """
+    encoding = (encoding or "").strip().lower()
+    if encoding in ("", "identity"):
+        data = body
+    elif encoding in ("gzip", "x-gzip", "deflate"):
+        wbits = zlib.MAX_WBITS if encoding == "deflate" else 16 + zlib.MAX_WBITS
+        inflater = zlib.decompressobj(wbits)
+        data = inflater.decompress(body, limit)
+        if inflater.unconsumed_tail:
+            raise ValueError(f"Body exceeds {limit} bytes when decompressed")
+    else:
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+    if len(data) > limit:
+        raise ValueError(f"Body exceeds {limit} bytes")
+    return data
+
+
+class _Encoder:
+    """Built-in CBOR encoder with optional string references"""
+
+    def __init__(self, string_refs: bool):
+        self.out = bytearray()
+        self.refs = {} if string_refs else None
+
+    def head(self, major: int, value: int):
+        out = self.out
+        major <<= 5
+        if value < 24:
+            out.append(major | value)
+        elif value < 0x100:
+            out.append(major | 24)
+            out.append(value)
+        elif value < 0x10000:
+            out.append(major | 25)
+            out += value.to_bytes(2, "big")
+        elif value < 0x100000000:
+            out.append(major | 26)
+            out += value.to_bytes(4, "big")
+        else:
+            out.append(major | 27)
+            out += value.to_bytes(8, "big")
+
+    def string(self, major: int, raw: bytes, key):
+        refs = self.refs
+        if refs is not None:
+            index = refs.get(key)
+            if index is not None:
+                self.out.append(0xD8)  # tag 25, 1-byte tag number
+                self.out.append(_TAG_STRINGREF)
+                self.head(0, index)
+                return
+            if len(raw) >= _stringref_min_length(len(refs)):
+                refs[key] = len(refs)
+        self.head(major, len(raw))
+        self.out += raw
+
+    def encode(self, obj: Any):
+        if obj is None:
+            self.out.append(0xF6)
+        elif obj is True:
+            self.out.append(0xF5)
+        elif obj is False:
+            self.out.append(0xF4)
+        elif isinstance(obj, str):
+            self.string(3, obj.encode("utf-8"), obj)
+        elif isinstance(obj, int):
+            if obj >= 0:
+                if obj < 0x10000000000000000:
+                    self.head(0, obj)
+                else:
+                    self.bignum(2, obj)
+            elif obj >= -0x10000000000000000:
+                self.head(1, -1 - obj)
+            else:
+                self.bignum(3, -1 - obj)
+        elif isinstance(obj, float):
+            self.encode_float(obj)
+        elif isinstance(obj, dict):
+            self.head(5, len(obj))
+            for key, value in obj.items():
+                self.encode(key)
+                self.encode(value)
+        elif isinstance(obj, (list, tuple)):
+            self.head(4, len(obj))
+            for item in obj:
+                self.encode(item)
+        elif isinstance(obj, (bytes, bytearray)):
+            raw = bytes(obj)
+            self.string(2, raw, (bytes, raw))
+        elif isinstance(obj, (datetime, date, time)):
+            self.encode(obj.isoformat())
+        else:
+            # Same fallback as json.dumps(..., default=str)
+            self.encode(str(obj))
+
+    def encode_float(self, value: float):
+        # Shortest IEEE 754 width that round-trips exactly (NaN/inf fit in half precision)
+        if not math.isfinite(value):
+            self.out.append(0xF9)
+            self.out += _pack_half.pack(value)
+            return
+        try:
+            packed = _pack_float.pack(value)
+            if _pack_float.unpack(packed)[0] == value:
+                self.out.append(0xFA)
+                self.out += packed
+                return
+        except OverflowError:
+            pass
+        self.out.append(0xFB)
+        self.out += _pack_double.pack(value)
+
+    def bignum(self, tag: int, value: int):
+        self.head(6, tag)
+        raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+        # The payload is a byte string like any other, so it takes a stringref slot
+        self.string(2, raw, (bytes, raw))
+
+
+class _Decoder:
+    """Built-in CBOR decoder for definite/indefinite items, floats, bignums and string references"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.namespaces = []
+        self.depth = 0
+
+    def argument(self, info: int) -> Optional[int]:
+        if info < 24:
+            return info
+        if info == 31:
+            return None  # indefinite length
+        size = {24: 1, 25: 2, 26: 4, 27: 8}.get(info)
+        if size is None:
+            raise ValueError(f"Invalid CBOR additional info {info} at offset {self.pos}")
+        start = self.pos
+        self.pos += size
+        if self.pos > len(self.data):
+            raise ValueError("Truncated CBOR data")
+        return int.from_bytes(self.data[start:self.pos], "big")
+
+    def take(self, length: int) -> bytes:
+        start = self.pos
+        self.pos += length
+        if self.pos > len(self.data):
+            raise ValueError("Truncated CBOR data")
+        return self.data[start:self.pos]
+
+    def remember(self, value, length: int):
+        """Add a decoded string to the current stringref table if the encoder would have"""
+        if self.namespaces:
+            table = self.namespaces[-1]
+            if length >= _stringref_min_length(len(table)):
+                table.append(value)
+        return value
+
+    def chunks(self, major: int) -> bytes:
+        """Concatenate the chunks of an indefinite-length string"""
+        parts = []
+        while True:
+            if self.pos >= len(self.data):
+                raise ValueError("Truncated CBOR data")
+            initial = self.data[self.pos]
+            self.pos += 1
+            if initial == 0xFF:
+                return b"".join(parts)
+            if initial >> 5 != major or (initial & 0x1F) == 31:
+                raise ValueError("Invalid chunk in indefinite-length string")
+            parts.append(self.take(self.argument(initial & 0x1F)))
+
+    def decode(self) -> Any:
+        self.depth += 1
+        if self.depth > MAX_NESTING_DEPTH:
+            raise ValueError(f"CBOR nesting exceeds {MAX_NESTING_DEPTH} levels at offset {self.pos}")
+        try:
+            return self.decode_item()
+        finally:
+            self.depth -= 1
+
+    def decode_item(self) -> Any:
+        if self.pos >= len(self.data):
+            raise ValueError("Truncated CBOR data")
+        initial = self.data[self.pos]
+        self.pos += 1
+        major, info = initial >> 5, initial & 0x1F
+
+        if major == 7:
+            if info == 20:
+                return False
+            if info == 21:
+                return True
+            if info in (22, 23):
+                return None
+            if info == 25:
+                return _pack_half.unpack(self.take(2))[0]
+            if info == 26:
+                return _pack_float.unpack(self.take(4))[0]
+            if info == 27:
+                return _pack_double.unpack(self.take(8))[0]
+            if info == 31:
+                raise ValueError(f"Unexpected break at offset {self.pos - 1}")
+            return self.argument(info)  # unassigned simple value
+
+        value = self.argument(info)
+        if major == 0:
+            return value
+        if major == 1:
+            return -1 - value
+        if major == 2:
+            raw = self.chunks(2) if value is None else bytes(self.take(value))
+            return self.remember(raw, len(raw))
+        if major == 3:
+            raw = self.chunks(3) if value is None else self.take(value)
+            return self.remember(bytes(raw).decode("utf-8"), len(raw))
+        if major == 4:
+            if value is None:
+                items = []
+                while self.data[self.pos] != 0xFF:
+                    items.append(self.decode())
+                self.pos += 1
+                return items
+            return [self.decode() for _ in range(value)]
+        if major == 5:
+            result = {}
+            if value is None:
+                while self.data[self.pos] != 0xFF:
+                    key = self.decode()
+                    result[key] = self.decode()
+                self.pos += 1
+            else:
+                for _ in range(value):
+                    key = self.decode()
+                    result[key] = self.decode()
+            return result
+
+        # major == 6: tags
+        if value == _TAG_STRINGREF_NAMESPACE:
+            self.namespaces.append([])
+            try:
+                return self.decode()
+            finally:
+                self.namespaces.pop()
+        if value == _TAG_STRINGREF:
+            index = self.decode()
+            if not self.namespaces or not isinstance(index, int) or index >= len(self.namespaces[-1]):
+                raise ValueError(f"Invalid string reference {index!r}")
+            return self.namespaces[-1][index]
+        if value in (2, 3):
+            number = int.from_bytes(self.decode(), "big")
+            return number if value == 2 else -1 - number
+        # Other tags (dates, URIs, ...) carry no meaning telemetry needs; keep the content
+        return self.decode()
+
+
+def encode_cbor(obj: Any, string_refs: bool = True) -> bytes:
+    """
+    Encode a telemetry payload as CBOR.
+
+    Args:
+        obj: JSON-like data; other types are encoded as str() like json.dumps(default=str)
+        string_refs: Wrap the payload in a stringref namespace so repeated strings are sent once
+    """
+    if CBOR2_AVAILABLE:
+        return cbor2.dumps(obj, string_referencing=string_refs, default=_cbor2_default)
+    encoder = _Encoder(string_refs)
+    if string_refs:
+        encoder.out += b"\xd9\x01\x00"  # tag 256
+    encoder.encode(obj)
+    return bytes(encoder.out)
+
+
+def decode_cbor(data: bytes) -> Any:
+    """Decode a single CBOR item; raises ValueError on malformed or trailing data"""
+    if CBOR2_AVAILABLE:
+        try:
+            return cbor2.loads(data)
+        except cbor2.CBORDecodeError as e:
+            raise ValueError(str(e))
+        except RecursionError:
+            raise ValueError("CBOR nesting too deep")
+    decoder = _Decoder(data)
+    try:
+        result = decoder.decode()
+    except IndexError:
+        raise ValueError("Truncated CBOR data")
+    except TypeError as e:
+        # Well-formed but invalid items: an array as a map key, a bignum tag on an int
+        raise ValueError(f"Invalid CBOR item: {str(e)}")
+    if decoder.pos != len(data):
+        raise ValueError(f"{len(data) - decoder.pos} trailing bytes after CBOR item")
+    return result
+
+
+def _cbor2_default(encoder, value):
+    encoder.encode(value.isoformat() if isinstance(value, (datetime, date, time)) else str(value))
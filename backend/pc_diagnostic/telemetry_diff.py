@@ -0,0 +1,107 @@
+"""
+Telemetry Delta Encoding
+
+Keeps recently served telemetry payloads under version tokens and produces
+JSON-patch style diffs (RFC 6902 add/remove/replace operations) between
+them, so frequently polling dashboards only receive what changed.
+"""
+
+import itertools
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def _escape(token) -> str:
+    """Escape a key for use in a JSON pointer (RFC 6901)"""
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute JSON-patch operations that turn `old` into `new`.
+
+    Dicts are compared key by key and lists index by index (items are
+    replaced in place, extra items added or removed at the tail), so an
+    unchanged subtree never appears in the patch.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in old.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in new:
+                ops.append({"op": "remove", "path": child})
+            else:
+                ops.extend(diff(value, new[key], child))
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": value})
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        shared = min(len(old), len(new))
+        for index in range(shared):
+            ops.extend(diff(old[index], new[index], f"{path}/{index}"))
+        for index in range(shared, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": new[index]})
+        # Remove from the end so earlier indices stay valid while applying
+        for index in range(len(old) - 1, shared - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        return ops
+
+    if type(old) is type(new) and old == new:
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+class TelemetryVersionCache:
+    """
+    Recent telemetry payloads keyed by an opaque version token.
+
+    Tokens combine a random per-instance nonce with a counter, so a token
+    from before a restart or from another worker process never matches a
+    payload here; such clients get the full payload instead of a patch
+    against the wrong base.
+
+    Each scope keeps its own `versions_per_scope` latest payloads, and the
+    `max_scopes` most recently published scopes are kept. Polling one
+    scope never evicts another scope's bases. A client whose base was
+    evicted by other pollers of the same scope gets the full payload
+    again.
+    """
+
+    def __init__(self, versions_per_scope: int = 4, max_scopes: int = 16):
+        self.versions_per_scope = max(int(versions_per_scope), 1)
+        self.max_scopes = max(int(max_scopes), 1)
+        self._scopes: "OrderedDict[str, OrderedDict[str, Dict[str, Any]]]" = OrderedDict()
+        self._nonce = uuid.uuid4().hex[:12]
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, scope: str, payload: Dict[str, Any]) -> str:
+        """
+        Store a payload and return its version token.
+
+        Args:
+            scope: Payloads are only diffed within the same scope (e.g. the issue
+                description), since different scopes collect different sections
+            payload: JSON-serializable telemetry dict (must not be mutated afterwards)
+        """
+        with self._lock:
+            version = f"{self._nonce}-{next(self._counter)}"
+            versions = self._scopes.pop(scope, None) or OrderedDict()
+            versions[version] = payload
+            while len(versions) > self.versions_per_scope:
+                versions.popitem(last=False)
+            self._scopes[scope] = versions
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+            return version
+
+    def get(self, version: str, scope: str) -> Optional[Dict[str, Any]]:
+        """Get a stored payload, or None if it expired, is unknown here or belongs to another scope"""
+        with self._lock:
+            versions = self._scopes.get(scope)
+            return versions.get(version) if versions is not None else None
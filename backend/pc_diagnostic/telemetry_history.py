@@ -0,0 +1,490 @@
+"""
+Telemetry History Store
+
+Columnar time-series storage for sampled telemetry. Every column is a
+fixed-width float64 ring buffer in its own memory-mapped file, so appends
+are O(1) and range queries read only the slice they need. Three tiers are
+kept: raw samples, 1-minute and 1-hour downsamples (average and max), each
+with its own retention limit.
+
+One process writes a store directory at a time: the store holds an
+exclusive lock on it, and a second process (e.g. another server worker)
+opening the same directory gets HistoryStoreLocked instead of writing the
+same ring files.
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import msvcrt
+    MSVCRT_AVAILABLE = True
+except ImportError:
+    MSVCRT_AVAILABLE = False
+
+# Metrics extracted from each sampler snapshot
+METRICS = (
+    "cpu_total",
+    "cpu_p95",
+    "memory_percent",
+    "swap_percent",
+    "disk_max_percent",
+    "disk_read_bytes_per_sec",
+    "disk_write_bytes_per_sec",
+    "net_sent_bytes_per_sec",
+    "net_recv_bytes_per_sec",
+)
+
+# Tier name -> (bucket resolution in seconds, default retention in seconds)
+TIERS = {
+    "raw": (None, 24 * 3600),
+    "1m": (60, 7 * 24 * 3600),
+    "1h": (3600, 90 * 24 * 3600),
+}
+
+# Seconds trends() results are reused (the 1-minute tier's resolution)
+TRENDS_TTL = 60.0
+
+_MAGIC = b"TCOL0001"
+_HEADER = struct.Struct("<8sQQQ")  # magic, capacity, head, count
+_VALUE = struct.Struct("<d")
+_ITEM = _VALUE.size
+
+
+class HistoryStoreLocked(RuntimeError):
+    """The store directory is already open in another process"""
+
+
+class _DirectoryLock:
+    """Exclusive, non-blocking lock on a store directory, released on close or process exit"""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, ".lock")
+        self._file = open(self.path, "a+b")
+        try:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif MSVCRT_AVAILABLE:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self._file.close()
+            raise HistoryStoreLocked(f"Telemetry history at {directory} is in use by another process")
+
+    def release(self):
+        if self._file.closed:
+            return
+        if MSVCRT_AVAILABLE and not FCNTL_AVAILABLE:
+            try:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+        self._file.close()  # closing the file also drops an flock
+
+
+class _MappedColumn:
+    """Fixed-capacity float64 ring buffer stored in a memory-mapped file"""
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        size = _HEADER.size + capacity * _ITEM
+
+        existing_ok = False
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            with open(path, "rb") as f:
+                magic, stored_capacity, _, _ = _HEADER.unpack(f.read(_HEADER.size))
+            existing_ok = magic == _MAGIC and stored_capacity == capacity
+
+        if not existing_ok:
+            # New column, or the capacity changed: start empty
+            with open(path, "wb") as f:
+                f.truncate(size)
+                f.seek(0)
+                f.write(_HEADER.pack(_MAGIC, capacity, 0, 0))
+
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+    @property
+    def head(self) -> int:
+        return _HEADER.unpack_from(self._mm, 0)[2]
+
+    @property
+    def count(self) -> int:
+        return _HEADER.unpack_from(self._mm, 0)[3]
+
+    def set_position(self, head: int, count: int):
+        _HEADER.pack_into(self._mm, 0, _MAGIC, self.capacity, head, count)
+
+    def write(self, index: int, value: float):
+        _VALUE.pack_into(self._mm, _HEADER.size + index * _ITEM, value)
+
+    def read(self, index: int) -> float:
+        return _VALUE.unpack_from(self._mm, _HEADER.size + index * _ITEM)[0]
+
+    def read_slice(self, start: int, stop: int) -> array:
+        """Read physical rows [start, stop) without touching the rest of the file"""
+        values = array("d")
+        values.frombytes(self._mm[_HEADER.size + start * _ITEM:_HEADER.size + stop * _ITEM])
+        return values
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+class _Tier:
+    """A set of aligned columns (timestamps + metrics) sharing one ring position"""
+
+    def __init__(self, directory: str, capacity: int, columns: Iterable[str]):
+        os.makedirs(directory, exist_ok=True)
+        self.capacity = capacity
+        self.timestamps = _MappedColumn(os.path.join(directory, "timestamp.col"), capacity)
+        self.columns = {
+            name: _MappedColumn(os.path.join(directory, f"{name}.col"), capacity)
+            for name in columns
+        }
+        # A crash between column writes (or a changed column set) leaves the
+        # positions out of step; start the tier over rather than misalign rows
+        position = (self.timestamps.head, self.timestamps.count)
+        if any((column.head, column.count) != position for column in self.columns.values()):
+            for column in (self.timestamps, *self.columns.values()):
+                column.set_position(0, 0)
+
+    def append(self, timestamp: float, values: Dict[str, float]):
+        head, count = self.timestamps.head, self.timestamps.count
+        self.timestamps.write(head, timestamp)
+        for name, column in self.columns.items():
+            column.write(head, values.get(name, math.nan))
+
+        head = (head + 1) % self.capacity
+        count = min(count + 1, self.capacity)
+        for column in (self.timestamps, *self.columns.values()):
+            column.set_position(head, count)
+
+    def _physical(self, logical: int) -> int:
+        head, count = self.timestamps.head, self.timestamps.count
+        return (head - count + logical) % self.capacity
+
+    def _bisect(self, target: float) -> int:
+        """First logical index whose timestamp is >= target"""
+        lo, hi = 0, self.timestamps.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps.read(self._physical(mid)) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _spans(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """Physical [start, stop) spans covering logical rows [lo, hi)"""
+        if lo >= hi:
+            return []
+        start = self._physical(lo)
+        length = hi - lo
+        if start + length <= self.capacity:
+            return [(start, start + length)]
+        return [(start, self.capacity), (0, start + length - self.capacity)]
+
+    def query(self, start: float, end: float, columns: List[str]) -> Tuple[array, Dict[str, array]]:
+        lo = self._bisect(start)
+        hi = self._bisect(math.nextafter(end, math.inf))
+        spans = self._spans(lo, hi)
+
+        timestamps = array("d")
+        for a, b in spans:
+            timestamps.extend(self.timestamps.read_slice(a, b))
+        series = {}
+        for name in columns:
+            values = array("d")
+            for a, b in spans:
+                values.extend(self.columns[name].read_slice(a, b))
+            series[name] = values
+        return timestamps, series
+
+    def oldest(self) -> Optional[float]:
+        if self.timestamps.count == 0:
+            return None
+        return self.timestamps.read(self._physical(0))
+
+    def flush(self):
+        for column in (self.timestamps, *self.columns.values()):
+            column.flush()
+
+    def close(self):
+        for column in (self.timestamps, *self.columns.values()):
+            column.close()
+
+
+class _Bucket:
+    """Running aggregate for one downsampling bucket"""
+
+    __slots__ = ("start", "sums", "counts", "maxes")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.sums = {}
+        self.counts = {}
+        self.maxes = {}
+
+    def add(self, values: Dict[str, float], maxes: Optional[Dict[str, float]] = None):
+        """Add one row; `maxes` carries the true peaks when rolling up already-averaged rows"""
+        for name, value in values.items():
+            if value is None or math.isnan(value):
+                continue
+            peak = maxes.get(name, value) if maxes else value
+            self.sums[name] = self.sums.get(name, 0.0) + value
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.maxes[name] = max(self.maxes.get(name, peak), peak)
+
+    def averages(self) -> Dict[str, float]:
+        return {name: self.sums[name] / self.counts[name] for name in self.sums}
+
+    def result(self) -> Dict[str, float]:
+        values = {}
+        for name, avg in self.averages().items():
+            values[name] = avg
+            values[f"{name}.max"] = self.maxes[name]
+        return values
+
+
+def extract_metrics(snapshot: Dict[str, Any]) -> Dict[str, float]:
+    """Pull the stored metrics out of a sampler snapshot (missing values become NaN)"""
+    def number(value):
+        return float(value) if isinstance(value, (int, float)) else math.nan
+
+    cpu = snapshot.get("cpu") or {}
+    memory = snapshot.get("memory") or {}
+    disk = snapshot.get("disk")
+    disk_percents = [number(p.get("percentage")) for p in disk if isinstance(p, dict)] if isinstance(disk, list) else []
+    disk_percents = [p for p in disk_percents if not math.isnan(p)]
+
+    disk_io = (snapshot.get("disk_io") or {}).get("total") or {}
+    network = (snapshot.get("network") or {}).get("total") or {}
+
+    return {
+        "cpu_total": number(cpu.get("total_usage")),
+        "cpu_p95": number((cpu.get("window_stats") or {}).get("p95")),
+        "memory_percent": number(memory.get("percentage")),
+        "swap_percent": number(memory.get("swap_percentage")),
+        "disk_max_percent": max(disk_percents) if disk_percents else math.nan,
+        "disk_read_bytes_per_sec": number(disk_io.get("read_bytes_per_sec")),
+        "disk_write_bytes_per_sec": number(disk_io.get("write_bytes_per_sec")),
+        "net_sent_bytes_per_sec": number(network.get("bytes_sent_per_sec")),
+        "net_recv_bytes_per_sec": number(network.get("bytes_recv_per_sec")),
+    }
+
+
+class TelemetryHistoryStore:
+    """Raw / 1-minute / 1-hour columnar history of sampled telemetry metrics"""
+
+    def __init__(self, base_dir: str, metrics: Iterable[str] = METRICS,
+                 raw_interval: float = 5.0, retention: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            base_dir: Directory holding one sub-directory per tier
+            metrics: Metric names stored as columns
+            raw_interval: Expected seconds between raw samples (sizes the raw ring)
+            retention: Optional per-tier retention overrides in seconds
+
+        Raises:
+            HistoryStoreLocked: If another process has base_dir open
+        """
+        self.base_dir = base_dir
+        self.metrics = tuple(metrics)
+        self._lock = threading.Lock()
+        # Taken before any ring file is opened (or reset)
+        self._directory_lock = _DirectoryLock(base_dir)
+        retention = dict({name: spec[1] for name, spec in TIERS.items()}, **(retention or {}))
+        self.retention = retention
+
+        downsampled_columns = []
+        for name in self.metrics:
+            downsampled_columns.extend([name, f"{name}.max"])
+
+        self._tiers = {}
+        for tier, (resolution, _) in TIERS.items():
+            step = resolution or raw_interval
+            capacity = max(int(math.ceil(retention[tier] / step)), 1)
+            columns = self.metrics if resolution is None else downsampled_columns
+            self._tiers[tier] = _Tier(os.path.join(base_dir, tier), capacity, columns)
+
+        self._buckets = {"1m": None, "1h": None}
+        self._last_flush = time.monotonic()
+        self._trends_cache = None  # (computed at, windows, trends)
+
+    def record(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        """Append one raw sample and roll it into the downsampled tiers"""
+        timestamp = time.time() if timestamp is None else timestamp
+        values = {name: values.get(name, math.nan) for name in self.metrics}
+
+        with self._lock:
+            self._tiers["raw"].append(timestamp, values)
+            minute = self._roll("1m", timestamp, values)
+            if minute is not None:
+                self._roll("1h", minute.start, minute.averages(), minute.maxes)
+
+            # Let the OS write pages back lazily, but not less than once a minute
+            if time.monotonic() - self._last_flush > 60:
+                self.flush_locked()
+
+    def record_snapshot(self, snapshot: Dict[str, Any]):
+        """Sampler listener: store the metrics of a background snapshot"""
+        self.record(extract_metrics(snapshot), snapshot.get("sampled_at"))
+
+    def _roll(self, tier: str, timestamp: float, values: Dict[str, float],
+              maxes: Optional[Dict[str, float]] = None) -> Optional[_Bucket]:
+        """
+        Add values to the tier's current bucket. When the bucket changes, the
+        finished bucket is written out and returned.
+        """
+        resolution = TIERS[tier][0]
+        start = timestamp - (timestamp % resolution)
+        bucket = self._buckets[tier]
+        finished = None
+
+        if bucket is not None and bucket.start != start:
+            self._tiers[tier].append(bucket.start, bucket.result())
+            finished = bucket
+            bucket = None
+        if bucket is None:
+            bucket = _Bucket(start)
+            self._buckets[tier] = bucket
+        bucket.add(values, maxes)
+        return finished
+
+    def pick_tier(self, start: float, end: float, max_points: int) -> str:
+        """Finest tier that still covers the start of the range without exceeding max_points"""
+        for tier, (resolution, _) in TIERS.items():
+            oldest = self._tiers[tier].oldest()
+            covers = oldest is not None and oldest <= start
+            step = resolution or (self.retention["raw"] / self._tiers["raw"].capacity)
+            fits = (end - start) / step <= max_points
+            if covers and fits:
+                return tier
+        # Nothing covers the whole range: use whichever tier reaches back furthest
+        candidates = [(self._tiers[t].oldest(), i, t) for i, t in enumerate(TIERS) if self._tiers[t].oldest() is not None]
+        return min(candidates)[2] if candidates else "raw"
+
+    def query(self, metrics: List[str], start: float, end: float,
+              tier: str = "auto", max_points: int = 1000) -> Dict[str, Any]:
+        """
+        Read a time range for the given metrics.
+
+        Args:
+            metrics: Metric names; for downsampled tiers "<name>.max" is also valid
+            start: Range start (unix seconds)
+            end: Range end (unix seconds, inclusive)
+            tier: "raw", "1m", "1h" or "auto"
+            max_points: Upper bound on returned points (strided if exceeded)
+
+        Returns:
+            Dictionary with the tier used, timestamps and one series per metric
+        """
+        with self._lock:
+            if tier == "auto":
+                tier = self.pick_tier(start, end, max_points)
+            if tier not in self._tiers:
+                raise ValueError(f"Unknown tier '{tier}'. Use one of: auto, {', '.join(TIERS)}")
+            store = self._tiers[tier]
+            unknown = [m for m in metrics if m not in store.columns]
+            if unknown:
+                raise ValueError(f"Unknown metric(s) for tier '{tier}': {', '.join(unknown)}")
+            timestamps, series = store.query(start, end, metrics)
+
+        stride = max(int(math.ceil(len(timestamps) / max_points)), 1) if max_points > 0 else 1
+
+        def clean(values):
+            return [None if math.isnan(v) else round(v, 3) for v in values[::stride]]
+
+        return {
+            "tier": tier,
+            "start": start,
+            "end": end,
+            "points": len(timestamps[::stride]),
+            "stride": stride,
+            "timestamps": list(timestamps[::stride]),
+            "series": {name: clean(values) for name, values in series.items()},
+        }
+
+    def summarize(self, metric: str, seconds: float, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """
+        Average and max of a metric over the last `seconds`, from the cheapest tier that has it.
+
+        Every row in the range is read (no striding), and on downsampled
+        tiers the max comes from the "<metric>.max" column, so short peaks
+        are not averaged away.
+        """
+        now = time.time() if now is None else now
+        start = now - seconds
+        with self._lock:
+            tier = self.pick_tier(start, now, 2000)
+            columns = [metric] if TIERS[tier][0] is None else [metric, f"{metric}.max"]
+            _, series = self._tiers[tier].query(start, now, columns)
+        values = [v for v in series[metric] if not math.isnan(v)]
+        if not values:
+            return None
+        peaks = [v for v in series[columns[-1]] if not math.isnan(v)]
+        return {
+            "avg": round(sum(values) / len(values), 2),
+            "max": round(max(peaks), 2),
+            "points": len(values),
+            "tier": tier,
+        }
+
+    def trends(self, windows: Tuple[Tuple[str, float], ...] = (("last_hour", 3600), ("last_day", 86400))) -> Dict[str, Any]:
+        """
+        Per-metric averages over a few look-back windows (e.g. 'slow since yesterday').
+
+        Results are reused for TRENDS_TTL seconds; look-back windows this
+        long barely move between requests.
+        """
+        cached = self._trends_cache
+        if cached is not None and cached[1] == windows and time.monotonic() - cached[0] < TRENDS_TTL:
+            return cached[2]
+        trends = {}
+        for metric in self.metrics:
+            windows_data = {}
+            for label, seconds in windows:
+                summary = self.summarize(metric, seconds)
+                if summary is not None:
+                    windows_data[label] = summary
+            if windows_data:
+                trends[metric] = windows_data
+        self._trends_cache = (time.monotonic(), windows, trends)
+        return trends
+
+    def flush_locked(self):
+        for tier in self._tiers.values():
+            tier.flush()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self.flush_locked()
+
+    def close(self):
+        with self._lock:
+            for tier in self._tiers.values():
+                tier.flush()
+                tier.close()
+            self._directory_lock.release()
@@ -0,0 +1,304 @@
+"""
+Token-Budgeted Telemetry Reducer
+
+Shrinks a telemetry dict until its indented JSON fits a prompt token
+budget. Sections are reduced level by level, least relevant to the
+detected issue types first:
+
+1. aggregate: long numeric arrays (per-core usage, ...) become
+   count/min/max/mean, long lists are truncated, long strings are clipped
+2. tighten: the same with smaller limits
+3. summarize: a section keeps only its top-level scalar values
+4. drop: the section is removed and listed under omitted_sections
+
+Sizes are tracked incrementally: every subtree is measured once (as
+characters and newlines, so its size at any indentation depth follows
+directly) and each replacement only adjusts the running total by the
+difference, instead of reserializing the whole dict after every step.
+The input is never modified; changed containers are copied on write.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Top-level keys that describe the request rather than the machine
+PROTECTED_KEYS = ("timestamp", "issue_types_detected", "user_description", "telemetry_source",
+                  "device_id", "sample_age_seconds", "note", "omitted_sections")
+
+# Relevance for sections that are not collectors in the registry
+DEFAULT_RELEVANCE = {
+    "anomalies": {"*": 1.0},
+    "history_trends": {"*": 0.6},
+    "sensor_history": {"*": 0.4, "performance": 1.0, "hardware": 1.0},
+    "collector_status": {"*": 0.2},
+    "timed_out_collectors": {"*": 0.2},
+    "skipped_collectors": {"*": 0.2},
+    "cached_collectors": {"*": 0.2},
+}
+
+# (name, max numeric array length, max list items, max string length, sections up to this relevance)
+LEVELS = (
+    ("aggregate", 16, 10, 500, 1.0),
+    ("tighten", 4, 3, 160, 1.0),
+    ("summarize", None, None, None, 0.99),
+    ("drop", None, None, None, 0.99),
+    ("summarize", None, None, None, 1.0),
+)
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _Reduction:
+    """Working state of one reduce() call: the size memo and running total.
+
+    Kept apart from TelemetryReducer so one shared reducer can serve
+    concurrent requests.
+    """
+
+    def __init__(self, indent: int, budget_chars: float = 0.0):
+        self.indent = indent
+        self.budget_chars = budget_chars
+        self.total = 0
+        self._sizes: Dict[int, Tuple[Any, int, int]] = {}
+
+    # ---- sizes -----------------------------------------------------------
+
+    def _measure(self, node) -> Tuple[int, int]:
+        """(characters at depth 0, newlines) of json.dumps(node, indent=self.indent)"""
+        cached = self._sizes.get(id(node))
+        if cached is not None and cached[0] is node:
+            return cached[1], cached[2]
+
+        if isinstance(node, dict):
+            if not node:
+                chars, lines = 2, 0
+            else:
+                # "{" + per item: newline, indent, key, ": ", value, "," (one fewer) + newline + "}"
+                chars, lines = 2 + len(node) * (4 + self.indent), len(node) + 1
+                for key, value in node.items():
+                    child_chars, child_lines = self._measure(value)
+                    chars += len(json.dumps(key if isinstance(key, str) else json.dumps(key)))
+                    chars += child_chars + child_lines * self.indent
+                    lines += child_lines
+        elif isinstance(node, (list, tuple)):
+            if not node:
+                chars, lines = 2, 0
+            else:
+                chars, lines = 2 + len(node) * (2 + self.indent), len(node) + 1
+                for value in node:
+                    child_chars, child_lines = self._measure(value)
+                    chars += child_chars + child_lines * self.indent
+                    lines += child_lines
+        else:
+            chars, lines = len(json.dumps(node, default=str)), 0
+
+        if isinstance(node, (dict, list, tuple)):
+            # Keep the node referenced so its id cannot be reused while cached
+            self._sizes[id(node)] = (node, chars, lines)
+        return chars, lines
+
+    def size(self, node, depth: int = 0) -> int:
+        """Characters node takes in the indented JSON when nested `depth` levels deep"""
+        chars, lines = self._measure(node)
+        return chars + lines * self.indent * depth
+
+    def exact_size(self, reduced: Dict[str, Any]) -> int:
+        """Re-measure the result; only the two containers edited in place need re-walking"""
+        for node in (reduced, reduced.get("issue_specific")):
+            self._sizes.pop(id(node), None)
+        return self.size(reduced)
+
+    # ---- reduction steps ---------------------------------------------------
+
+    def _replace(self, old, new, depth: int):
+        self.total += self.size(new, depth) - self.size(old, depth)
+        return new
+
+    def _shrink(self, node, depth: int, max_numbers: int, max_items: int, max_string: int):
+        """Aggregate/truncate inside a subtree; returns the same object if nothing changed"""
+        if self.total <= self.budget_chars:
+            return node
+
+        if isinstance(node, str):
+            if len(node) > max_string:
+                return self._replace(node, node[:max_string] + f"... [{len(node) - max_string} chars omitted]", depth)
+            return node
+
+        if isinstance(node, list):
+            if len(node) > max_numbers and all(_is_number(v) for v in node):
+                stats = {
+                    "count": len(node),
+                    "min": min(node),
+                    "max": max(node),
+                    "mean": round(sum(node) / len(node), 2),
+                }
+                return self._replace(node, stats, depth)
+            items = node
+            if len(items) > max_items:
+                # Collector lists are already ranked, so the head is what matters
+                items = items[:max_items] + [f"... {len(items) - max_items} more omitted"]
+                items = self._replace(node, items, depth)
+            changed = items is not node
+            result = []
+            for item in items:
+                new = self._shrink(item, depth + 1, max_numbers, max_items, max_string)
+                changed = changed or new is not item
+                result.append(new)
+            return result if changed else node
+
+        if isinstance(node, dict):
+            result, changed = {}, False
+            for key, value in node.items():
+                new = self._shrink(value, depth + 1, max_numbers, max_items, max_string)
+                changed = changed or new is not value
+                result[key] = new
+            return result if changed else node
+
+        return node
+
+    def _summarize(self, node, depth: int):
+        """Keep only top-level scalars of a section"""
+        if self.total <= self.budget_chars:
+            return node
+        if isinstance(node, dict):
+            kept = {k: v for k, v in node.items() if isinstance(v, _SCALARS)}
+            omitted = [k for k in node if k not in kept]
+            if not omitted:
+                return node
+            kept["omitted_fields"] = omitted
+            return self._replace(node, kept, depth)
+        if isinstance(node, list) and len(node) > 1:
+            return self._replace(node, {"count": len(node), "omitted": "items omitted for brevity"}, depth)
+        return node
+
+    def reduce_units(self, reduced, units, steps: List[str], omitted: List[str]):
+        """Apply every level to the sections, least relevant first, until the budget is met"""
+        for level, max_numbers, max_items, max_string, max_relevance in LEVELS:
+            for parent, key, relevance in units:
+                if self.total <= self.budget_chars:
+                    return
+                if relevance > max_relevance:
+                    continue
+                container = reduced[parent] if parent else reduced
+                if key not in container:
+                    continue
+                depth = 2 if parent else 1
+                old = container[key]
+                if level == "drop":
+                    # The whole '"key": value,' line goes
+                    self.total -= self.size(old, depth) + len(json.dumps(key)) + 2 + self.indent * depth + 2
+                    del container[key]
+                    omitted.append(f"{parent}.{key}" if parent else key)
+                    steps.append(f"drop:{omitted[-1]}")
+                    continue
+                if level == "summarize":
+                    new = self._summarize(old, depth)
+                else:
+                    new = self._shrink(old, depth, max_numbers, max_items, max_string)
+                if new is not old:
+                    container[key] = new
+                    steps.append(f"{level}:{parent + '.' if parent else ''}{key}")
+
+
+class TelemetryReducer:
+    """Reduces telemetry to a token budget using per-section issue relevance"""
+
+    def __init__(self, relevance: Optional[Dict[str, Dict[str, float]]] = None,
+                 chars_per_token: float = 4.0, indent: int = 2):
+        """
+        Args:
+            relevance: Section name -> {issue type: relevance in [0, 1]}; "*"
+                applies to any issue. Issue-specific sections are looked up by
+                their own name. Missing sections count as fully relevant.
+            chars_per_token: Characters per token used to estimate prompt size
+            indent: JSON indentation the prompt is rendered with
+        """
+        self.relevance = dict(DEFAULT_RELEVANCE)
+        self.relevance.update(relevance or {})
+        self.chars_per_token = chars_per_token
+        self.indent = indent
+
+    def size(self, node, depth: int = 0) -> int:
+        """Characters node takes in the indented JSON when nested `depth` levels deep"""
+        return _Reduction(self.indent).size(node, depth)
+
+    def estimate_tokens(self, node) -> int:
+        return int(self.size(node) / self.chars_per_token) + 1
+
+    def section_relevance(self, name: str, issue_types: Iterable[str]) -> float:
+        """Relevance in [0, 1] of a section to the given issue types"""
+        weights = self.relevance.get(name)
+        if weights is None:
+            return 1.0
+        default = weights.get("*", 0.0)
+        return max([weights.get(t, default) for t in issue_types] or [default])
+
+    # ---- driver ------------------------------------------------------------
+
+    def _units(self, telemetry: Dict[str, Any], issue_types: List[str]):
+        """(parent key or None, key, relevance) for every reducible section"""
+        units = []
+        for key in telemetry:
+            if key in PROTECTED_KEYS:
+                continue
+            if key == "issue_specific" and isinstance(telemetry[key], dict):
+                for sub in telemetry[key]:
+                    units.append(("issue_specific", sub, self.section_relevance(sub, issue_types)))
+            else:
+                units.append((None, key, self.section_relevance(key, issue_types)))
+        units.sort(key=lambda unit: unit[2])
+        return units
+
+    def reduce(self, telemetry: Dict[str, Any], budget_tokens: int,
+               issue_types: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Reduce telemetry until its indented JSON fits `budget_tokens`.
+
+        Args:
+            telemetry: Telemetry dict (left unmodified)
+            budget_tokens: Target size in estimated tokens
+            issue_types: Detected issue types; defaults to telemetry["issue_types_detected"]
+
+        Returns:
+            (reduced telemetry, report) where report has the estimated token
+            counts before and after, the steps applied and whether it fits
+        """
+        if issue_types is None:
+            issue_types = telemetry.get("issue_types_detected") or []
+        issue_types = list(issue_types)
+        work = _Reduction(self.indent, budget_tokens * self.chars_per_token)
+        work.total = work.size(telemetry)
+        before = work.total
+
+        reduced = dict(telemetry)
+        if isinstance(reduced.get("issue_specific"), dict):
+            reduced["issue_specific"] = dict(reduced["issue_specific"])
+        steps, omitted = [], []
+
+        if work.total > work.budget_chars:
+            # Reserve room for the note up front; omitted_sections is only known
+            # afterwards, so a second round picks up any overshoot it causes
+            reduced["note"] = "Telemetry reduced to fit the prompt budget; full data available in generated report"
+            units = self._units(reduced, issue_types)
+            for _ in range(2):
+                work.total = work.exact_size(reduced)
+                if work.total <= work.budget_chars:
+                    break
+                work.reduce_units(reduced, units, steps, omitted)
+                if omitted:
+                    reduced["omitted_sections"] = omitted
+            work.total = work.exact_size(reduced)
+
+        report = {
+            "budget_tokens": budget_tokens,
+            "tokens_before": int(before / self.chars_per_token) + 1,
+            "tokens_after": int(work.total / self.chars_per_token) + 1,
+            "fits": work.total <= work.budget_chars,
+            "steps": steps,
+            "omitted_sections": omitted,
+        }
+        return reduced, report
@@ -0,0 +1,60 @@
+"""
+CBOR / Compressed Body Support for DRF
+
+Renderer and parsers that let the telemetry endpoints negotiate
+application/cbor responses and accept gzip/deflate-compressed JSON or CBOR
+request bodies (see telemetry_codec.py for the encoding itself).
+"""
+
+import io
+import zlib
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer
+
+from .telemetry_codec import CBOR_MEDIA_TYPE, decode_cbor, decompress, encode_cbor
+
+
+def _read_body(stream, parser_context) -> bytes:
+    """Request body with any Content-Encoding removed"""
+    request = (parser_context or {}).get("request")
+    encoding = request.META.get("HTTP_CONTENT_ENCODING", "") if request is not None else ""
+    try:
+        return decompress(stream.read() if stream is not None else b"", encoding)
+    except (ValueError, zlib.error) as e:
+        raise ParseError(f"Could not decode request body: {str(e)}")
+
+
+class CBORRenderer(BaseRenderer):
+    """Renders responses as CBOR for clients sending Accept: application/cbor (or ?format=cbor)"""
+
+    media_type = CBOR_MEDIA_TYPE
+    format = "cbor"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return encode_cbor(data)
+
+
+class CBORParser(BaseParser):
+    """Parses CBOR request bodies, optionally gzip/deflate compressed"""
+
+    media_type = CBOR_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return decode_cbor(_read_body(stream, parser_context))
+        except ValueError as e:
+            raise ParseError(f"CBOR parse error - {str(e)}")
+
+
+class CompressedJSONParser(JSONParser):
+    """JSONParser that also accepts gzip/deflate Content-Encoding"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        body = _read_body(stream, parser_context)
+        return super().parse(io.BytesIO(body), media_type, parser_context)
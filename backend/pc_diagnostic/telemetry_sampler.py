@@ -0,0 +1,136 @@
+"""
+Background Telemetry Sampler
+
+Collects CPU, memory, disk, disk I/O, network and process metrics on a fixed cadence
+in a daemon thread and keeps the most recent snapshots in a bounded ring
+buffer, so request handlers can answer from the latest snapshot instead of
+blocking on live collection.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class TelemetrySampler:
+    """Opt-in background sampler backed by a bounded ring buffer"""
+
+    def __init__(self, monitor, interval: float = 5.0, capacity: int = 120):
+        """
+        Args:
+            monitor: HardwareMonitor whose collectors are sampled
+            interval: Seconds between the start of consecutive samples
+            capacity: Maximum number of snapshots kept in the ring buffer
+        """
+        self.monitor = monitor
+        self.interval = max(float(interval), 0.5)
+        self.capacity = max(int(capacity), 1)
+        self._buffer = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.last_duration = 0.0
+
+    def start(self):
+        """Start the sampling thread (no-op if it is already running)"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="telemetry-sampler", daemon=True
+        )
+        self._thread.start()
+        print(f"✅ Background telemetry sampler started (every {self.interval:g}s, {self.capacity} snapshots)")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Signal the sampling thread to stop and wait for it to exit"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Register a callback invoked with every new snapshot (on the sampler thread)"""
+        self._listeners.append(callback)
+
+    def sample_once(self) -> Dict[str, Any]:
+        """Collect one snapshot, push it into the ring buffer and return it"""
+        started = time.monotonic()
+        snapshot = {
+            "sampled_at": time.time(),
+            "timestamp": datetime.now().isoformat(),
+        }
+        results, status = self.monitor.run_collectors({
+            "cpu": self.monitor.get_cpu_info,
+            "memory": self.monitor.get_memory_info,
+            "disk": self.monitor.get_disk_info,
+            "disk_io": self.monitor.get_disk_io_info,
+            "network": self.monitor.get_network_info,
+            "processes": self.monitor.get_top_processes,
+        })
+        snapshot.update(results)
+        snapshot["collector_status"] = status
+        self.last_duration = time.monotonic() - started
+        snapshot["collection_seconds"] = round(self.last_duration, 3)
+        with self._lock:
+            self._buffer.append(snapshot)
+
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ Telemetry sampler listener failed: {str(e)}")
+
+        return snapshot
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent snapshot.
+
+        Args:
+            max_age: If given, snapshots older than this many seconds are ignored
+
+        Returns:
+            The snapshot dict, or None if nothing (fresh enough) is buffered
+        """
+        with self._lock:
+            if not self._buffer:
+                return None
+            snapshot = self._buffer[-1]
+
+        if max_age is not None and self.snapshot_age(snapshot) > max_age:
+            return None
+        return snapshot
+
+    def staleness_limit(self) -> float:
+        """Age after which a snapshot should be treated as stale (a few missed cycles)"""
+        return max(self.interval, self.last_duration) * 3
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        """Get all buffered snapshots, oldest first"""
+        with self._lock:
+            return list(self._buffer)
+
+    @staticmethod
+    def snapshot_age(snapshot: Dict[str, Any]) -> float:
+        """Seconds elapsed since the snapshot was taken"""
+        return max(time.time() - snapshot["sampled_at"], 0.0)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample_once()
+            except RuntimeError:
+                # Collector pool was shut down (interpreter exiting)
+                break
+            except Exception as e:
+                print(f"⚠️ Telemetry sampling failed: {str(e)}")
+            elapsed = time.monotonic() - started
+            self._stop_event.wait(max(self.interval - elapsed, 0.0))
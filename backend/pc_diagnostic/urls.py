@@ -18,14 +18,23 @@ from django.contrib import admin
 from django.urls import path
 from . import views
 from . import mcp_views
+from . import streaming_views
+from . import async_views
 from ai_diagnostic import conversation_views
+from ai_diagnostic import telemetry_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/diagnose/', views.diagnose, name='diagnose'),
     path('api/predict/', views.predict, name='predict'),
+    path('api/predict/stream/', streaming_views.predict_stream, name='predict_stream'),
+    path('api/predict/async/', async_views.apredict, name='apredict'),
+    path('api/llm/status/', views.llm_status, name='llm_status'),
     path('api/upload/', views.upload_file, name='upload_file'),
     path('api/telemetry/', views.get_telemetry, name='get_telemetry'),
+    path('api/telemetry/history/', views.get_telemetry_history, name='get_telemetry_history'),
+    path('api/telemetry/ingest/', telemetry_views.ingest_telemetry, name='ingest_telemetry'),
+    path('api/telemetry/devices/', telemetry_views.list_devices, name='list_devices'),
     path('api/reports/', views.list_reports, name='list_reports'),
     path('api/download_report/<str:filename>/', views.download_report, name='download_report'),
     
@@ -1,9 +1,13 @@
-from rest_framework.decorators import api_view, parser_classes
+from rest_framework.decorators import api_view, parser_classes, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.settings import api_settings
 from django.conf import settings
 from django.http import FileResponse, Http404
+from django.views.decorators.gzip import gzip_page
+from django.utils import timezone
 import random
 import requests
 import os
@@ -19,18 +23,120 @@ import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Import hardware monitoring modules
-from .hardware_monitor import HardwareMonitor
+from .hardware_monitor import HardwareMonitor, project_fields
 from .report_generator import ReportGenerator
 from .hardware_hash import HardwareHashProtection
+from .telemetry_history import TelemetryHistoryStore
+from .telemetry_diff import TelemetryVersionCache, diff as telemetry_diff
+from .anomaly_detectors import AnomalyMonitor
+from .keyword_classifier import KeywordClassifier
+from .telemetry_reducer import TelemetryReducer
+from .telemetry_renderers import CBORRenderer, CBORParser, CompressedJSONParser
+from ai_diagnostic.telemetry_views import latest_device_telemetry
 
 # Import LLM provider factory
-from .llm.factory import get_llm_provider
+from .llm.factory import get_llm_provider, get_provider_info
+from .llm.registry import get_provider_registry
+from .llm.completion_cache import get_completion_cache
 
 # Initialize hardware monitor and report generator
 hardware_monitor = HardwareMonitor()
 report_generator = ReportGenerator()
 hardware_hash_protection = HardwareHashProtection()
 
+# Optional background sampler: telemetry requests answer from the latest snapshot
+if os.getenv("TELEMETRY_SAMPLER_ENABLED", "false").lower() == "true":
+    hardware_monitor.enable_background_sampling(
+        interval=float(os.getenv("TELEMETRY_SAMPLER_INTERVAL", "5")),
+        capacity=int(os.getenv("TELEMETRY_SAMPLER_CAPACITY", "120"))
+    )
+
+# Optional on-disk history of sampled metrics (needs the background sampler)
+telemetry_history = None
+if hardware_monitor.sampler and os.getenv("TELEMETRY_HISTORY_ENABLED", "true").lower() == "true":
+    try:
+        telemetry_history = TelemetryHistoryStore(
+            os.getenv("TELEMETRY_HISTORY_DIR", os.path.join(settings.BASE_DIR, 'telemetry_history')),
+            raw_interval=hardware_monitor.sampler.interval
+        )
+        hardware_monitor.sampler.add_listener(telemetry_history.record_snapshot)
+        hardware_monitor.history = telemetry_history
+        print(f"✅ Telemetry history store enabled at: {telemetry_history.base_dir}")
+    except Exception as e:
+        print(f"⚠️ Telemetry history store unavailable: {str(e)}")
+
+# Optional 1 Hz sensor poller: windowed min/max/avg and throttle counts under sensor_history
+if os.getenv("SENSOR_POLLER_ENABLED", "false").lower() == "true":
+    hardware_monitor.enable_sensor_polling(
+        interval=float(os.getenv("SENSOR_POLLER_INTERVAL", "1")),
+        window_seconds=float(os.getenv("SENSOR_POLLER_WINDOW", "300"))
+    )
+
+# Streaming anomaly detectors over the sampler's snapshots (findings land in issue_specific)
+if hardware_monitor.sampler:
+    # A series that misses a few sampler cycles (or 30s) stops being reported as saturated
+    hardware_monitor.anomaly_monitor = AnomalyMonitor(stale_after=max(hardware_monitor.sampler.interval * 3, 30.0))
+    hardware_monitor.sampler.add_listener(hardware_monitor.anomaly_monitor.observe)
+
+# Component names reported when a hardware-suspect anomaly flags a hardware issue
+ANOMALY_COMPONENTS = {
+    'storage': 'Storage Drive',
+    'network': 'Network Adapter',
+}
+
+
+def hardware_anomalies(telemetry_data):
+    """Sustained hardware-suspect anomaly findings from the collected telemetry"""
+    issue_specific = telemetry_data.get('issue_specific') or {}
+    return [
+        finding for finding in issue_specific.get('anomalies', [])
+        if finding.get('hardware_suspect') and finding.get('kind') == 'sustained_saturation'
+    ]
+
+
+def offline_hardware_suspected(input_text, telemetry_data):
+    """Offline-mode hardware verdict from the user's description and the telemetry"""
+    # Check if user description contains hardware symptoms
+    if HARDWARE_SYMPTOMS.matches(input_text, 'hardware'):
+        return True
+    
+    # Sustained NIC errors over the sampling window point at cabling/adapter faults
+    network_rates = telemetry_data.get('network', {})
+    if isinstance(network_rates, dict) and network_rates.get('total', {}).get('error_rate', 0) > 0.01:
+        return True
+    
+    # Sustained hardware-suspect anomalies from the background detectors
+    return bool(hardware_anomalies(telemetry_data))
+
+
+# Offline-mode hardware symptom keywords; a bare mention of the screen is not
+# evidence of a hardware fault on its own, so those words only count half
+HARDWARE_SYMPTOMS = KeywordClassifier({
+    'hardware': [('screen', 0.5), ('display', 0.5), ('monitor', 0.5), 'lines', 'artifact*', 'flicker*',
+                 'dead pixel', "won't turn on", 'no power', 'beep*', 'clicking', 'overheat*',
+                 'burning smell', 'physical damage', 'broken', 'cracked']
+})
+
+
+# Telemetry endpoints also speak CBOR (Accept/Content-Type: application/cbor) and
+# take gzip-compressed request bodies; responses are gzipped via Accept-Encoding
+TELEMETRY_RENDERERS = list(api_settings.DEFAULT_RENDERER_CLASSES) + [CBORRenderer]
+TELEMETRY_PARSERS = [CompressedJSONParser, CBORParser, FormParser, MultiPartParser]
+
+
+# Telemetry sent to the LLM is reduced to this many (estimated) tokens, using the
+# collectors' issue relevance to decide what to aggregate or drop first
+PROMPT_TELEMETRY_TOKENS = int(os.getenv("PROMPT_TELEMETRY_TOKENS", "5000"))
+telemetry_reducer = TelemetryReducer(relevance=hardware_monitor.registry.relevance_map())
+
+# A diagnosis without collectors/fields only gathers the sections at least this
+# relevant to the detected issue types; the reducer drops less relevant ones first
+PROMPT_SECTION_MIN_RELEVANCE = 0.8
+
+
+# Recently served /api/telemetry/ payloads, for ?since=<version> delta polling
+telemetry_versions = TelemetryVersionCache()
+
 # Local LLM API Configuration (kept for backward compatibility)
 # Using Cloudflare tunnel for http://localhost:8888
 LLM_API_BASE = "http://127.0.0.1:1234"
@@ -38,6 +144,44 @@ LLM_API_BASE = "http://127.0.0.1:1234"
 LLM_MODEL_ID = "reasoning-llama-3.1-cot-re1-nmt-v2-orpo-i1"
 
 
+def parse_selector(value):
+    """Parse a collectors/fields selector given as a list or comma-separated string"""
+    if value in (None, '', []):
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item.strip() for item in value if item and item.strip()]
+
+
+def prompt_sections(issue_types):
+    """Default collectors for a diagnosis: the sections its prompt relies on for these issue types"""
+    candidates = HardwareMonitor.CORE_SECTIONS + HardwareMonitor.EXTENDED_SECTIONS
+    sections = [
+        name for name in candidates
+        if telemetry_reducer.section_relevance(name, issue_types) >= PROMPT_SECTION_MIN_RELEVANCE
+    ]
+    # Issue-specific sections for the detected types, plus anomaly findings
+    return sections + ['issue_specific']
+
+
+def parse_budget(value):
+    """Parse an optional budget_ms latency budget; raises ValueError if it is not a positive number"""
+    if value in (None, ''):
+        return None
+    try:
+        budget = float(value)
+    except (TypeError, ValueError):
+        budget = 0
+    if budget <= 0:
+        raise ValueError(f"budget_ms must be a positive number of milliseconds, got {value!r}")
+    return budget
+
+
+def parse_use_cache(data):
+    """Whether a diagnosis may be answered from the completion cache (use_cache, default true)"""
+    return str(data.get('use_cache', True)).strip().lower() not in ('false', '0', 'no')
+
+
 def generate_mock_analysis(issue_description, telemetry_data):
     """Generate a mock diagnostic analysis when LLM server is unavailable"""
     
@@ -126,117 +270,202 @@ def generate_mock_analysis(issue_description, telemetry_data):
     return mock_response
 
 
-@api_view(['POST'])
-def diagnose(request):
+def prediction_telemetry_summary(telemetry_data):
+    """Short telemetry overview returned alongside a prediction"""
+    return {
+        'timestamp': telemetry_data.get('timestamp'),
+        'system': telemetry_data.get('system_info', {}).get('platform'),
+        'cpu_usage': telemetry_data.get('cpu', {}).get('total_usage'),
+        'memory_usage': telemetry_data.get('memory', {}).get('percentage'),
+        'issue_specific_data': list(telemetry_data.get('issue_specific', {}).keys())
+    }
+
+
+def hardware_issue_details(component, recommendation):
+    """Service-center / hardware-protection navigation options for a hardware verdict"""
+    return {
+        'component': component,
+        'requires_service': True,
+        'navigation_options': {
+            'service_center': {
+                'label': 'Find Nearby Service Centers',
+                'description': 'Locate authorized repair centers near your location',
+                'action': 'navigate_to_service_centers',
+                'icon': 'location'
+            },
+            'hardware_protection': {
+                'label': 'Hardware Protection',
+                'description': 'Generate hardware fingerprint to verify component authenticity',
+                'action': 'navigate_to_hardware_protection',
+                'icon': 'shield'
+            }
+        },
+        'recommendation': recommendation
+    }
+
+
+def run_mcp_tasks(prediction):
+    """Execute the <MCP_TASKS> of a model response and format the results for the chat"""
+    try:
+        from autogen_integration.orchestrator import AutoGenOrchestrator
+        
+        print("Executing MCP tasks...")
+        orchestrator = AutoGenOrchestrator()
+        mcp_result = orchestrator.execute_mcp_tasks(prediction, use_autogen=False)
+        
+        if mcp_result.get('success'):
+            # Format detailed task results for display in chat
+            task_results = mcp_result.get('results', [])
+            formatted_tasks = []
+            
+            for i, task_result in enumerate(task_results, 1):
+                task_info = {
+                    'task_number': i,
+                    'task_name': task_result.get('task', 'Unknown Task'),
+                    'success': task_result.get('success', False),
+                    'status': "✅ Completed" if task_result.get('success') else "❌ Failed",
+                    'analysis': task_result.get('analysis', ''),
+                    'error': task_result.get('error', ''),
+                    'recommendation': task_result.get('recommendation', ''),
+                    'details': task_result.get('details', {}),
+                    'timestamp': task_result.get('timestamp', '')
+                }
+                formatted_tasks.append(task_info)
+            
+            print(f"MCP tasks executed: {mcp_result.get('tasks_completed', 0)} completed")
+            return {
+                'executed': True,
+                'tasks_completed': mcp_result.get('tasks_completed', 0),
+                'tasks_failed': mcp_result.get('tasks_failed', 0),
+                'total_tasks': len(task_results),
+                'tasks': formatted_tasks,  # Detailed task-by-task results
+                'results': mcp_result.get('results', []),  # Original results
+                'summary': mcp_result.get('summary', ''),
+                'execution_summary': orchestrator.get_execution_summary(mcp_result.get('results', []))
+            }
+        else:
+            return {
+                'executed': False,
+                'note': mcp_result.get('error', 'No MCP tasks found in response')
+            }
+    except Exception as mcp_error:
+        print(f"MCP execution error: {str(mcp_error)}")
+        return {
+            'executed': False,
+            'error': str(mcp_error),
+            'note': 'MCP task execution failed - diagnostics available via /api/mcp/execute endpoint'
+        }
+
+
+def generate_prediction_report(input_text, telemetry_data, prediction, session_id):
+    """Generate the downloadable JSON report; returns the 'reports' (or 'report_error') entry"""
+    try:
+        # Generate JSON report
+        json_filename, json_filepath = report_generator.generate_json_report(
+            input_text, telemetry_data, prediction, session_id
+        )
+        print(f"Report generated: {json_filename}")
+        return {
+            'reports': {
+                'json': {
+                    'filename': json_filename,
+                    'download_url': f'/api/download_report/{json_filename}'
+                }
+            }
+        }
+    except Exception as report_error:
+        print(f"Report generation error: {str(report_error)}")
+        return {'report_error': f"Failed to generate reports: {str(report_error)}"}
+
+
+def gather_prediction_telemetry(data, input_text):
     """
-    AI-driven PC diagnostic endpoint
-    Accepts a query and returns a diagnostic message
+    Telemetry for a diagnosis request: the telemetry_data the client sent, the
+    latest push from a remote agent (device_id), or a live collection.
+
+    Raises:
+        LookupError: If device_id has not pushed any telemetry
+        ValueError: If telemetry_data is not a JSON object or the
+            collectors/fields/budget_ms selection is invalid
     """
-    query = request.data.get('query', '')
-    
-    if not query:
-        return Response(
-            {'error': 'Query is required'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    provided_telemetry = data.get('telemetry_data', None)
+    if isinstance(provided_telemetry, str) and provided_telemetry:
+        # Query parameters and form fields carry it as a JSON string
+        try:
+            provided_telemetry = json.loads(provided_telemetry)
+        except ValueError:
+            raise ValueError('telemetry_data must be a JSON object')
+    if provided_telemetry and not isinstance(provided_telemetry, dict):
+        raise ValueError('telemetry_data must be a JSON object')
+    device_id = data.get('device_id')
+    collectors = parse_selector(data.get('collectors'))
+    fields = parse_selector(data.get('fields'))
     
-    # Simulate AI diagnostic responses
-    diagnostics = [
-        f"Analyzing your issue: '{query}'. Based on my assessment, this could be related to system resources.",
-        f"I've processed your query: '{query}'. Consider checking your disk space and memory usage.",
-        f"Regarding '{query}': I recommend running a system scan and updating your drivers.",
-        f"Your query '{query}' suggests a possible software conflict. Try restarting the affected application.",
-        f"After analyzing '{query}', I suggest clearing your cache and temporary files.",
-    ]
+    if provided_telemetry:
+        return provided_telemetry
     
-    response_message = random.choice(diagnostics)
+    if device_id:
+        # Diagnose a fleet device from what its agent last pushed
+        latest = latest_device_telemetry(device_id)
+        if latest is None:
+            raise LookupError(f'No telemetry received from device {device_id}')
+        telemetry_data, collected_at = latest
+        telemetry_data.update({
+            'issue_types_detected': hardware_monitor.identify_issue_type(input_text),
+            'user_description': input_text,
+            'telemetry_source': f'device:{device_id}',
+            'device_id': device_id,
+            'sample_age_seconds': round((timezone.now() - collected_at).total_seconds(), 1),
+        })
+        if fields:
+            telemetry_data = project_fields(telemetry_data, fields)
+        return telemetry_data
     
-    return Response({
-        'query': query,
-        'diagnosis': response_message,
-        'timestamp': request.data.get('timestamp', None)
-    })
+    if collectors is None and fields is None:
+        collectors = prompt_sections(hardware_monitor.identify_issue_type(input_text))
+    return hardware_monitor.get_system_health(
+        input_text, collectors=collectors, fields=fields,
+        budget_ms=parse_budget(data.get('budget_ms'))
+    )
 
 
-@api_view(['POST'])
-def predict(request):
-    """
-    Handle prediction requests using the local reasoning model with telemetry data
-    
-    Request Body:
-        {
-            "input_text": "User's problem description",
-            "telemetry_data": {...},  // Optional: system telemetry data
-            "generate_report": true,   // Optional: generate downloadable report
-            "execute_mcp_tasks": true  // Optional: auto-execute MCP tasks
-        }
+def parse_mcp_hardware_issue(prediction):
+    """(is_hardware_issue, hardware_component) from the <MCP_TASKS> block of a model response"""
+    is_hardware_issue = False
+    hardware_component = None
     
-    Response:
-        {
-            "success": true,
-            "message": "The AI assistant's full response text",
-            "model": "model-name",
-            "finish_reason": "stop",
-            "session_id": "uuid",
-            "telemetry_collected": true,
-            "telemetry_summary": {...},
-            "reports": {...},  // If generate_report=true
-            "mcp_execution": {...},  // If execute_mcp_tasks=true
-            "usage": {...},
-            "metadata": {...}
-        }
-    """
     try:
-        # Extract input from the request
-        input_text = request.data.get('input_text', '')
-        provided_telemetry = request.data.get('telemetry_data', None)
-        generate_report = request.data.get('generate_report', False)
-        execute_mcp = request.data.get('execute_mcp_tasks', True)  # Auto-execute by default
-        
-        if not input_text:
-            return Response(
-                {
-                    'success': False,
-                    'error': 'No input provided. Please provide input_text in the request body.'
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Generate session ID for this diagnosis
-        session_id = str(uuid.uuid4())
-        
-        # Collect system telemetry data based on the issue type
-        print(f"Collecting telemetry data for issue: {input_text}")
-        
-        if provided_telemetry:
-            telemetry_data = provided_telemetry
-        else:
-            telemetry_data = hardware_monitor.get_system_health(input_text)
-        
-        # Check telemetry data size and potentially summarize if too large
-        telemetry_json = json.dumps(telemetry_data, indent=2, default=str)
-        telemetry_size = len(telemetry_json)
-        
-        # If telemetry data is very large (>20KB), create a summary instead
-        if telemetry_size > 20000:
-            print(f"⚠️ Telemetry data is large ({telemetry_size} chars), creating summary...")
-            telemetry_summary = {
-                'timestamp': telemetry_data.get('timestamp'),
-                'system_info': telemetry_data.get('system_info'),
-                'cpu': {
-                    'total_usage': telemetry_data.get('cpu', {}).get('total_usage'),
-                    'per_cpu_usage': 'omitted for brevity'
-                },
-                'memory': telemetry_data.get('memory'),
-                'disk': 'omitted for brevity' if len(str(telemetry_data.get('disk', {}))) > 1000 else telemetry_data.get('disk'),
-                'issue_specific': telemetry_data.get('issue_specific'),
-                'note': 'Full telemetry data available in generated report'
-            }
-            telemetry_json = json.dumps(telemetry_summary, indent=2, default=str)
-            print(f"[INFO] Summarized to {len(telemetry_json)} chars")
-        
-        # Prepare the enhanced prompt with telemetry data
-        user_prompt = f"""
+        # Extract MCP_TASKS JSON from the response
+        if '<MCP_TASKS>' in prediction and '</MCP_TASKS>' in prediction:
+            start_idx = prediction.find('<MCP_TASKS>') + len('<MCP_TASKS>')
+            end_idx = prediction.find('</MCP_TASKS>')
+            mcp_json_str = prediction[start_idx:end_idx].strip()
+            
+            # Parse the JSON
+            mcp_data = json.loads(mcp_json_str)
+            
+            # Check if it's a hardware issue
+            if mcp_data.get('issue_type') == 'hardware':
+                is_hardware_issue = True
+                hardware_component = mcp_data.get('hardware_component', 'Unknown Component')
+                print(f"[HW] Hardware issue detected: {hardware_component}")
+    except Exception as parse_error:
+        print(f"Warning: Could not parse MCP tasks for hardware detection: {str(parse_error)}")
+    
+    return is_hardware_issue, hardware_component
+
+
+def build_diagnosis_prompt(input_text, telemetry_data):
+    """Full LLM prompt (system + user) for a diagnosis, with telemetry reduced to the prompt budget"""
+    # Reduce telemetry to the prompt token budget, least issue-relevant sections first
+    telemetry_for_prompt, reduction = telemetry_reducer.reduce(telemetry_data, PROMPT_TELEMETRY_TOKENS)
+    if reduction['steps']:
+        print(f"⚠️ Telemetry data is large (~{reduction['tokens_before']} tokens), "
+              f"reduced to ~{reduction['tokens_after']} tokens ({len(reduction['steps'])} steps)")
+    telemetry_json = json.dumps(telemetry_for_prompt, indent=2, default=str)
+    
+    # Prepare the enhanced prompt with telemetry data
+    user_prompt = f"""
 User Problem: {input_text}
 
 System Telemetry Data:
@@ -244,9 +473,9 @@ System Telemetry Data:
 
 Please provide a comprehensive diagnosis and solution based on this real-time system data.
 """
-        
-        # Prepare the system prompt
-        system_prompt = """You are an AI PC Diagnostic Expert. Analyze real-time telemetry data to distinguish hardware from software issues.
+    
+    # Prepare the system prompt
+    system_prompt = """You are an AI PC Diagnostic Expert. Analyze real-time telemetry data to distinguish hardware from software issues.
 
 CORE RULES:
 1. Base diagnosis ONLY on provided telemetry data - show specific metrics
@@ -330,280 +559,285 @@ Ex2: "Screen has lines" | Telemetry: GPU 42°C, no driver errors, artifacts in B
 → Show: GPU/display metrics only
 
 Focus on issue-specific telemetry only. Be decisive. Provide actionable next steps."""
+    
+    # Combine system prompt and user prompt for providers that don't support roles
+    return f"{system_prompt}\n\n{user_prompt}"
+
+
+# Provider name reported when no LLM provider answered and the offline engine did
+OFFLINE_PROVIDER_NAME = "Offline Mock Engine"
+HARDWARE_RECOMMENDATION = 'This issue requires professional hardware service. Use the buttons below to find service centers or protect your hardware identity.'
+OFFLINE_HARDWARE_RECOMMENDATION = 'This appears to be a hardware-related issue. Use the buttons below to find service centers or protect your hardware identity.'
+
+
+class DiagnosisCompletion:
+    """
+    Provider, completion cache and provider health bookkeeping for one diagnosis
+
+    Shared by predict, predict_stream and apredict, which differ only in how
+    they ask the model (complete, complete_stream or acomplete). Creating one
+    picks the provider and looks up the cache, both of which may block; the
+    caller asks the model only when `cached` is None and then reports the
+    outcome with succeeded() or failed().
+    """
+
+    def __init__(self, input_text, telemetry_data, use_cache=True, temperature=0.7, max_tokens=4000):
+        self.provider = get_llm_provider()
+        self.provider_name = self.provider.get_provider_name()
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        # Repeats of the same issue on the same machine reuse the earlier answer
+        self.cache = get_completion_cache()
+        self.cache_key = self.cache.key(self.provider, input_text, telemetry_data,
+                                        temperature=temperature, max_tokens=max_tokens)
+        self.cached = self.cache.get(self.cache_key) if use_cache else None
+        if self.cached is not None:
+            print(f"[LLM] Answered from completion cache ({self.cached['cache']['tier']}, {self.cached['cache']['age_seconds']}s old)")
+
+    def succeeded(self, llm_result):
+        """Mark the provider healthy and cache its answer"""
+        get_provider_registry().report_success(self.provider)
+        self.cache.put(self.cache_key, llm_result)
+
+    def failed(self, error):
+        """Feed a provider failure into the registry's health state"""
+        get_provider_registry().report_failure(self.provider, error)
+
+
+def offline_completion(input_text, telemetry_data):
+    """Completion dict from the offline diagnostic engine, used when the provider failed"""
+    print("🔄 Falling back to offline diagnostic mode...")
+    return {
+        'content': generate_mock_analysis(input_text, telemetry_data),
+        'model': "Offline Diagnostic Engine",
+        'finish_reason': "offline_mode",
+        'usage': {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        'metadata': {"provider": "Offline Mock", "id": "", "created": "", "object": "", "system_fingerprint": ""}
+    }
+
+
+def diagnosis_verdict(input_text, telemetry_data, prediction, offline=False):
+    """(is_hardware_issue, hardware_component, recommendation) for a finished diagnosis"""
+    if offline:
+        # No model answer to parse; go by the user's description and the telemetry
+        if offline_hardware_suspected(input_text, telemetry_data):
+            print("[HW] Hardware issue suspected in offline mode")
+            return True, 'Suspected Hardware Component', OFFLINE_HARDWARE_RECOMMENDATION
+        return False, None, None
+
+    # Detect if this is a hardware issue by parsing the MCP_TASKS block
+    is_hardware_issue, hardware_component = parse_mcp_hardware_issue(prediction)
+
+    # Sustained anomalies from the background detectors can flag hardware the model missed
+    anomalies = hardware_anomalies(telemetry_data)
+    if anomalies and not is_hardware_issue:
+        is_hardware_issue = True
+        hardware_component = ANOMALY_COMPONENTS.get(anomalies[0]['issue_type'], 'Unknown Component')
+        print(f"[HW] Hardware issue suspected from anomaly: {anomalies[0]['message']}")
+    return is_hardware_issue, hardware_component, HARDWARE_RECOMMENDATION
+
+
+def prediction_response(input_text, telemetry_data, provider_name, llm_result, session_id):
+    """Body of a /api/predict/ answer, before MCP task results and reports are added"""
+    prediction = llm_result['content']
+    is_hardware_issue, hardware_component, recommendation = diagnosis_verdict(
+        input_text, telemetry_data, prediction, offline=provider_name == OFFLINE_PROVIDER_NAME
+    )
+    response_data = {
+        'success': True,
+        'message': prediction,
+        'prediction': prediction,
+        'model': llm_result['model'],
+        'ai_provider': provider_name,
+        'finish_reason': llm_result['finish_reason'],
+        'session_id': session_id,
+        'is_hardware_issue': is_hardware_issue,
+        'telemetry_collected': True,
+        'telemetry_summary': prediction_telemetry_summary(telemetry_data),
+        'cache': llm_result.get('cache', {'hit': False}),
+        'usage': llm_result['usage'],
+        'metadata': llm_result['metadata']
+    }
+    # Add hardware-specific navigation options if it's a hardware issue
+    if is_hardware_issue:
+        response_data['hardware_issue_details'] = hardware_issue_details(hardware_component, recommendation)
+    return response_data
+
+
+@api_view(['POST'])
+def diagnose(request):
+    """
+    AI-driven PC diagnostic endpoint
+    Accepts a query and returns a diagnostic message
+    """
+    query = request.data.get('query', '')
+    
+    if not query:
+        return Response(
+            {'error': 'Query is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Simulate AI diagnostic responses
+    diagnostics = [
+        f"Analyzing your issue: '{query}'. Based on my assessment, this could be related to system resources.",
+        f"I've processed your query: '{query}'. Consider checking your disk space and memory usage.",
+        f"Regarding '{query}': I recommend running a system scan and updating your drivers.",
+        f"Your query '{query}' suggests a possible software conflict. Try restarting the affected application.",
+        f"After analyzing '{query}', I suggest clearing your cache and temporary files.",
+    ]
+    
+    response_message = random.choice(diagnostics)
+    
+    return Response({
+        'query': query,
+        'diagnosis': response_message,
+        'timestamp': request.data.get('timestamp', None)
+    })
+
+
+@gzip_page
+@api_view(['POST'])
+@renderer_classes(TELEMETRY_RENDERERS)
+@parser_classes(TELEMETRY_PARSERS)
+def predict(request):
+    """
+    Handle prediction requests using the local reasoning model with telemetry data
+    
+    Request Body:
+        {
+            "input_text": "User's problem description",
+            "telemetry_data": {...},  // Optional: system telemetry data
+            "device_id": "workstation-042",  // Optional: diagnose a remote agent's latest pushed telemetry
+            "collectors": ["cpu", "memory"],  // Optional: only gather these sections (default: the ones relevant to the issue)
+            "fields": ["memory.percentage"],  // Optional: project telemetry to these paths
+            "budget_ms": 300,  // Optional: latency budget for telemetry collection
+            "generate_report": true,   // Optional: generate downloadable report
+            "execute_mcp_tasks": true,  // Optional: auto-execute MCP tasks
+            "use_cache": true  // Optional: false to always ask the model (the answer is still cached)
+        }
+    
+    A repeat of the same issue on the same machine within LLM_CACHE_TTL
+    seconds, with telemetry that differs only by noise, is answered from the
+    completion cache ("cache": {"hit": true, ...} in the response).
+    
+    The body may also be sent as CBOR (Content-Type: application/cbor) and
+    gzip-compressed (Content-Encoding: gzip); send Accept: application/cbor
+    for a CBOR response.
+    
+    Response:
+        {
+            "success": true,
+            "message": "The AI assistant's full response text",
+            "model": "model-name",
+            "finish_reason": "stop",
+            "session_id": "uuid",
+            "telemetry_collected": true,
+            "telemetry_summary": {...},
+            "cache": {"hit": false},
+            "reports": {...},  // If generate_report=true
+            "mcp_execution": {...},  // If execute_mcp_tasks=true
+            "usage": {...},
+            "metadata": {...}
+        }
+    """
+    try:
+        # Extract input from the request
+        input_text = request.data.get('input_text', '')
+        generate_report = request.data.get('generate_report', False)
+        execute_mcp = request.data.get('execute_mcp_tasks', True)  # Auto-execute by default
         
-        # Combine system prompt and user prompt for providers that don't support roles
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        if not input_text:
+            return Response(
+                {
+                    'success': False,
+                    'error': 'No input provided. Please provide input_text in the request body.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Generate session ID for this diagnosis
+        session_id = str(uuid.uuid4())
+        
+        # Collect system telemetry data based on the issue type
+        print(f"Collecting telemetry data for issue: {input_text}")
         
-        # Call the LLM using the provider factory pattern
         try:
-            print("[LLM] Initializing LLM provider...")
-            provider = get_llm_provider()
-            provider_name = provider.get_provider_name()
-            print(f"[LLM] Using {provider_name} for prediction")
-            
-            # Call the provider's complete method
-            llm_result = provider.complete(
-                prompt=full_prompt,
-                temperature=0.7,
-                max_tokens=4000
+            telemetry_data = gather_prediction_telemetry(request.data, input_text)
+        except LookupError as e:
+            return Response(
+                {
+                    'success': False,
+                    'error': str(e)
+                },
+                status=status.HTTP_404_NOT_FOUND
             )
-            
-            # Extract results from provider response
-            prediction = llm_result['content']
-            model_used = llm_result['model']
-            finish_reason = llm_result['finish_reason']
-            usage = llm_result['usage']
-            metadata = llm_result['metadata']
-            
-            if not prediction:
-                return Response(
-                    {
-                        'success': False,
-                        'error': 'No content in model response'
-                    },
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
-            # Detect if this is a hardware issue by parsing the MCP_TASKS block
-            is_hardware_issue = False
-            hardware_component = None
-            
-            try:
-                # Extract MCP_TASKS JSON from the response
-                if '<MCP_TASKS>' in prediction and '</MCP_TASKS>' in prediction:
-                    start_idx = prediction.find('<MCP_TASKS>') + len('<MCP_TASKS>')
-                    end_idx = prediction.find('</MCP_TASKS>')
-                    mcp_json_str = prediction[start_idx:end_idx].strip()
-                    
-                    # Parse the JSON
-                    mcp_data = json.loads(mcp_json_str)
-                    
-                    # Check if it's a hardware issue
-                    if mcp_data.get('issue_type') == 'hardware':
-                        is_hardware_issue = True
-                        hardware_component = mcp_data.get('hardware_component', 'Unknown Component')
-                        print(f"[HW] Hardware issue detected: {hardware_component}")
-            except Exception as parse_error:
-                print(f"Warning: Could not parse MCP tasks for hardware detection: {str(parse_error)}")
-            
-            # Build response data
-            response_data = {
-                'success': True,
-                'message': prediction,
-                'prediction': prediction,
-                'model': model_used,
-                'ai_provider': provider_name,  # Add provider name for judges
-                'finish_reason': finish_reason,
-                'session_id': session_id,
-                'is_hardware_issue': is_hardware_issue,
-                'telemetry_collected': True,
-                'telemetry_summary': {
-                    'timestamp': telemetry_data.get('timestamp'),
-                    'system': telemetry_data.get('system_info', {}).get('platform'),
-                    'cpu_usage': telemetry_data.get('cpu', {}).get('total_usage'),
-                    'memory_usage': telemetry_data.get('memory', {}).get('percentage'),
-                    'issue_specific_data': list(telemetry_data.get('issue_specific', {}).keys())
+        except ValueError as e:
+            return Response(
+                {
+                    'success': False,
+                    'error': str(e)
                 },
-                'usage': usage,
-                'metadata': metadata
-            }
-            
-            # Add hardware-specific navigation options if it's a hardware issue
-            if is_hardware_issue:
-                response_data['hardware_issue_details'] = {
-                    'component': hardware_component,
-                    'requires_service': True,
-                    'navigation_options': {
-                        'service_center': {
-                            'label': 'Find Nearby Service Centers',
-                            'description': 'Locate authorized repair centers near your location',
-                            'action': 'navigate_to_service_centers',
-                            'icon': 'location'
-                        },
-                        'hardware_protection': {
-                            'label': 'Hardware Protection',
-                            'description': 'Generate hardware fingerprint to verify component authenticity',
-                            'action': 'navigate_to_hardware_protection',
-                            'icon': 'shield'
-                        }
-                    },
-                    'recommendation': 'This issue requires professional hardware service. Use the buttons below to find service centers or protect your hardware identity.'
-                }
-                print(f"[HW] Added hardware navigation options to response")
-            
-            # Execute MCP tasks if requested
-            if execute_mcp:
-                try:
-                    from autogen_integration.orchestrator import AutoGenOrchestrator
-                    
-                    print("Executing MCP tasks...")
-                    orchestrator = AutoGenOrchestrator()
-                    mcp_result = orchestrator.execute_mcp_tasks(prediction, use_autogen=False)
-                    
-                    if mcp_result.get('success'):
-                        # Format detailed task results for display in chat
-                        task_results = mcp_result.get('results', [])
-                        formatted_tasks = []
-                        
-                        for i, task_result in enumerate(task_results, 1):
-                            task_info = {
-                                'task_number': i,
-                                'task_name': task_result.get('task', 'Unknown Task'),
-                                'success': task_result.get('success', False),
-                                'status': "✅ Completed" if task_result.get('success') else "❌ Failed",
-                                'analysis': task_result.get('analysis', ''),
-                                'error': task_result.get('error', ''),
-                                'recommendation': task_result.get('recommendation', ''),
-                                'details': task_result.get('details', {}),
-                                'timestamp': task_result.get('timestamp', '')
-                            }
-                            formatted_tasks.append(task_info)
-                        
-                        response_data['mcp_execution'] = {
-                            'executed': True,
-                            'tasks_completed': mcp_result.get('tasks_completed', 0),
-                            'tasks_failed': mcp_result.get('tasks_failed', 0),
-                            'total_tasks': len(task_results),
-                            'tasks': formatted_tasks,  # Detailed task-by-task results
-                            'results': mcp_result.get('results', []),  # Original results
-                            'summary': mcp_result.get('summary', ''),
-                            'execution_summary': orchestrator.get_execution_summary(mcp_result.get('results', []))
-                        }
-                        print(f"MCP tasks executed: {mcp_result.get('tasks_completed', 0)} completed")
-                    else:
-                        response_data['mcp_execution'] = {
-                            'executed': False,
-                            'note': mcp_result.get('error', 'No MCP tasks found in response')
-                        }
-                except Exception as mcp_error:
-                    print(f"MCP execution error: {str(mcp_error)}")
-                    response_data['mcp_execution'] = {
-                        'executed': False,
-                        'error': str(mcp_error),
-                        'note': 'MCP task execution failed - diagnostics available via /api/mcp/execute endpoint'
-                    }
-            
-            # Generate reports if requested
-            if generate_report:
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        full_prompt = build_diagnosis_prompt(input_text, telemetry_data)
+        
+        # Call the LLM using the provider factory pattern
+        try:
+            completion = DiagnosisCompletion(input_text, telemetry_data, parse_use_cache(request.data))
+            provider_name = completion.provider_name
+            print(f"[LLM] Using {provider_name} for prediction")
+            llm_result = completion.cached
+            if llm_result is None:
+                # Call the provider's complete method; failures feed the registry's health state
                 try:
-                    # Generate JSON report
-                    json_filename, json_filepath = report_generator.generate_json_report(
-                        input_text, telemetry_data, prediction, session_id
+                    llm_result = completion.provider.complete(
+                        prompt=full_prompt,
+                        temperature=completion.temperature,
+                        max_tokens=completion.max_tokens
                     )
-                    
-                    response_data['reports'] = {
-                        'json': {
-                            'filename': json_filename,
-                            'download_url': f'/api/download_report/{json_filename}'
-                        }
-                    }
-                    
-                    print(f"Report generated: {json_filename}")
-                    
-                except Exception as report_error:
-                    print(f"Report generation error: {str(report_error)}")
-                    response_data['report_error'] = f"Failed to generate reports: {str(report_error)}"
-            
-            return Response(response_data)
-                
+                except Exception as completion_error:
+                    completion.failed(completion_error)
+                    raise
+                completion.succeeded(llm_result)
         except Exception as provider_error:
             # Provider failed - fall back to offline mock analysis
             print(f"⚠️ LLM Provider Error: {str(provider_error)}")
-            print("🔄 Falling back to offline diagnostic mode...")
-            
-            # Use simplified fallback analysis
-            prediction = generate_mock_analysis(input_text, telemetry_data)
-            model_used = "Offline Diagnostic Engine"
-            finish_reason = "offline_mode"
-            usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-            metadata = {
-                "provider": "Offline Mock",
-                "id": "",
-                "created": "",
-                "object": "",
-                "system_fingerprint": ""
-            }
-            
-            # Detect potential hardware issues in offline mode based on keywords and telemetry
-            is_hardware_issue = False
-            hardware_keywords = ['screen', 'display', 'monitor', 'lines', 'artifacts', 'flickering', 
-                               'dead pixel', 'won\'t turn on', 'no power', 'beeping', 'clicking',
-                               'overheat', 'burning smell', 'physical damage', 'broken', 'cracked']
-            
-            # Check if user description contains hardware-related keywords
-            input_lower = input_text.lower()
-            for keyword in hardware_keywords:
-                if keyword in input_lower:
-                    is_hardware_issue = True
-                    break
-            
-            # Also check telemetry for hardware issues
-            if telemetry_data.get('cpu', {}).get('temperature', 0) > 85:
-                is_hardware_issue = True
-            
-            response_data = {
-                'success': True,
-                'prediction': prediction,
-                'message': prediction,
-                'model': model_used,
-                'ai_provider': "Offline Mock Engine",
-                'finish_reason': finish_reason,
-                'session_id': session_id,
-                'is_hardware_issue': is_hardware_issue,
-                'telemetry_collected': True,
-                'telemetry_summary': {
-                    'timestamp': telemetry_data.get('timestamp'),
-                    'system': telemetry_data.get('system_info', {}).get('platform'),
-                    'cpu_usage': telemetry_data.get('cpu', {}).get('total_usage'),
-                    'memory_usage': telemetry_data.get('memory', {}).get('percentage'),
-                    'issue_specific_data': list(telemetry_data.get('issue_specific', {}).keys())
+            provider_name = OFFLINE_PROVIDER_NAME
+            llm_result = offline_completion(input_text, telemetry_data)
+        
+        prediction = llm_result['content']
+        if not prediction:
+            return Response(
+                {
+                    'success': False,
+                    'error': 'No content in model response'
                 },
-                'usage': usage,
-                'metadata': metadata
-            }
-            
-            # Add hardware navigation options if suspected hardware issue
-            if is_hardware_issue:
-                response_data['hardware_issue_details'] = {
-                    'component': 'Suspected Hardware Component',
-                    'requires_service': True,
-                    'navigation_options': {
-                        'service_center': {
-                            'label': 'Find Nearby Service Centers',
-                            'description': 'Locate authorized repair centers near your location',
-                            'action': 'navigate_to_service_centers',
-                            'icon': 'location'
-                        },
-                        'hardware_protection': {
-                            'label': 'Hardware Protection',
-                            'description': 'Generate hardware fingerprint to verify component authenticity',
-                            'action': 'navigate_to_hardware_protection',
-                            'icon': 'shield'
-                        }
-                    },
-                    'recommendation': 'This appears to be a hardware-related issue. Use the buttons below to find service centers or protect your hardware identity.'
-                }
-                print(f"[HW] Hardware issue suspected in offline mode - added navigation options")
-            
-            # Generate reports if requested
-            if generate_report:
-                try:
-                    json_filename, json_filepath = report_generator.generate_json_report(
-                        input_text, telemetry_data, prediction, session_id
-                    )
-                    
-                    response_data['reports'] = {
-                        'json': {
-                            'filename': json_filename,
-                            'download_url': f'/api/download_report/{json_filename}'
-                        }
-                    }
-                except Exception as report_error:
-                    print(f"Report generation error: {str(report_error)}")
-                    response_data['report_error'] = f"Failed to generate reports: {str(report_error)}"
-            
-            return Response(response_data)
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        response_data = prediction_response(input_text, telemetry_data, provider_name, llm_result, session_id)
+        
+        # Execute MCP tasks if requested (only model answers carry them)
+        if execute_mcp and provider_name != OFFLINE_PROVIDER_NAME:
+            response_data['mcp_execution'] = run_mcp_tasks(prediction)
+        
+        # Generate reports if requested
+        if generate_report:
+            response_data.update(generate_prediction_report(input_text, telemetry_data, prediction, session_id))
+        
+        return Response(response_data)
     
+    except ParseError as e:
+        # Malformed JSON/CBOR or a bad Content-Encoding on the request body
+        return Response(
+            {
+                'success': False,
+                'error': str(e.detail)
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as outer_error:
         # Outer exception handler for any unexpected errors
         print(f"💥 Unexpected error in predict endpoint: {str(outer_error)}")
@@ -619,6 +853,31 @@ Focus on issue-specific telemetry only. Be decisive. Provide actionable next ste
         )
 
 
+@api_view(['GET'])
+def llm_status(request):
+    """
+    LLM provider and completion cache status
+    
+    Response:
+        {
+            "success": true,
+            "configured_provider": "local",
+            "providers": {...},  // Build and health state per provider
+            "completion_cache": {"hits": 3, "misses": 5, "hit_rate": 0.375, ...}
+        }
+    """
+    try:
+        return Response({'success': True, **get_provider_info()})
+    except Exception as e:
+        return Response(
+            {
+                'success': False,
+                'error': f'Failed to get LLM status: {str(e)}'
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
 def upload_file(request):
@@ -702,18 +961,65 @@ def list_reports(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@gzip_page
 @api_view(['GET'])
+@renderer_classes(TELEMETRY_RENDERERS)
 def get_telemetry(request):
-    """Get current system telemetry without AI analysis"""
+    """
+    Get current system telemetry without AI analysis
+    
+    Query Parameters:
+        issue: Issue description used to pick issue-specific collectors
+        collectors: Comma-separated sections to gather (e.g. "memory,disk")
+        fields: Comma-separated dotted paths to return (e.g. "memory.percentage")
+        budget_ms: Latency budget for collection; collectors expected to take
+                   longer are served from cache or skipped (see skipped_collectors)
+        since: Version token from a previous response; if this process still
+               has it (the latest 4 versions per issue/selection are kept),
+               only a JSON-patch style diff against that version is returned,
+               otherwise the full telemetry (delta: false)
+        format: "cbor" for a CBOR response (same as Accept: application/cbor)
+    """
     try:
         issue_description = request.GET.get('issue', 'general')
-        telemetry_data = hardware_monitor.get_system_health(issue_description)
+        since = request.GET.get('since')
+        collectors = parse_selector(request.GET.get('collectors'))
+        fields = parse_selector(request.GET.get('fields'))
+        budget_ms = request.GET.get('budget_ms')
+        try:
+            telemetry_data = hardware_monitor.get_system_health(
+                issue_description, collectors=collectors, fields=fields, budget_ms=parse_budget(budget_ms)
+            )
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
+        # Normalize to plain JSON types so versions diff the same way they serialize
+        telemetry_data = json.loads(json.dumps(telemetry_data, default=str))
+        # Different selections produce different shapes, so they never diff against each other
+        scope = f"{issue_description}|{','.join(collectors or [])}|{','.join(fields or [])}|{budget_ms or ''}"
+        version = telemetry_versions.publish(scope, telemetry_data)
+        
+        response_data = {
             'success': True,
-            'telemetry_data': telemetry_data,
-            'timestamp': telemetry_data.get('timestamp')
-        })
+            'version': version,
+            'timestamp': telemetry_data.get('timestamp'),
+            'telemetry_source': telemetry_data.get('telemetry_source'),
+            'snapshot_age_seconds': telemetry_data.get('snapshot_age_seconds')
+        }
+        
+        base = telemetry_versions.get(since, scope) if since else None
+        if base is not None:
+            response_data['delta'] = True
+            response_data['base_version'] = since
+            response_data['patch'] = telemetry_diff(base, telemetry_data)
+        else:
+            response_data['delta'] = False
+            response_data['telemetry_data'] = telemetry_data
+        
+        return Response(response_data)
     except Exception as e:
         return Response({
             'success': False,
@@ -721,6 +1027,63 @@ def get_telemetry(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _parse_history_time(value, default):
+    """Parse a unix timestamp or ISO-8601 string from a query parameter"""
+    if value in (None, ''):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+@api_view(['GET'])
+def get_telemetry_history(request):
+    """
+    Get a time range of sampled telemetry metrics from the history store
+    
+    Query Parameters:
+        metric: Metric name, repeatable (default: all metrics)
+        start: Unix timestamp or ISO-8601 (default: one hour ago)
+        end: Unix timestamp or ISO-8601 (default: now)
+        tier: "raw", "1m", "1h" or "auto" (default: auto)
+        max_points: Maximum points per series (default: 1000)
+    """
+    if telemetry_history is None:
+        return Response({
+            'success': False,
+            'error': 'Telemetry history is disabled. Set TELEMETRY_SAMPLER_ENABLED=true to record history.'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    try:
+        metrics = request.GET.getlist('metric') or list(telemetry_history.metrics)
+        end = _parse_history_time(request.GET.get('end'), datetime.now().timestamp())
+        start = _parse_history_time(request.GET.get('start'), end - 3600)
+        tier = request.GET.get('tier', 'auto')
+        max_points = int(request.GET.get('max_points', 1000))
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': f'Invalid query parameter: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        history = telemetry_history.query(metrics, start, end, tier=tier, max_points=max_points)
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': str(e),
+            'available_metrics': list(telemetry_history.metrics)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': f'Failed to read telemetry history: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    return Response({'success': True, **history})
+
+
 @api_view(['POST'])
 def generate_hardware_hash(request):
     """
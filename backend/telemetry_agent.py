@@ -0,0 +1,177 @@
+"""
+Remote Telemetry Agent
+
+Lightweight agent for fleet machines: collects telemetry with the same
+HardwareMonitor collectors the server uses, buffers samples locally and
+pushes them to /api/telemetry/ingest/ as gzip-compressed JSON (or CBOR)
+batches. Samples
+stay buffered (up to --max-buffer) while the server is unreachable and are
+sent once it comes back.
+
+Usage:
+    python telemetry_agent.py --server http://diag-server:8000 --device-id WS-042
+    python telemetry_agent.py --server http://127.0.0.1:8000 --once   (collect and send one sample)
+    python telemetry_agent.py --server http://diag-server:8000 --format cbor
+
+Environment:
+    TELEMETRY_INGEST_TOKEN   Sent as "Authorization: Bearer <token>"; the server refuses
+                             agents without it unless TELEMETRY_INGEST_ALLOW_OPEN=true
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import socket
+import sys
+import time
+from collections import deque
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.hardware_monitor import HardwareMonitor
+from pc_diagnostic.telemetry_codec import CBOR_MEDIA_TYPE, encode_cbor
+
+AGENT_VERSION = "1.0"
+
+
+class TelemetryAgent:
+    """Collects samples on an interval and ships them in compressed batches"""
+
+    def __init__(self, server, device_id, interval=30.0, batch_size=10, max_buffer=1000,
+                 token=None, timeout=15.0, fmt='json'):
+        """
+        Args:
+            server: Base URL of the diagnostics server
+            device_id: Identifier this machine reports under
+            interval: Seconds between samples
+            batch_size: Samples per upload
+            max_buffer: Samples kept while the server is unreachable (oldest dropped first)
+            token: Optional ingest token
+            timeout: HTTP timeout in seconds
+            fmt: Batch encoding, 'json' or 'cbor'
+        """
+        self.url = server.rstrip('/') + '/api/telemetry/ingest/'
+        self.device_id = device_id
+        self.interval = interval
+        self.batch_size = batch_size
+        self.buffer = deque(maxlen=max_buffer)
+        self.timeout = timeout
+        self.monitor = HardwareMonitor()
+        self.fmt = fmt
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Content-Type': CBOR_MEDIA_TYPE if fmt == 'cbor' else 'application/json',
+            'Content-Encoding': 'gzip',
+        })
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+        self._backoff = 0.0
+        self._retry_after = 0.0
+
+    def collect(self):
+        """Collect one full sample (core sections plus every issue-specific collector)"""
+        sections = list(self.monitor.CORE_SECTIONS) + self.monitor.registry.issue_sections()
+        if 'advanced_sensors' in self.monitor.registry:
+            sections.append('advanced_sensors')
+        telemetry = self.monitor.get_system_health('general', collectors=sections)
+        sample = {'collected_at': time.time(), 'telemetry': telemetry}
+        self.buffer.append(sample)
+        return sample
+
+    def flush(self):
+        """
+        Send buffered samples in batches.
+
+        Returns:
+            Number of samples the server accepted. Samples are only removed
+            from the buffer once their batch was accepted.
+        """
+        sent = 0
+        while self.buffer:
+            batch = [self.buffer[i] for i in range(min(self.batch_size, len(self.buffer)))]
+            body = {
+                'device_id': self.device_id,
+                'hostname': socket.gethostname(),
+                'platform': platform.platform(),
+                'agent_version': AGENT_VERSION,
+                'samples': batch,
+            }
+            if self.fmt == 'cbor':
+                payload = gzip.compress(encode_cbor(body))
+            else:
+                payload = gzip.compress(json.dumps(body, default=str).encode('utf-8'))
+
+            response = self.session.post(self.url, data=payload, timeout=self.timeout)
+            if response.status_code == 400:
+                # The server will never accept these; don't retry them forever
+                print(f"⚠️ Server rejected batch: {response.text[:200]}")
+            else:
+                response.raise_for_status()
+                sent += len(batch)
+            for _ in batch:
+                self.buffer.popleft()
+        return sent
+
+    def run_forever(self):
+        print(f"✅ Telemetry agent started: device {self.device_id} -> {self.url} every {self.interval:g}s")
+        next_sample = time.monotonic()
+        while True:
+            try:
+                self.collect()
+            except Exception as e:
+                print(f"⚠️ Telemetry collection failed: {str(e)}")
+
+            if len(self.buffer) >= self.batch_size and time.monotonic() >= self._retry_after:
+                try:
+                    sent = self.flush()
+                    self._backoff = 0.0
+                    print(f"📤 Sent {sent} sample(s)")
+                except requests.RequestException as e:
+                    # Exponential backoff up to 5 minutes; samples stay buffered
+                    self._backoff = min(max(self._backoff * 2, self.interval), 300.0)
+                    self._retry_after = time.monotonic() + self._backoff
+                    print(f"⚠️ Upload failed ({str(e)}); {len(self.buffer)} sample(s) buffered, "
+                          f"retrying in {self._backoff:g}s")
+
+            # Don't try to catch up on samples missed while collection/upload overran
+            next_sample = max(next_sample + self.interval, time.monotonic())
+            time.sleep(max(next_sample - time.monotonic(), 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Push telemetry from this machine to the diagnostics server')
+    parser.add_argument('--server', default='http://127.0.0.1:8000', help='Diagnostics server base URL')
+    parser.add_argument('--device-id', default=socket.gethostname(), help='Device identifier (default: hostname)')
+    parser.add_argument('--interval', type=float, default=30.0, help='Seconds between samples')
+    parser.add_argument('--batch-size', type=int, default=10, help='Samples per upload')
+    parser.add_argument('--max-buffer', type=int, default=1000, help='Samples buffered while offline')
+    parser.add_argument('--format', choices=['json', 'cbor'], default='json', help='Batch encoding')
+    parser.add_argument('--once', action='store_true', help='Collect and send a single sample, then exit')
+    args = parser.parse_args()
+
+    agent = TelemetryAgent(
+        args.server, args.device_id,
+        interval=args.interval,
+        batch_size=1 if args.once else args.batch_size,
+        max_buffer=args.max_buffer,
+        token=os.getenv('TELEMETRY_INGEST_TOKEN'),
+        fmt=args.format,
+    )
+    if args.once:
+        agent.collect()
+        sent = agent.flush()
+        print(f"📤 Sent {sent} sample(s) for device {args.device_id}")
+        return
+
+    try:
+        agent.run_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Telemetry agent stopped")
+
+
+if __name__ == '__main__':
+    main()
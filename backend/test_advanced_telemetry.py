@@ -0,0 +1,225 @@
+"""
+Test AdvancedTelemetry's single-pass sensor snapshot and the windowed
+sensor poller against a fake LibreHardwareMonitor Computer and NVML
+
+Usage: python test_advanced_telemetry.py   (or: python -m pytest test_advanced_telemetry.py)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.advanced_telemetry import AdvancedTelemetry
+from pc_diagnostic.sensor_poller import SensorPoller, SensorWindow
+
+
+class FakeSensor:
+    def __init__(self, hardware_id, name, sensor_type, value, minimum=None, maximum=None):
+        self.Name = name
+        self.SensorType = sensor_type
+        self.Identifier = f"{hardware_id}/{sensor_type.lower()}/{name}"
+        self.Value = value
+        self.Min = minimum
+        self.Max = maximum
+
+
+class FakeHardware:
+    """Sensor values only change when Update() is called, like LibreHardwareMonitor"""
+
+    def __init__(self, name, hardware_type, identifier, readings, sub_hardware=()):
+        self.Name = name
+        self.HardwareType = hardware_type
+        self.Identifier = identifier
+        self.SubHardware = list(sub_hardware)
+        self.readings = readings
+        self.updates = 0
+        self.Sensors = []
+
+    def Update(self):
+        self.updates += 1
+        self.Sensors = [FakeSensor(self.Identifier, *reading(self.updates)) for reading in self.readings]
+
+
+class FakeComputer:
+    def __init__(self):
+        self.superio = FakeHardware("Nuvoton NCT6798D", "SuperIO", "/lpc/nct6798d", [
+            lambda n: ("Fan #1", "Fan", 1200.0 + n),
+            lambda n: ("Vcore", "Voltage", 1.25),
+        ])
+        self.cpu = FakeHardware("Fake CPU", "Cpu", "/intelcpu/0", [
+            lambda n: ("Core #1", "Temperature", 60.0 + n, 40.0, 90.0),
+            lambda n: ("Package", "Power", 65.0),
+            lambda n: ("Core #1", "Clock", 4200.0),
+            lambda n: ("Core #2", "Temperature", None),
+        ])
+        self.board = FakeHardware("Fake Board", "Motherboard", "/motherboard", [], sub_hardware=[self.superio])
+        self.Hardware = [self.cpu, self.board]
+
+
+def test_single_refresh_for_all_sections():
+    computer = FakeComputer()
+    telemetry = AdvancedTelemetry(computer=computer)
+    data = telemetry.get_all_sensors()
+
+    assert computer.cpu.updates == 1 and computer.board.updates == 1 and computer.superio.updates == 1
+    assert data["thermal_sensors"] == {
+        "Fake CPU_Core #1": {"value": 61.0, "min": 40.0, "max": 90.0, "unit": "°C"}
+    }
+    assert data["power_sensors"] == {"Fake CPU_Package": {"value": 65.0, "unit": "W"}}
+    assert data["clock_sensors"]["Fake CPU_Core #1"]["unit"] == "MHz"
+    assert data["nvidia_gpu_telemetry"] == []
+
+
+def test_sub_hardware_sensors_included():
+    telemetry = AdvancedTelemetry(computer=FakeComputer())
+    data = telemetry.get_all_sensors()
+    assert data["fan_sensors"] == {"Nuvoton NCT6798D_Fan #1": {"value": 1201.0, "unit": "RPM"}}
+    assert data["voltage_sensors"]["Nuvoton NCT6798D_Vcore"]["value"] == 1.25
+    names = [hw["name"] for hw in data["librehardware_sensors"]]
+    assert names == ["Fake CPU", "Fake Board", "Nuvoton NCT6798D"]
+
+
+def test_sections_consistent_and_snapshot_reused():
+    computer = FakeComputer()
+    telemetry = AdvancedTelemetry(computer=computer)
+    thermal = telemetry.get_thermal_sensors()
+    fans = telemetry.get_fan_sensors()
+    # Both views come from the same refresh
+    assert thermal["Fake CPU_Core #1"]["value"] == 61.0
+    assert fans["Nuvoton NCT6798D_Fan #1"]["value"] == 1201.0
+    assert computer.cpu.updates == 1
+
+    telemetry.get_thermal_sensors(max_age=0)
+    assert computer.cpu.updates == 2
+
+
+def test_snapshot_index():
+    telemetry = AdvancedTelemetry(computer=FakeComputer())
+    snapshot = telemetry.snapshot()
+    assert [r.name for r in snapshot.get("Temperature")] == ["Core #1", "Core #2"]
+    assert [r.name for r in snapshot.get("Fan", "/lpc/nct6798d")] == ["Fan #1"]
+    assert len(snapshot.by_hardware["/intelcpu/0"]) == 4
+
+
+def test_failed_refresh_returns_no_snapshot():
+    computer = FakeComputer()
+    telemetry = AdvancedTelemetry(computer=computer)
+    poller = SensorPoller(telemetry, interval=1.0, window_seconds=5)
+    poller.poll_once()
+
+    def broken_update():
+        raise RuntimeError("driver unloaded")
+
+    computer.cpu.Update = broken_update
+    assert telemetry.snapshot() is None
+    assert telemetry.get_thermal_sensors(max_age=0) == {}
+    # The poller skips the failed refresh instead of re-recording the old values
+    poller.poll_once()
+    assert poller.summary()["sensors"]["/intelcpu/0/temperature/Core #1"]["samples"] == 1
+
+
+class FakeNVML:
+    """One GPU whose temperature and throttle reasons follow a script"""
+    NVML_TEMPERATURE_GPU = 0
+    NVML_CLOCK_SM = 1
+
+    def __init__(self, temperatures, reasons):
+        self.temperatures = list(temperatures)
+        self.reasons = list(reasons)
+        self.reads = 0
+
+    def nvmlDeviceGetCount(self):
+        return 1
+
+    def nvmlDeviceGetHandleByIndex(self, index):
+        return index
+
+    def nvmlDeviceGetCurrentClocksThrottleReasons(self, handle):
+        return self.reasons[self.reads]
+
+    def nvmlDeviceGetTemperature(self, handle, sensor):
+        value = self.temperatures[self.reads]
+        self.reads += 1
+        return value
+
+    def nvmlDeviceGetPowerUsage(self, handle):
+        return 150000
+
+    def nvmlDeviceGetClockInfo(self, handle, clock):
+        return 1800
+
+
+def test_window_rolls_over():
+    window = SensorWindow("Core #1", "Fake CPU", "Temperature", "°C", capacity=3)
+    for value in (10.0, 20.0, 30.0, 40.0):
+        window.add(value)
+    stats = window.stats()
+    assert (stats["min"], stats["max"], stats["avg"], stats["last"], stats["samples"]) == (20.0, 40.0, 30.0, 40.0, 3)
+
+
+def test_poller_windows_and_throttle_events():
+    computer = FakeComputer()
+    # GPU throttles (HW thermal slowdown) in two separate bursts; idle (0x1) is not throttling
+    nvml = FakeNVML([70, 84, 85, 75, 84, 70], [0x1, 0x40, 0x40, 0x1, 0x40, 0x0])
+    telemetry = AdvancedTelemetry(computer=computer, pynvml=nvml)
+    poller = SensorPoller(telemetry, interval=1.0, window_seconds=5)
+    for _ in range(6):
+        poller.poll_once()
+
+    summary = poller.summary()
+    assert computer.cpu.updates == 6
+    cpu = summary["sensors"]["/intelcpu/0/temperature/Core #1"]
+    # Window holds the last 5 polls (Update #2..#6), not the lifetime min/max
+    assert (cpu["min"], cpu["max"], cpu["samples"], cpu["throttle_events"]) == (62.0, 66.0, 5, 0)
+    gpu = summary["sensors"]["/nvml/0/temperature"]
+    assert gpu["max"] == 85.0 and gpu["throttle_events"] == 2 and gpu["throttled_samples"] == 3
+    assert summary["throttling_sensors"]["/nvml/0/temperature"] == 2
+    assert set(poller.summary(["Fan"])["sensors"]) == {"/lpc/nct6798d/fan/Fan #1"}
+
+
+def test_summary_does_not_wait_for_a_slow_poll():
+    computer = FakeComputer()
+    telemetry = AdvancedTelemetry(computer=computer)
+    poller = SensorPoller(telemetry, interval=1.0, window_seconds=5)
+    poller.poll_once()
+
+    entered, release = threading.Event(), threading.Event()
+    update = computer.cpu.Update
+
+    def slow_update():
+        entered.set()
+        release.wait(5)
+        update()
+
+    computer.cpu.Update = slow_update
+    polling = threading.Thread(target=poller.poll_once)
+    polling.start()
+    try:
+        assert entered.wait(5)
+        started = time.monotonic()
+        summary = poller.summary()
+        assert time.monotonic() - started < 1.0
+        assert summary["sensors"]["/intelcpu/0/temperature/Core #1"]["samples"] == 1
+    finally:
+        release.set()
+        polling.join(5)
+    assert poller.summary()["sensors"]["/intelcpu/0/temperature/Core #1"]["samples"] == 2
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing AdvancedTelemetry sensor snapshot and poller (fake Computer/NVML)")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,108 @@
+"""
+Test the streaming anomaly detectors (EWMA spikes, sustained saturation, staleness)
+
+Usage: python test_anomaly_detectors.py   (or: python -m pytest test_anomaly_detectors.py)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.anomaly_detectors import AnomalyMonitor, EWMADetector, SaturationWindow
+
+
+def snapshot(sampled_at, cpu=None, latency=None):
+    """Sampler-style snapshot with the CPU total and one disk's latency"""
+    data = {"sampled_at": sampled_at}
+    if cpu is not None:
+        data["cpu"] = {"total_usage": cpu}
+    if latency is not None:
+        data["disk_io"] = {"disks": {"sda": {"avg_read_latency_ms": latency, "avg_write_latency_ms": 1.0}}}
+    return data
+
+
+def feed(monitor, start, seconds, step=5, **values):
+    for offset in range(0, seconds + 1, step):
+        monitor.observe(snapshot(start + offset, **values))
+
+
+def kinds(findings):
+    return sorted((f["series"], f["kind"]) for f in findings)
+
+
+def test_ewma_flags_spikes_after_warmup():
+    detector = EWMADetector(warmup=5)
+    scores = [detector.update(10.0) for _ in range(20)]
+    assert scores[0] is None and scores[4] is None
+    assert not detector.is_spike(scores[-1])
+    assert detector.is_spike(detector.update(80.0))
+
+
+def test_saturation_window_needs_the_full_duration():
+    window = SaturationWindow(threshold=90.0, min_duration=60)
+    assert window.update(95.0, 0) is None
+    assert window.update(99.0, 30) is None
+    assert window.update(96.0, 60) == 60 and window.peak == 99.0
+    assert window.update(50.0, 65) is None and window.since is None
+
+
+def test_live_saturation_is_reported():
+    monitor = AnomalyMonitor()
+    now = time.time()
+    feed(monitor, now - 90, 90, cpu=99.0, latency=500.0)
+    assert kinds(monitor.findings()) == [("cpu_total", "sustained_saturation"),
+                                         ("disk_latency_ms", "sustained_saturation")]
+    hardware = monitor.hardware_findings()
+    assert [f["series"] for f in hardware] == ["disk_latency_ms"]
+    assert hardware[0]["duration_seconds"] == 90.0
+
+
+def test_series_that_stops_reporting_goes_stale():
+    monitor = AnomalyMonitor(stale_after=15)
+    now = time.time()
+    # Disk latency was saturated for two minutes, then the disk_io section vanished
+    feed(monitor, now - 300, 120, cpu=20.0, latency=500.0)
+    assert monitor.hardware_findings() == []
+    # A snapshot without the series resets its window even though CPU keeps reporting
+    feed(monitor, now - 60, 60, cpu=20.0)
+    assert monitor.hardware_findings() == []
+    feed(monitor, now - 20, 20, cpu=20.0, latency=500.0)
+    assert monitor.hardware_findings() == []  # saturated again, but only for 20s
+
+
+def test_gap_between_samples_restarts_the_window():
+    monitor = AnomalyMonitor(stale_after=15)
+    now = time.time()
+    feed(monitor, now - 200, 30, latency=500.0)
+    feed(monitor, now - 40, 40, latency=500.0)  # back after a 130s gap
+    assert monitor.hardware_findings() == []
+
+
+def test_old_spikes_expire_by_wall_clock():
+    monitor = AnomalyMonitor(spike_ttl=60)
+    start = time.time() - 400
+    feed(monitor, start, 100, cpu=10.0)
+    monitor.observe(snapshot(start + 105, cpu=85.0))
+    assert monitor.findings() == []  # the spike was 295s ago
+    recent = AnomalyMonitor(spike_ttl=60)
+    feed(recent, time.time() - 105, 100, cpu=10.0)
+    recent.observe(snapshot(time.time(), cpu=85.0))
+    assert kinds(recent.findings()) == [("cpu_total", "spike")]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing streaming anomaly detectors")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,276 @@
+"""
+Test the async diagnosis endpoint (/api/predict/async/) and the providers' acomplete
+
+The view runs through Django's test clients (WSGI and ASGI) with a fake
+provider; LocalLlamaProvider.acomplete talks to a stub llama.cpp server on
+a local port, and GeminiProvider.acomplete runs against a fake model.
+
+Usage: python test_async_views.py   (or: python -m pytest test_async_views.py)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pc_diagnostic.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.test import AsyncClient, Client
+
+from pc_diagnostic import views
+from pc_diagnostic.llm.base import LLMProvider
+
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+
+def telemetry():
+    # A fresh hostname per call keeps completion cache entries from leaking between tests
+    return {
+        "system_info": {"hostname": f"async-test-{uuid.uuid4().hex[:8]}", "platform": "Linux"},
+        "cpu": {"total_usage": 12.0},
+        "memory": {"percentage": 40.0},
+    }
+
+
+class FakeAsyncProvider(LLMProvider):
+    """Answers acomplete natively; `error` makes every call fail"""
+
+    def __init__(self, content="The disk is fine.", error=None):
+        self.content = content
+        self.error = error
+        self.calls = 0
+
+    def complete(self, prompt, temperature=0.7, max_tokens=4000):
+        raise AssertionError("the async view must not call complete()")
+
+    async def acomplete(self, prompt, temperature=0.7, max_tokens=4000):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return {"content": self.content, "model": "fake-model", "finish_reason": "stop",
+                "usage": {"total_tokens": 3}, "metadata": {"provider": "Fake"}}
+
+    def get_provider_name(self):
+        return "Fake Async"
+
+
+def apredict(provider, asgi=False, **body):
+    """POST `body` to /api/predict/async/ with `provider` answering; returns the response"""
+    saved = views.get_llm_provider
+    views.get_llm_provider = lambda: provider
+    body.setdefault("execute_mcp_tasks", False)
+    try:
+        if asgi:
+            return asyncio.run(AsyncClient().post("/api/predict/async/", body, content_type="application/json"))
+        return Client().post("/api/predict/async/", json.dumps(body), content_type="application/json")
+    finally:
+        views.get_llm_provider = saved
+
+
+def test_answer_and_cache_hit():
+    provider = FakeAsyncProvider()
+    data = telemetry()
+    first = apredict(provider, input_text="pc is slow", telemetry_data=data).json()
+    assert first["success"] and first["ai_provider"] == "Fake Async"
+    assert first["prediction"] == "The disk is fine." and first["cache"] == {"hit": False}
+    assert first["is_hardware_issue"] is False and first["telemetry_summary"]["cpu_usage"] == 12.0
+    second = apredict(provider, asgi=True, input_text="pc is slow", telemetry_data=data).json()
+    assert second["cache"]["hit"] and second["prediction"] == first["prediction"]
+    assert provider.calls == 1
+
+
+def test_same_response_as_predict():
+    provider = FakeAsyncProvider('Replace the drive. <MCP_TASKS>{"issue_type": "hardware", '
+                                 '"hardware_component": "Storage Drive"}</MCP_TASKS>')
+    body = {"input_text": "disk clicking", "telemetry_data": telemetry(), "use_cache": False,
+            "execute_mcp_tasks": False}
+    async_body = apredict(provider, **body).json()
+
+    saved = views.get_llm_provider
+    views.get_llm_provider = lambda: FakeSyncProvider(provider.content)
+    try:
+        sync_body = Client().post("/api/predict/", json.dumps(body), content_type="application/json").json()
+    finally:
+        views.get_llm_provider = saved
+    for response in (async_body, sync_body):
+        response.pop("session_id")
+        response.pop("ai_provider")
+    assert async_body == sync_body
+    assert async_body["hardware_issue_details"]["component"] == "Storage Drive"
+
+
+class FakeSyncProvider(LLMProvider):
+    def __init__(self, content):
+        self.content = content
+
+    def complete(self, prompt, temperature=0.7, max_tokens=4000):
+        return {"content": self.content, "model": "fake-model", "finish_reason": "stop",
+                "usage": {"total_tokens": 3}, "metadata": {"provider": "Fake"}}
+
+    def get_provider_name(self):
+        return "Fake Sync"
+
+
+def test_provider_failure_falls_back_to_offline_mode():
+    provider = FakeAsyncProvider(error=ConnectionError("connection refused"))
+    response = apredict(provider, asgi=True, input_text="screen flickers and has lines",
+                        telemetry_data=telemetry(), use_cache=False)
+    body = response.json()
+    assert response.status_code == 200 and provider.calls == 1
+    assert body["ai_provider"] == views.OFFLINE_PROVIDER_NAME and body["finish_reason"] == "offline_mode"
+    assert body["is_hardware_issue"] and body["hardware_issue_details"]["component"] == "Suspected Hardware Component"
+
+
+def test_offline_verdict_comes_from_symptoms_and_anomalies():
+    failing = FakeAsyncProvider(error=ConnectionError("connection refused"))
+    data = dict(telemetry(), cpu={"total_usage": 12.0, "temperature": 99.0})
+    body = apredict(failing, input_text="pc is slow", telemetry_data=data, use_cache=False).json()
+    assert body["finish_reason"] == "offline_mode" and body["is_hardware_issue"] is False
+
+    data["issue_specific"] = {"anomalies": [{"kind": "sustained_saturation", "hardware_suspect": True,
+                                             "issue_type": "storage", "message": "sda latency saturated"}]}
+    body = apredict(failing, input_text="pc is slow", telemetry_data=data, use_cache=False).json()
+    assert body["is_hardware_issue"] is True
+
+
+def test_default_collection_is_what_the_prompt_uses():
+    general = views.prompt_sections(["general"])
+    assert general == ["system_info", "cpu", "memory", "disk", "issue_specific"]
+    performance = views.prompt_sections(["performance"])
+    assert {"processes", "process_rankings", "disk_io", "advanced_sensors", "sensor_history"} <= set(performance)
+    assert "network" not in performance and "history_trends" not in performance
+    assert "network" in views.prompt_sections(["network"])
+
+    calls = []
+    saved = views.hardware_monitor.get_system_health
+    views.hardware_monitor.get_system_health = lambda text, **kwargs: calls.append(kwargs) or telemetry()
+    try:
+        views.gather_prediction_telemetry({}, "my wifi keeps dropping")
+        views.gather_prediction_telemetry({"collectors": "memory"}, "my wifi keeps dropping")
+        views.gather_prediction_telemetry({"fields": ["cpu.total_usage"]}, "my wifi keeps dropping")
+    finally:
+        views.hardware_monitor.get_system_health = saved
+    assert calls[0]["collectors"] == views.prompt_sections(["network"]) and calls[0]["fields"] is None
+    assert calls[1]["collectors"] == ["memory"]
+    assert calls[2]["collectors"] is None and calls[2]["fields"] == ["cpu.total_usage"]
+
+
+def test_invalid_requests():
+    assert Client().get("/api/predict/async/").status_code == 405
+    assert Client().post("/api/predict/async/", "[1, 2]", content_type="application/json").status_code == 400
+    assert Client().post("/api/predict/async/", "{", content_type="application/json").status_code == 400
+    assert apredict(FakeAsyncProvider(), input_text="").status_code == 400
+    assert apredict(FakeAsyncProvider(), input_text="x", telemetry_data="abc").status_code == 400
+
+
+class StubLlamaHandler(BaseHTTPRequestHandler):
+    """llama.cpp /v1/chat/completions stub that is 'loading' (503) for the first `loading` requests"""
+    loading = 0
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubLlamaHandler.requests.append(body)
+        if StubLlamaHandler.loading:
+            StubLlamaHandler.loading -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = json.dumps({
+            "id": "cmpl-1", "model": body["model"],
+            "choices": [{"message": {"content": f"echo: {body['messages'][-1]['content']}"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_local_llama_acomplete():
+    from pc_diagnostic.llm.local_llama import LocalLlamaProvider
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLlamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = {name: os.environ.get(name) for name in ("LLAMA_API_BASE", "LLAMA_MAX_RETRIES")}
+    os.environ["LLAMA_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["LLAMA_MAX_RETRIES"] = "2"
+    try:
+        provider = LocalLlamaProvider()
+        StubLlamaHandler.requests = []
+        StubLlamaHandler.loading = 1
+        # Two separate loops, like two requests under WSGI
+        for _ in range(2):
+            result = asyncio.run(provider.acomplete("System: be brief\n\nUser: hello", temperature=0.1, max_tokens=5))
+            assert result["content"].startswith("echo:") and result["usage"]["total_tokens"] == 7
+            assert result["metadata"]["provider"] == "Local LLaMA"
+        assert len(StubLlamaHandler.requests) == 3  # the 503 was retried
+        assert StubLlamaHandler.requests[-1]["max_tokens"] == 5
+        assert provider._async_clients == {}  # each loop's client closed with it
+        provider.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_gemini_acomplete_works_across_event_loops():
+    try:
+        from pc_diagnostic.llm.gemini import GeminiProvider
+    except ImportError:
+        print("⚠️ google-generativeai not installed, skipping Gemini acomplete test")
+        return
+
+    class FakeModel:
+        def __init__(self):
+            self.threads = []
+
+        def generate_content(self, prompt, generation_config=None):
+            self.threads.append(threading.current_thread())
+            return type("Response", (), {"text": f"gemini: {prompt}"})()
+
+        async def generate_content_async(self, *args, **kwargs):
+            raise AssertionError("the grpc.aio client is bound to the first event loop")
+
+    provider = GeminiProvider.__new__(GeminiProvider)
+    provider.model_name = "gemini-test"
+    provider.model = FakeModel()
+    for _ in range(2):
+        result = asyncio.run(provider.acomplete("hello", max_tokens=5))
+        assert result["content"] == "gemini: hello" and result["model"] == "gemini-test"
+    assert threading.main_thread() not in provider.model.threads
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing async diagnosis endpoint and acomplete")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,92 @@
+"""
+Test the cost-aware collector registry (cost estimates, caching, budget scheduling)
+
+Usage: python test_collector_registry.py   (or: python -m pytest test_collector_registry.py)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.collector_registry import Collector, CollectorRegistry
+
+
+def make_registry():
+    registry = CollectorRegistry(system="Linux")
+    registry.register(Collector("cpu", dict, cost_ms=100))
+    registry.register(Collector("network", dict, cost_ms=50, relevance={"*": 0.5, "network": 1.0}))
+    registry.register(Collector("display", dict, platforms=["Windows"], cost_ms=1500, issue_specific=True))
+    registry.register(Collector("system_info", dict, cost_ms=5, ttl=60))
+    return registry
+
+
+def test_first_run_is_left_out_of_the_estimate():
+    registry = make_registry()
+    registry.record("network", 550.0, {})  # priming window
+    assert registry.costs()["network"] == 50.0
+    registry.record("network", 60.0, {})
+    assert registry.costs()["network"] == 53.0
+
+
+def test_primed_collector_still_fits_the_budget():
+    registry = make_registry()
+    registry.record("network", 550.0, {})
+    plan = registry.schedule(["cpu", "network"], ["network"], budget_ms=300, workers=1)
+    assert plan.run == ["network", "cpu"] and not plan.skipped
+
+
+def test_skipped_collector_estimate_decays_until_it_runs_again():
+    registry = make_registry()
+    registry.record("network", 50.0, {})
+    for _ in range(5):
+        registry.record("network", 1000.0, {})  # a slow patch: estimate ~ 850ms
+    assert registry.costs()["network"] > 800
+    runs = []
+    for _ in range(20):
+        plan = registry.schedule(["network"], ["network"], budget_ms=300)
+        if plan.run:
+            runs.append(plan.run)
+            break
+        assert "exceeds 300ms budget" in plan.skipped["network"]
+    assert runs == [["network"]]
+    assert registry.costs()["network"] <= 300
+
+
+def test_cache_platforms_and_unknown_collectors():
+    registry = make_registry()
+    registry.record("system_info", 5.0, {"hostname": "desk"})
+    plan = registry.schedule(["system_info", "display", "nope"])
+    assert plan.cached["system_info"][0] == {"hostname": "desk"} and not plan.cached["system_info"][2]
+    assert plan.skipped == {"display": "not supported on Linux", "nope": "unknown collector"}
+    registry.record("cpu", 5.0, {"error": "boom"})
+    assert "cpu" in registry.schedule(["cpu"]).run  # no ttl, errors are never cached
+
+
+def test_budget_prefers_relevant_collectors_and_serves_stale_cache():
+    registry = make_registry()
+    registry.get("cpu").ttl = 0.001
+    registry.record("cpu", 100.0, {"total_usage": 5})
+    time.sleep(0.01)
+    plan = registry.schedule(["cpu", "network"], ["network"], budget_ms=120, workers=1)
+    assert plan.run == ["network"]
+    result, _, stale = plan.cached["cpu"]
+    assert result == {"total_usage": 5} and stale
+    assert plan.estimated_ms == 50.0
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing collector registry")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,128 @@
+"""
+Test the LLM completion cache (keying, LRU/TTL eviction, disk tier)
+
+Usage: python test_completion_cache.py   (or: python -m pytest test_completion_cache.py)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.llm.base import LLMProvider
+from pc_diagnostic.llm.completion_cache import CompletionCache
+
+
+class FakeProvider(LLMProvider):
+    model_id = "fake-model"
+
+    def complete(self, prompt, temperature=0.7, max_tokens=4000):
+        return {"content": prompt, "model": self.model_id, "finish_reason": "stop", "usage": {}, "metadata": {}}
+
+    def get_provider_name(self):
+        return "Fake"
+
+
+def telemetry(cpu=37.2, memory=61.0, hostname="desk-01"):
+    return {
+        "timestamp": time.time(),
+        "system_info": {"hostname": hostname},
+        "cpu": {"total_usage": cpu, "temperature": 58.0},
+        "memory": {"percentage": memory, "swap_percentage": 3.0},
+        "disk": [{"mountpoint": "/", "percentage": 71.4}],
+        "collector_status": {"cpu": "ok", "memory": "cached"},
+    }
+
+
+def result(content):
+    return {"content": content, "model": "fake-model", "finish_reason": "stop", "usage": {}, "metadata": {}}
+
+
+def test_key_ignores_noise_but_not_real_changes():
+    cache = CompletionCache()
+    provider = FakeProvider()
+    base = cache.key(provider, "My PC is slow!", telemetry(), temperature=0.7)
+    assert cache.key(provider, "  my pc is SLOW ", telemetry(cpu=38.9, memory=64.9), temperature=0.7) == base
+    assert cache.key(provider, "my pc is slow", telemetry(cpu=47.0), temperature=0.7) != base
+    assert cache.key(provider, "my pc is slow", telemetry(hostname="desk-02"), temperature=0.7) != base
+    assert cache.key(provider, "my wifi drops", telemetry(), temperature=0.7) != base
+    assert cache.key(provider, "my pc is slow", telemetry(), temperature=0.2) != base
+
+
+def test_lru_and_ttl_eviction():
+    cache = CompletionCache(max_entries=2, ttl=0.2)
+    cache.put("a", result("A"))
+    cache.put("b", result("B"))
+    assert cache.get("a")["content"] == "A"  # "a" is now most recently used
+    cache.put("c", result("C"))
+    assert cache.get("b") is None and cache.get("a")["cache"] == {"hit": True, "tier": "memory", "age_seconds": 0.0}
+    time.sleep(0.25)
+    assert cache.get("c") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (2, 2, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_tier_survives_a_new_process():
+    with tempfile.TemporaryDirectory() as disk_dir:
+        CompletionCache(disk_dir=disk_dir).put("k", result("from disk"))
+        restarted = CompletionCache(disk_dir=disk_dir)
+        hit = restarted.get("k")
+        assert hit["content"] == "from disk" and hit["cache"]["tier"] == "disk"
+        assert restarted.get("k")["cache"]["tier"] == "memory"
+        assert CompletionCache(disk_dir=disk_dir, ttl=-1).get("k") is None  # disabled
+        restarted.clear()
+        assert CompletionCache(disk_dir=disk_dir).get("k") is None
+
+
+def test_disabled_and_empty_results_are_not_cached():
+    cache = CompletionCache(max_entries=0)
+    cache.put("k", result("A"))
+    assert cache.get("k") is None and not cache.stats()["enabled"]
+    cache = CompletionCache()
+    cache.put("k", result(""))
+    assert cache.get("k") is None and cache.stats()["stores"] == 0
+
+
+
+def test_telemetry_without_machine_identity_is_not_cached():
+    cache = CompletionCache()
+    provider = FakeProvider()
+    anonymous = telemetry(hostname=None)
+    assert cache.key(provider, "my pc is slow", anonymous) is None
+    assert cache.key(provider, "my pc is slow", dict(anonymous, device_id="agent-7")) is not None
+    cache.put(None, result("A"))
+    assert cache.get(None) is None
+    stats = cache.stats()
+    assert (stats["stores"], stats["entries"], stats["misses"], stats["skipped"]) == (0, 0, 0, 1)
+
+
+def test_malformed_disk_entries_are_disk_errors():
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = CompletionCache(disk_dir=disk_dir)
+        contents = ["[1, 2]", '"text"', '{"stored_at": "now", "result": {}}', '{"stored_at": 1e18}',
+                    '{"stored_at": 1e18, "result": []}', '{"stored_at": 1e18, "result": {"content": "x"}}',
+                    "{not json"]
+        for number, content in enumerate(contents):
+            with open(os.path.join(disk_dir, f"k{number}.json"), "w", encoding="utf-8") as f:
+                f.write(content)
+            assert cache.get(f"k{number}") is None, content
+        stats = cache.stats()
+        assert (stats["disk_errors"], stats["misses"], stats["hits"]) == (len(contents), len(contents), 0)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing LLM completion cache")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
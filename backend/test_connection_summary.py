@@ -0,0 +1,111 @@
+"""
+Test the bounded-memory connection summary (Space-Saving heavy hitters, aggregation)
+
+Usage: python test_connection_summary.py   (or: python -m pytest test_connection_summary.py)
+"""
+
+import os
+import random
+import sys
+from collections import Counter, namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import psutil
+
+from pc_diagnostic.connection_summary import SpaceSaving, summarize_connections
+
+# Same fields as psutil's sconn
+Conn = namedtuple("Conn", "fd family type laddr raddr status pid")
+
+
+def conn(raddr=None, status=psutil.CONN_ESTABLISHED, pid=100, laddr=("10.0.0.2", 50000)):
+    return Conn(-1, 2, 1, laddr, raddr or (), status, pid)
+
+
+def test_exact_while_keys_fit():
+    counter = SpaceSaving(capacity=5)
+    for key in "abacabad":
+        counter.add(key)
+    assert counter.top(10) == [("a", 4, 0), ("b", 2, 0), ("c", 1, 0), ("d", 1, 0)]
+
+
+def test_heavy_hitter_bounds_on_a_skewed_stream():
+    rng = random.Random(7)
+    capacity = 20
+    # A few heavy endpoints buried in a long tail of one-off keys
+    stream = [f"heavy-{i}" for i in range(5) for _ in range(200 * (i + 1))]
+    stream += [f"tail-{i}" for i in range(5000)]
+    rng.shuffle(stream)
+    truth = Counter(stream)
+
+    counter = SpaceSaving(capacity)
+    for key in stream:
+        counter.add(key)
+    estimates = {key: (count, error) for key, count, error in counter.top(capacity)}
+    assert len(estimates) == capacity
+    for key, (count, error) in estimates.items():
+        # Never an under-estimate, and over by at most the recorded error
+        assert truth[key] <= count <= truth[key] + error, (key, truth[key], count, error)
+        assert error <= len(stream) // capacity
+    # Every key seen more than N / capacity times is guaranteed to be tracked
+    for key, true_count in truth.items():
+        if true_count > len(stream) / capacity:
+            assert key in estimates, key
+    assert [key for key, _, _ in counter.top(3)] == ["heavy-4", "heavy-3", "heavy-2"]
+
+
+def test_heap_stays_bounded():
+    counter = SpaceSaving(capacity=10)
+    for n in range(20000):
+        counter.add(n % 3 if n % 2 else f"key-{n}")
+    assert len(counter._heap) <= 4 * counter.capacity + 16
+    assert len(counter._counts) == 10
+    assert {key for key, _, _ in counter.top(3)} == {0, 1, 2}
+
+
+def test_summary_aggregates_sockets():
+    connections = [
+        conn(("93.184.216.34", 443), pid=100),
+        conn(("93.184.216.34", 443), pid=100, laddr=("10.0.0.2", 50001)),
+        conn(("93.184.216.34", 443), pid=200, status=psutil.CONN_TIME_WAIT),
+        conn(("2606:4700::1111", 443), pid=200),
+        conn(status=psutil.CONN_LISTEN, pid=300, laddr=("0.0.0.0", 8000)),
+        conn(status=psutil.CONN_LISTEN, pid=300, laddr=("::", 8000)),
+        conn(status=psutil.CONN_LISTEN, pid=None, laddr=("127.0.0.1", 22)),
+    ]
+    summary = summarize_connections(connections, top_n=5)
+    assert summary["total_connections"] == 7
+    assert summary["by_state"] == {psutil.CONN_ESTABLISHED: 3, psutil.CONN_LISTEN: 3, psutil.CONN_TIME_WAIT: 1}
+    assert [(p["pid"], p["sockets"]) for p in summary["top_processes"]] == [(100, 2), (200, 2), (300, 2)]
+    endpoints = {e["endpoint"]: e["connections"] for e in summary["top_remote_endpoints"]}
+    # Aggregated by remote host:port, whatever the local port
+    assert endpoints == {"93.184.216.34:443": 3, "[2606:4700::1111]:443": 1}
+    ports = [(entry["port"], entry["addresses"]) for entry in summary["listening_ports"]]
+    assert ports == [(22, ["127.0.0.1"]), (8000, ["0.0.0.0", "::"])]
+    assert summary["listening_truncated"] is False
+
+
+def test_summary_stays_bounded():
+    connections = [conn((f"198.51.100.{n % 250}", 1000 + n)) for n in range(3000)]
+    connections += [conn(status=psutil.CONN_LISTEN, laddr=("0.0.0.0", 9000 + n), pid=n) for n in range(80)]
+    summary = summarize_connections(connections, top_n=10, endpoint_capacity=50, max_listening=20)
+    assert summary["total_connections"] == 3080
+    assert len(summary["top_remote_endpoints"]) == 10
+    assert len(summary["listening_ports"]) == 20 and summary["listening_truncated"] is True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing connection summary")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,122 @@
+"""
+Test the shared CPU sampling engine (window sharing, result reuse, failures)
+
+Usage: python test_cpu_sampler.py   (or: python -m pytest test_cpu_sampler.py)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.cpu_sampler import CPUSampler
+
+
+class YieldingLock:
+    """Lock that lets other threads run right after every release, to expose ordering races"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, *args):
+        return self._lock.acquire(*args)
+
+    def release(self):
+        self._lock.release()
+        time.sleep(0.02)
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CountingSampler(CPUSampler):
+    """Sampler whose window is a short sleep returning a numbered result"""
+
+    def __init__(self, fail_first=False, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = YieldingLock()
+        self._done = threading.Condition(self._lock)
+        self.measurements = 0
+        self.fail_first = fail_first
+
+    def _measure(self):
+        self.measurements += 1
+        number = self.measurements
+        time.sleep(0.2)
+        if self.fail_first and number == 1:
+            raise RuntimeError("cpu_times failed")
+        return {"measurement": number}
+
+
+def run_concurrently(sampler, callers, max_age=None):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(sampler.sample(max_age=max_age))
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)  # the first caller starts the window, the rest join it
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_joined_callers_get_the_new_window_not_a_stale_one():
+    sampler = CountingSampler()
+    sampler._last_result, sampler._last_finished = {"measurement": "stale"}, 0.0
+    results, errors = run_concurrently(sampler, 6)
+    assert not errors and sampler.measurements == 1
+    assert results == [{"measurement": 1}] * 6
+
+
+def test_first_use_shares_one_window():
+    sampler = CountingSampler()
+    results, _ = run_concurrently(sampler, 6, max_age=0)
+    assert sampler.measurements == 1 and results == [{"measurement": 1}] * 6
+
+
+def test_recent_result_is_reused():
+    sampler = CountingSampler(max_age=5.0)
+    first = sampler.sample()
+    assert sampler.sample() is first and sampler.measurements == 1
+    assert sampler.sample(max_age=0)["measurement"] == 2
+
+
+def test_failed_window_reaches_its_caller_and_joiners_remeasure():
+    sampler = CountingSampler(fail_first=True)
+    results, errors = run_concurrently(sampler, 4)
+    assert errors == ["cpu_times failed"]
+    assert sampler.measurements == 2 and results == [{"measurement": 2}] * 3
+
+
+def test_real_window_statistics():
+    result = CPUSampler(window=0.1, ticks=2).sample()
+    assert len(result["usage_per_core"]) == result["total_cores"]
+    assert 0.0 <= result["total_usage"] <= 100.0
+    assert result["window_stats"]["samples"] == 2
+    assert result["window_stats"]["min"] <= result["window_stats"]["p95"] <= result["window_stats"]["max"]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing shared CPU sampler")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
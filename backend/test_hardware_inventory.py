@@ -0,0 +1,193 @@
+"""
+Test the hardware inventory cache against a fake WMI connection
+
+Runs without Windows/WMI: the fake connection records every query so we can
+check that static inventory is loaded once and only volatile fields are
+re-queried per request.
+
+Usage: python test_hardware_inventory.py   (or: python -m pytest test_hardware_inventory.py)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.hardware_inventory import INVENTORY_CLASSES, HardwareInventory
+
+
+class FakeWMIObject:
+    def __init__(self, **props):
+        self.__dict__.update(props)
+
+
+class FakeWMI:
+    """Minimal stand-in for wmi.WMI(): Win32_* attributes are callable queries"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    def __getattr__(self, wmi_class):
+        if not wmi_class.startswith("Win32_"):
+            raise AttributeError(wmi_class)
+
+        def query(fields=None):
+            self.queries.append((wmi_class, tuple(fields) if fields else None))
+            return [FakeWMIObject(**row) for row in self.tables.get(wmi_class, [])]
+        return query
+
+
+def make_wmi():
+    return FakeWMI({
+        "Win32_VideoController": [{
+            "DeviceID": "VideoController1", "Name": "Fake GPU 9000", "AdapterRAM": 8589934592,
+            "DriverVersion": "31.0.15", "DriverDate": "20240101", "Status": "OK",
+            "CurrentRefreshRate": 144, "CurrentHorizontalResolution": 2560, "CurrentVerticalResolution": 1440,
+        }],
+        "Win32_DiskDrive": [{
+            "DeviceID": r"\\.\PHYSICALDRIVE0", "Model": "Fake SSD", "Size": "512110190592",
+            "InterfaceType": "SCSI", "MediaType": "Fixed hard disk media", "Status": "OK",
+        }],
+        "Win32_USBControllerDevice": [{"Dependent": "USB\\VID_046D", "Antecedent": "PCI\\VEN_8086"}],
+    })
+
+
+def test_static_fields_cached_and_dynamic_requeried():
+    conn = make_wmi()
+    inventory = HardwareInventory(lambda: conn, ttl=3600)
+
+    first = inventory.rows("graphics_cards")
+    second = inventory.rows("graphics_cards")
+
+    assert first == second
+    assert first[0]["name"] == "Fake GPU 9000"
+    assert first[0]["current_refresh_rate"] == 144
+    full_queries = [q for q in conn.queries if q == ("Win32_VideoController", None)]
+    dynamic_queries = [q for q in conn.queries if q[0] == "Win32_VideoController" and q[1]]
+    assert len(full_queries) == 1, conn.queries
+    assert len(dynamic_queries) == 2, conn.queries
+    assert "Name" not in dynamic_queries[0][1]
+
+
+def test_volatile_change_is_visible():
+    conn = make_wmi()
+    inventory = HardwareInventory(lambda: conn, ttl=3600)
+    assert inventory.rows("disk_drives")[0]["status"] == "OK"
+
+    conn.tables["Win32_DiskDrive"][0]["Status"] = "Pred Fail"
+    conn.tables["Win32_DiskDrive"][0]["Model"] = "Changed Model"
+    drive = inventory.rows("disk_drives")[0]
+    assert drive["status"] == "Pred Fail"
+    assert drive["model"] == "Fake SSD"  # static field still served from cache
+
+
+def test_static_only_class_served_from_cache():
+    conn = make_wmi()
+    inventory = HardwareInventory(lambda: conn, ttl=3600)
+    inventory.rows("usb_devices")
+    inventory.rows("usb_devices")
+    assert conn.queries.count(("Win32_USBControllerDevice", None)) == 1
+
+
+def test_hotplugged_device_triggers_refresh():
+    conn = make_wmi()
+    inventory = HardwareInventory(lambda: conn, ttl=3600)
+    inventory.rows("disk_drives")
+
+    conn.tables["Win32_DiskDrive"].append({
+        "DeviceID": r"\\.\PHYSICALDRIVE1", "Model": "USB Stick", "Size": "32000000000",
+        "InterfaceType": "USB", "MediaType": "Removable Media", "Status": "OK",
+    })
+    drives = inventory.rows("disk_drives")
+    assert len(drives) == 2  # new drive reported with its volatile fields right away
+
+    deadline = time.time() + 2
+    while time.time() < deadline and len([r for r in inventory.rows("disk_drives") if "model" in r]) < 2:
+        time.sleep(0.05)
+    assert {r.get("model") for r in inventory.rows("disk_drives")} == {"Fake SSD", "USB Stick"}
+
+
+def test_expired_inventory_refreshes_in_background():
+    conn = make_wmi()
+    inventory = HardwareInventory(lambda: conn, ttl=0.05)
+    inventory.rows("usb_devices")
+    time.sleep(0.1)
+
+    thread = inventory.refresh_async(["usb_devices"])
+    thread.join(timeout=2)
+    assert conn.queries.count(("Win32_USBControllerDevice", None)) == 2
+    assert inventory.age("usb_devices") < 1
+
+
+def test_usb_topology_expires_on_its_own_ttl():
+    assert INVENTORY_CLASSES["usb_devices"]["ttl"] <= 60
+    conn = make_wmi()
+    classes = {"usb_devices": dict(INVENTORY_CLASSES["usb_devices"], ttl=0.05),
+               "disk_drives": INVENTORY_CLASSES["disk_drives"]}
+    inventory = HardwareInventory(lambda: conn, ttl=3600, classes=classes)
+    inventory.rows("usb_devices")
+    inventory.rows("disk_drives")
+    time.sleep(0.1)
+
+    conn.tables["Win32_USBControllerDevice"].append({"Dependent": "USB\\VID_1234", "Antecedent": "PCI\\VEN_8086"})
+    inventory.rows("usb_devices")  # expired: served once more while the reload runs
+    inventory.rows("disk_drives")  # the inventory-wide TTL still applies to drives
+    deadline = time.time() + 2
+    while time.time() < deadline and len(inventory.rows("usb_devices")) < 2:
+        time.sleep(0.05)
+    assert len(inventory.rows("usb_devices")) == 2
+    assert conn.queries.count(("Win32_DiskDrive", None)) == 1
+
+
+class SlowWMI(FakeWMI):
+    """Full (static) queries block until `release` is set"""
+
+    def __init__(self, tables, release):
+        super().__init__(tables)
+        self.release = release
+
+    def __getattr__(self, wmi_class):
+        query = super().__getattr__(wmi_class)
+
+        def run(fields=None):
+            if fields is None:
+                self.release.wait(2)
+            return query(fields)
+        return run
+
+
+def test_first_request_waits_for_warm_up():
+    release = threading.Event()
+    conn = SlowWMI(make_wmi().tables, release)
+    inventory = HardwareInventory(lambda: conn, ttl=3600)
+    warm_up = inventory.refresh_async()
+    threading.Timer(0.1, release.set).start()
+    cards = inventory.rows("graphics_cards")
+    warm_up.join(2)
+    assert cards[0]["name"] == "Fake GPU 9000"
+    assert conn.queries.count(("Win32_VideoController", None)) == 1, conn.queries
+
+
+def test_no_connection():
+    inventory = HardwareInventory(lambda: None)
+    assert inventory.rows("graphics_cards") == []
+    assert inventory.refresh() == {}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing hardware inventory cache (fake WMI)")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
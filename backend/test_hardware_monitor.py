@@ -0,0 +1,180 @@
+"""
+Test HardwareMonitor's collector orchestration (deadlines, in-flight runs)
+the process rankings section and section selection/projection
+
+Usage: python test_hardware_monitor.py   (or: python -m pytest test_hardware_monitor.py)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.hardware_monitor import COLLECTOR_POOL_SIZE, HardwareMonitor, get_collector_pool, project_fields
+
+monitor = HardwareMonitor()
+
+
+def occupy_pool(release):
+    """Block every collector pool worker until `release` is set"""
+    started = threading.Barrier(COLLECTOR_POOL_SIZE + 1)
+
+    def block():
+        started.wait()
+        release.wait()
+
+    for _ in range(COLLECTOR_POOL_SIZE):
+        get_collector_pool().submit(block)
+    started.wait()
+
+
+def test_hung_collector_is_not_resubmitted():
+    release = threading.Event()
+    calls = []
+
+    def hung():
+        calls.append(1)
+        release.wait()
+        return {"late": True}
+
+    try:
+        for _ in range(3):
+            results, status = monitor.run_collectors({"hung_test": hung}, {"hung_test": 0.1})
+            assert status == {"hung_test": "timeout"} and results["hung_test"]["timed_out"]
+        assert len(calls) == 1
+    finally:
+        release.set()
+    time.sleep(0.05)
+    results, status = monitor.run_collectors({"hung_test": hung}, {"hung_test": 1.0})
+    assert status == {"hung_test": "ok"} and len(calls) == 2
+
+
+def test_deadline_starts_when_the_collector_starts():
+    release = threading.Event()
+    occupy_pool(release)
+    threading.Timer(0.3, release.set).start()
+
+    def slow():
+        time.sleep(0.3)
+        return {"done": True}
+
+    results, status = monitor.run_collectors({"queued_test": slow}, {"queued_test": 0.5})
+    assert status == {"queued_test": "ok"} and results["queued_test"] == {"done": True}
+
+
+def test_collector_that_never_starts_is_cancelled():
+    release = threading.Event()
+    calls = []
+    occupy_pool(release)
+    try:
+        results, status = monitor.run_collectors({"starved_test": lambda: calls.append(1)}, {"starved_test": 0.2})
+    finally:
+        release.set()
+    assert status == {"starved_test": "timeout"}
+    assert "did not start" in results["starved_test"]["error"]
+    time.sleep(0.1)
+    assert calls == [] and "starved_test" not in monitor._collector_runs
+
+
+def test_errors_are_reported_per_collector():
+    def broken():
+        raise RuntimeError("sensor gone")
+
+    results, status = monitor.run_collectors({"ok_test": lambda: 1, "broken_test": broken})
+    assert status == {"ok_test": "ok", "broken_test": "error"}
+    assert results["broken_test"] == {"error": "sensor gone"}
+
+
+def test_process_rankings_by_cpu_memory_and_io():
+    health = monitor.get_system_health("pc is slow", collectors=["process_rankings"])
+    assert health["collector_status"] == {"process_rankings": "ok"}
+    rankings = health["process_rankings"]
+    assert set(rankings) == {"by_cpu", "by_memory", "by_io", "tracked_processes"}
+    assert rankings["tracked_processes"] > 0 and rankings["by_memory"]
+    for ranking, key in (("by_cpu", "cpu_percent"), ("by_memory", "memory_percent"), ("by_io", "io_bytes_per_sec")):
+        values = [process[key] for process in rankings[ranking]]
+        assert values == sorted(values, reverse=True), ranking
+        assert len(values) <= 10
+
+
+def test_process_rankings_in_default_health_and_projection():
+    assert "process_rankings" in monitor.resolve_sections(["performance"])
+    health = monitor.get_system_health("pc is slow", fields=["process_rankings.by_memory"])
+    assert list(health["process_rankings"]) == ["by_memory"]
+    assert "processes" not in health
+
+
+def test_resolve_sections():
+    everything = monitor.resolve_sections(["display"])
+    assert set(HardwareMonitor.CORE_SECTIONS) <= everything and "display" in everything
+    assert "audio" not in everything
+    assert monitor.resolve_sections(["display"], collectors=["memory"]) == {"memory"}
+    # Fields add their top-level section; issue_specific.<name> selects that collector
+    assert monitor.resolve_sections(["general"], fields=["memory.percentage", "issue_specific.audio.devices"]) == {"memory", "audio"}
+    # "issue_specific" expands to the sections of the detected issue types
+    assert monitor.resolve_sections(["storage"], collectors=["cpu", "issue_specific"]) == {"cpu", "storage_detailed"}
+    assert monitor.resolve_sections(["general"], collectors=["issue_specific"]) == set()
+    # Metadata keys are accepted but collect nothing
+    assert monitor.resolve_sections(["general"], fields=["timestamp"]) == set()
+    try:
+        monitor.resolve_sections(["general"], collectors=["memory", "gpu_fans"])
+    except ValueError as e:
+        assert "gpu_fans" in str(e)
+    else:
+        raise AssertionError("unknown section accepted")
+
+
+def test_project_fields():
+    health = {
+        "timestamp": "2026-01-01T00:00:00", "issue_types_detected": ["storage"], "collector_status": {"disk": "ok"},
+        "memory": {"percentage": 40.0, "total": 16},
+        "disk": [{"device": "/dev/sda1", "percent": 80.0}, {"device": "/dev/sdb1", "percent": 10.0}],
+        "issue_specific": {"storage_detailed": {"smart": "ok", "raid": []}},
+    }
+    projected = project_fields(health, ["memory.percentage", "disk.1.device", "issue_specific.storage_detailed.smart",
+                                        "memory.missing", "network.total", "disk.9.device"])
+    assert projected == {
+        "timestamp": "2026-01-01T00:00:00", "issue_types_detected": ["storage"], "collector_status": {"disk": "ok"},
+        "memory": {"percentage": 40.0},
+        "disk": {"1": {"device": "/dev/sdb1"}},
+        "issue_specific": {"storage_detailed": {"smart": "ok"}},
+    }
+    # A whole section, and the input left as it was
+    assert project_fields(health, ["disk"])["disk"] is health["disk"]
+    assert health["memory"] == {"percentage": 40.0, "total": 16}
+
+
+class FixedAnomalies:
+    def findings(self):
+        return [{"kind": "sustained_saturation", "hardware_suspect": True, "issue_type": "storage"}]
+
+
+def test_issue_specific_selection_keeps_anomalies():
+    saved = monitor.anomaly_monitor
+    monitor.anomaly_monitor = FixedAnomalies()
+    try:
+        # "general" has no issue-specific collectors, but the findings still come along
+        health = monitor.get_system_health("it crashed", collectors=["memory", "issue_specific"])
+        assert set(health["collector_status"]) == {"memory"}
+        assert health["issue_specific"] == {"anomalies": FixedAnomalies().findings()}
+        assert "issue_specific" not in monitor.get_system_health("it crashed", collectors=["memory"])
+    finally:
+        monitor.anomaly_monitor = saved
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing hardware monitor")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,67 @@
+"""
+Test the precompiled keyword classifier and the issue-type keywords
+
+Usage: python test_keyword_classifier.py   (or: python -m pytest test_keyword_classifier.py)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.hardware_monitor import HardwareMonitor
+from pc_diagnostic.keyword_classifier import KeywordClassifier
+
+ISSUES = HardwareMonitor.ISSUE_CLASSIFIER
+
+
+def test_whole_words_plurals_and_phrases():
+    classifier = KeywordClassifier({
+        "memory": ["ram"],
+        "storage": ["disk", "hard drive"],
+        "hardware": ["won't turn on", "beep*"],
+    }, default="general")
+    assert classifier.classify("this program is slow") == ["general"]  # no "ram" inside "program"
+    assert classifier.classify("two disks and a hard-drive") == ["storage"]
+    assert classifier.scan("the hard  drive, the hard drives")["storage"] == ["hard drive"]
+    assert classifier.classify("It WON'T turn on, just beeping") == ["hardware"]
+
+
+def test_possessives_match():
+    assert ISSUES.classify("my disk's full") == ["storage"]
+    assert ISSUES.classify("my monitor's cable is loose") == ["display"]
+    assert ISSUES.classify("the drives' lights blink") == ["storage"]
+    assert ISSUES.classify("my monitor’s cable") == ["display"]
+    assert ISSUES.classify("'wifi' keeps dropping") == ["network"]
+
+
+def test_prefixes_do_not_overmatch():
+    assert ISSUES.classify("I work in a hangar") == ["general"]
+    assert ISSUES.classify("a cold lager") == ["general"]
+    assert ISSUES.classify("the game hangs and lags") == ["performance"]
+    assert ISSUES.classify("it keeps hanging, the whole pc hung") == ["performance"]
+    assert ISSUES.classify("laggy and freezing") == ["performance"]
+
+
+def test_weights_and_threshold():
+    classifier = KeywordClassifier({"hardware": [("screen", 0.5), "flicker*"]})
+    assert not classifier.matches("the screen", "hardware")
+    assert classifier.matches("screen, screen", "hardware")
+    assert classifier.classify("the screen flickers") == ["hardware"]
+    assert classifier.classify("nothing here") == []
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing keyword classifier")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,128 @@
+"""
+Test the Linux sysfs/procfs collectors against a fake /sys and /proc tree
+
+Usage: python test_linux_collectors.py   (or: python -m pytest test_linux_collectors.py)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic import linux_collectors
+
+
+def write(root, path, content):
+    full = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w") as f:
+        f.write(content)
+
+
+def make_tree():
+    root = tempfile.mkdtemp(prefix="fake-sysfs-")
+    # DRM: one card, one connected HDMI connector, one disconnected DP connector
+    write(root, "sys/class/drm/card0/device/vendor", "0x8086\n")
+    write(root, "sys/class/drm/card0/device/device", "0x9a49\n")
+    write(root, "sys/class/drm/card0/device/boot_vga", "1\n")
+    write(root, "sys/class/drm/card0-HDMI-A-1/status", "connected\n")
+    write(root, "sys/class/drm/card0-HDMI-A-1/enabled", "enabled\n")
+    write(root, "sys/class/drm/card0-HDMI-A-1/dpms", "On\n")
+    write(root, "sys/class/drm/card0-HDMI-A-1/modes", "2560x1440\n1920x1080\n1280x720\n")
+    write(root, "sys/class/drm/card0-DP-1/status", "disconnected\n")
+    write(root, "sys/class/drm/card0-DP-1/modes", "")
+    # ALSA
+    write(root, "proc/asound/cards",
+          " 0 [PCH            ]: HDA-Intel - HDA Intel PCH\n"
+          "                      HDA Intel PCH at 0xf7f10000 irq 32\n"
+          " 1 [Headset        ]: USB-Audio - USB Headset\n"
+          "                      Logitech USB Headset at usb-0000:00:14.0-2, full speed\n")
+    write(root, "proc/asound/card0/pcm0p/info", "")
+    write(root, "proc/asound/card0/pcm0c/info", "")
+    write(root, "proc/asound/card0/pcm3p/info", "")
+    write(root, "proc/asound/card1/pcm0p/info", "")
+    # Block devices: an SSD with one partition, a RAID array, an optical drive, a loop device
+    write(root, "sys/block/nvme0n1/size", "1000215216\n")
+    write(root, "sys/block/nvme0n1/queue/rotational", "0\n")
+    write(root, "sys/block/nvme0n1/queue/scheduler", "[none] mq-deadline\n")
+    write(root, "sys/block/nvme0n1/device/model", "Fake NVMe 512GB\n")
+    write(root, "sys/block/nvme0n1/stat", "100 0 800 50 200 0 1600 70 0 90 120\n")
+    write(root, "sys/block/nvme0n1/nvme0n1p1/partition", "1\n")
+    write(root, "sys/block/nvme0n1/nvme0n1p1/size", "1048576\n")
+    write(root, "sys/block/md0/size", "2000000\n")
+    write(root, "sys/block/sr0/size", "2097151\n")
+    write(root, "sys/block/sr0/queue/rotational", "1\n")
+    write(root, "sys/block/loop0/size", "0\n")
+    # USB: a root hub, a device and one of its interfaces
+    write(root, "sys/bus/usb/devices/usb1/busnum", "1\n")
+    write(root, "sys/bus/usb/devices/usb1/maxchild", "12\n")
+    write(root, "sys/bus/usb/devices/1-2/busnum", "1\n")
+    write(root, "sys/bus/usb/devices/1-2/devnum", "3\n")
+    write(root, "sys/bus/usb/devices/1-2/idVendor", "046d\n")
+    write(root, "sys/bus/usb/devices/1-2/product", "USB Headset\n")
+    write(root, "sys/bus/usb/devices/1-2/speed", "12\n")
+    write(root, "sys/bus/usb/devices/1-2:1.0/bInterfaceClass", "01\n")
+    return root
+
+
+def test_display_info():
+    data = linux_collectors.display_info(make_tree())
+    assert data["graphics_cards"][0]["vendor_id"] == "0x8086"
+    assert data["graphics_cards"][0]["boot_vga"] is True
+    monitors = {m["name"]: m for m in data["monitors"]}
+    assert monitors["HDMI-A-1"]["status"] == "connected"
+    assert monitors["HDMI-A-1"]["preferred_mode"] == "2560x1440"
+    assert monitors["HDMI-A-1"]["mode_count"] == 3
+    assert monitors["DP-1"]["status"] == "disconnected"
+
+
+def test_audio_info():
+    devices = linux_collectors.audio_info(make_tree())["devices"]
+    assert [d["id"] for d in devices] == ["PCH", "Headset"]
+    assert devices[0]["driver"] == "HDA-Intel"
+    assert devices[0]["playback_devices"] == 2 and devices[0]["capture_devices"] == 1
+    assert devices[1]["long_name"].startswith("Logitech USB Headset")
+
+
+def test_storage_info():
+    data = linux_collectors.storage_info(make_tree())
+    drives = {d["name"]: d for d in data["drives"]}
+    assert sorted(drives) == ["md0", "nvme0n1", "sr0"]  # loop0 skipped
+    assert drives["sr0"]["rotational"] is True and drives["md0"]["size"] == 2000000 * 512
+    drive = drives["nvme0n1"]
+    assert drive["media_type"] == "ssd" and drive["rotational"] is False
+    assert drive["scheduler"] == "none"
+    assert drive["size"] == 1000215216 * 512
+    assert drive["stat"]["write_ios"] == 200
+    assert data["partitions"] == [{"name": "nvme0n1p1", "disk": "nvme0n1", "size": 1048576 * 512}]
+
+
+def test_usb_info():
+    devices = {d["path"]: d for d in linux_collectors.usb_info(make_tree())["devices"]}
+    assert set(devices) == {"usb1", "1-2"}  # interface 1-2:1.0 skipped
+    assert devices["usb1"]["hub_ports"] == 12
+    assert devices["1-2"]["product"] == "USB Headset"
+    assert devices["1-2"]["device_number"] == 3
+
+
+def test_missing_tree():
+    root = tempfile.mkdtemp(prefix="empty-sysfs-")
+    assert linux_collectors.display_info(root) == {"graphics_cards": [], "monitors": []}
+    assert linux_collectors.storage_info(root) == {"drives": [], "partitions": []}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing Linux sysfs/procfs collectors (fake tree)")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,154 @@
+"""
+Test the process-wide LLM provider registry with fake providers
+
+Usage: python test_llm_registry.py   (or: python -m pytest test_llm_registry.py)
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.llm.base import LLMProvider
+from pc_diagnostic.llm.registry import ProviderRegistry
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, model):
+        self.model = model
+        self.closed = False
+
+    def complete(self, prompt, temperature=0.7, max_tokens=4000):
+        return {"content": prompt, "model": self.model, "finish_reason": "stop", "usage": {}, "metadata": {}}
+
+    def close(self):
+        self.closed = True
+
+    def get_provider_name(self):
+        return "Fake"
+
+
+def make_registry(builds, cooldown=30.0, failure_threshold=2):
+    def factory():
+        builds.append(os.environ["FAKE_MODEL"])
+        if os.environ["FAKE_MODEL"] == "broken":
+            raise ValueError("bad config")
+        return FakeProvider(os.environ["FAKE_MODEL"])
+
+    registry = ProviderRegistry(cooldown=cooldown, failure_threshold=failure_threshold)
+    registry.register("fake", factory, ["FAKE_MODEL"])
+    return registry
+
+
+def test_built_once_across_threads():
+    os.environ["FAKE_MODEL"] = "a"
+    builds = []
+    registry = make_registry(builds)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(registry.get("fake"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == ["a"]
+    assert all(provider is seen[0] for provider in seen)
+
+
+def test_rebuilds_only_when_config_changes():
+    os.environ["FAKE_MODEL"] = "a"
+    builds = []
+    registry = make_registry(builds)
+    first = registry.get("fake")
+    assert registry.get("fake") is first
+    os.environ["FAKE_MODEL"] = "b"
+    second = registry.get("fake")
+    assert second is not first and second.model == "b" and builds == ["a", "b"]
+    registry.reload()
+    assert registry.get("fake") is not second and builds == ["a", "b", "b"]
+
+
+def test_failed_build_cools_down_until_config_changes():
+    os.environ["FAKE_MODEL"] = "broken"
+    builds = []
+    registry = make_registry(builds)
+    for _ in range(3):
+        try:
+            registry.get("fake")
+            assert False, "expected failure"
+        except Exception:
+            pass
+    assert builds == ["broken"] and not registry.available("fake")
+    assert registry.status()["fake"]["last_error"] == "bad config"
+
+    os.environ["FAKE_MODEL"] = "fixed"
+    assert registry.available("fake")
+    assert registry.get("fake").model == "fixed"
+    assert registry.available("fake")
+
+
+def test_completion_failures_mark_unhealthy():
+    os.environ["FAKE_MODEL"] = "a"
+    registry = make_registry([], failure_threshold=2)
+    provider = registry.get("fake")
+    registry.report_failure(provider, RuntimeError("timeout"))
+    assert registry.available("fake")
+    registry.report_success(provider)
+    registry.report_failure(provider, RuntimeError("timeout"))
+    assert registry.available("fake")
+    registry.report_failure(provider, RuntimeError("timeout"))
+    assert not registry.available("fake")
+    assert registry.status()["fake"]["consecutive_failures"] == 2
+
+
+def test_replaced_providers_are_closed():
+    os.environ["FAKE_MODEL"] = "a"
+    builds = []
+    registry = make_registry(builds)
+    first = registry.get("fake")
+    assert registry.get("fake") is first and not first.closed
+    os.environ["FAKE_MODEL"] = "b"
+    second = registry.get("fake")
+    assert first.closed and not second.closed
+    registry.reload("other")
+    assert not second.closed
+    registry.reload("fake")
+    assert second.closed
+    third = registry.get("fake")
+    # A rebuild that fails still closes the instance it replaces
+    os.environ["FAKE_MODEL"] = "broken"
+    try:
+        registry.get("fake")
+    except ValueError:
+        pass
+    assert third.closed and registry.status()["fake"]["built"] is False
+
+
+def test_local_llama_close_releases_its_session():
+    from pc_diagnostic.llm.local_llama import LocalLlamaProvider
+
+    os.environ["FAKE_MODEL"] = "a"
+    registry = ProviderRegistry()
+    registry.register("local", LocalLlamaProvider, ["FAKE_MODEL"])
+    provider = registry.get("local")
+    closed = []
+    original_close = provider.session.close
+    provider.session.close = lambda: closed.append(True) or original_close()
+    registry.reload()
+    assert closed == [True]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing LLM provider registry")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,114 @@
+"""
+Test the counter rate engine (windows, re-priming, totals) with scripted counters
+
+Usage: python test_rate_engine.py   (or: python -m pytest test_rate_engine.py)
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic import rate_engine
+from pc_diagnostic.rate_engine import CounterRateEngine
+
+# Same fields as psutil's snetio
+NetIO = namedtuple("NetIO", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+
+
+class FakeCounters:
+    """psutil.net_io_counters stand-in: every read advances each NIC by its per-read traffic"""
+
+    def __init__(self, per_read):
+        self.per_read = per_read
+        self.reads = 0
+
+    def __call__(self, pernic=True):
+        self.reads += 1
+        return {
+            nic: NetIO(sent * self.reads, recv * self.reads, self.reads, self.reads, 0, 0, 0, 0)
+            for nic, (sent, recv) in self.per_read.items()
+        }
+
+
+def network(engine, counters):
+    saved = rate_engine.psutil.net_io_counters
+    rate_engine.psutil.net_io_counters = counters
+    try:
+        return engine.network()
+    finally:
+        rate_engine.psutil.net_io_counters = saved
+
+
+def test_loopback_is_listed_but_not_totalled():
+    engine = CounterRateEngine(prime_window=0.05, min_window=0.0)
+    counters = FakeCounters({"eth0": (1000, 2000), "lo": (10 ** 6, 10 ** 6), "Loopback Pseudo-Interface 1": (500, 500)})
+    result = network(engine, counters)
+    assert set(result["interfaces"]) == {"eth0", "lo", "Loopback Pseudo-Interface 1"}
+    eth0 = result["interfaces"]["eth0"]
+    assert result["total"]["bytes_sent_per_sec"] == eth0["bytes_sent_per_sec"]
+    assert result["total"]["bytes_recv_per_sec"] == eth0["bytes_recv_per_sec"]
+
+
+def test_stale_previous_sample_is_primed_again():
+    engine = CounterRateEngine(prime_window=0.05, min_window=0.0, max_window=60.0)
+    counters = FakeCounters({"eth0": (1000, 1000)})
+    first = network(engine, counters)
+    assert counters.reads == 2 and first["window_seconds"] < 1.0
+
+    # Nothing has polled for an hour: the old sample is dropped, not averaged over
+    engine._state["network"]["taken"] -= 3600
+    again = network(engine, counters)
+    assert counters.reads == 4 and again["window_seconds"] < 1.0
+
+    # A recent previous sample is still differenced directly (one read, no priming)
+    engine._state["network"]["taken"] -= 5
+    network(engine, counters)
+    assert counters.reads == 5
+
+
+def test_calls_within_min_window_reuse_rates():
+    engine = CounterRateEngine(prime_window=0.05, min_window=30.0)
+    counters = FakeCounters({"eth0": (1000, 1000)})
+    first = network(engine, counters)
+    assert network(engine, counters) is not None and counters.reads == 2
+    assert network(engine, counters)["total"] == first["total"]
+
+
+def test_disk_totals_skip_partitions():
+    DiskIO = namedtuple("DiskIO", "read_count write_count read_bytes write_bytes read_time write_time busy_time")
+    reads = []
+
+    def disk_counters(perdisk=True):
+        reads.append(1)
+        n = len(reads)
+        sample = DiskIO(10 * n, 10 * n, 4096 * n, 4096 * n, 20 * n, 20 * n, 5 * n)
+        return {"sda": sample, "sda1": sample, "nvme0n1": sample, "nvme0n1p1": sample}
+
+    engine = CounterRateEngine(prime_window=0.05, min_window=0.0)
+    saved = rate_engine.psutil.disk_io_counters
+    rate_engine.psutil.disk_io_counters = disk_counters
+    try:
+        result = engine.disk()
+    finally:
+        rate_engine.psutil.disk_io_counters = saved
+    assert set(result["disks"]) == {"sda", "sda1", "nvme0n1", "nvme0n1p1"}
+    assert result["total"]["read_iops"] == round(2 * result["disks"]["sda"]["read_iops"], 2)
+    assert result["total"]["avg_read_latency_ms"] == 2.0
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing counter rate engine")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
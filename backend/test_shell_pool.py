@@ -0,0 +1,125 @@
+"""
+Test the persistent shell session pool with bash sessions
+
+Usage: python test_shell_pool.py   (or: python -m pytest test_shell_pool.py)
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic import shell_pool
+from pc_diagnostic.shell_pool import SYSTEM_SHELL, ShellPool, check_output
+
+
+def test_output_and_returncode():
+    pool = ShellPool("bash", size=1)
+    result = pool.run("echo out; echo err >&2; exit 3")
+    assert result.returncode == 3
+    assert result.stdout == "out\n" and result.stderr == "err\n"
+    assert pool.run("printf 'no newline'").stdout == "no newline"
+    pool.close()
+
+
+def test_quoting_and_multiline():
+    pool = ShellPool("bash", size=1)
+    script = "x='single \"double\" $HOME'\nprintf '%s\\n' \"$x\" | tr a-z A-Z"
+    assert pool.run(script).stdout == 'SINGLE "DOUBLE" $HOME\n'
+    pool.close()
+
+
+def test_session_reused_without_leaking_state():
+    pool = ShellPool("bash", size=1)
+    first = pool.run("cd /; FOO=1; echo $$").stdout
+    second = pool.run("pwd; echo ${FOO:-unset}; echo $$").stdout.split()
+    assert second[0] != "/" and second[1] == "unset"
+    assert first.strip() == second[2]  # same warm bash process
+    assert pool.stats["spawned"] == 1 and pool.stats["reused"] == 1
+    pool.close()
+
+
+def test_timeout_kills_and_respawns():
+    pool = ShellPool("bash", size=1)
+    started = time.monotonic()
+    try:
+        pool.run("sleep 10", timeout=0.5)
+        assert False, "expected TimeoutExpired"
+    except subprocess.TimeoutExpired as e:
+        assert e.timeout == 0.5
+    assert time.monotonic() - started < 3
+    assert pool.run("echo alive").stdout == "alive\n"
+    assert pool.stats["timeouts"] == 1 and pool.stats["spawned"] == 2
+    pool.close()
+
+
+def test_crashed_session_recovers():
+    pool = ShellPool("bash", size=1)
+    result = pool.run("kill -9 $$")
+    assert result.returncode != 0
+    assert pool.run("echo recovered").stdout == "recovered\n"
+    pool.close()
+
+
+def test_concurrency_limit():
+    pool = ShellPool("bash", size=2)
+    pool.warm()
+    threads = [threading.Thread(target=pool.run, args=("sleep 0.3",)) for _ in range(4)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    assert 0.55 < elapsed < 2, elapsed  # two waves of two
+    assert pool.stats["spawned"] == 2
+    pool.close()
+
+
+def test_check_output_shim():
+    assert check_output("echo shim", shell="bash") == "shim\n"
+    try:
+        check_output("echo partial; false", shell="bash")
+        assert False, "expected CalledProcessError"
+    except subprocess.CalledProcessError as e:
+        assert e.returncode == 1 and e.output == "partial\n"
+
+
+def test_pool_is_opt_in_and_system_shell_never_pooled():
+    saved = os.environ.pop("SHELL_POOL_ENABLED", None)
+    try:
+        assert check_output("echo $((1 + 1))", shell="bash") == "2\n"
+        assert "bash" not in shell_pool._pools
+        os.environ["SHELL_POOL_ENABLED"] = "true"
+        assert check_output("echo pooled", shell="bash") == "pooled\n"
+        assert "bash" in shell_pool._pools
+        # Platform shell (here /bin/sh), like subprocess's shell=True
+        assert check_output("echo system", shell=SYSTEM_SHELL) == "system\n"
+        assert SYSTEM_SHELL not in shell_pool._pools
+    finally:
+        if saved is None:
+            os.environ.pop("SHELL_POOL_ENABLED", None)
+        else:
+            os.environ["SHELL_POOL_ENABLED"] = saved
+        pool = shell_pool._pools.pop("bash", None)
+        if pool is not None:
+            pool.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing persistent shell session pool (bash)")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
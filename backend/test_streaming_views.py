@@ -0,0 +1,136 @@
+"""
+Test the server-sent events diagnosis endpoint (/api/predict/stream/)
+
+Runs the view through Django's test client with a fake streaming provider,
+so no LLM server is needed.
+
+Usage: python test_streaming_views.py   (or: python -m pytest test_streaming_views.py)
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pc_diagnostic.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.test import Client
+
+from pc_diagnostic import views
+from pc_diagnostic.llm.base import LLMProvider
+
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+TELEMETRY = {
+    "system_info": {"hostname": "stream-test", "platform": "Linux"},
+    "cpu": {"total_usage": 12.0},
+    "memory": {"percentage": 40.0},
+}
+
+
+class FakeStreamProvider(LLMProvider):
+    """Yields fixed chunks; fail_after makes the stream (or the connection) break"""
+
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+
+    def complete(self, prompt, temperature=0.7, max_tokens=4000):
+        raise NotImplementedError
+
+    def complete_stream(self, prompt, temperature=0.7, max_tokens=4000):
+        for number, content in enumerate(self.chunks):
+            if number == self.fail_after:
+                raise ConnectionError("connection reset")
+            last = number == len(self.chunks) - 1
+            yield {"content": content, "finish_reason": "stop" if last else None,
+                   "model": "fake-model" if last else None, "usage": {"total_tokens": 3} if last else None}
+        if self.fail_after == len(self.chunks):
+            raise ConnectionError("connection reset")
+
+    def get_provider_name(self):
+        return "Fake Stream"
+
+
+def stream(provider, method="post", **params):
+    """Run one request with `provider` answering; returns (response, [(event, data), ...])"""
+    saved = views.get_llm_provider
+    views.get_llm_provider = lambda: provider
+    try:
+        client = Client()
+        if method == "get":
+            response = client.get("/api/predict/stream/", params, HTTP_ACCEPT="text/event-stream")
+        else:
+            response = client.post("/api/predict/stream/", json.dumps(params), content_type="application/json",
+                                   HTTP_ACCEPT="text/event-stream")
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+    finally:
+        views.get_llm_provider = saved
+    events = []
+    for block in body.decode("utf-8").split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return response, events
+
+
+def test_meta_tokens_done():
+    response, events = stream(FakeStreamProvider(["The CPU ", "is fine."]), input_text="pc is slow",
+                              telemetry_data=TELEMETRY, use_cache=False)
+    assert response.status_code == 200 and response["Content-Type"] == "text/event-stream"
+    assert [event for event, _ in events] == ["meta", "token", "token", "done"]
+    assert events[0][1]["ai_provider"] == "Fake Stream" and events[0][1]["cache"] == {"hit": False}
+    assert "".join(data["content"] for event, data in events if event == "token") == "The CPU is fine."
+    assert events[-1][1]["finish_reason"] == "stop" and events[-1][1]["model"] == "fake-model"
+
+
+def test_get_with_json_telemetry_parameter():
+    _, events = stream(FakeStreamProvider(["ok"]), method="get", input_text="pc is slow",
+                       telemetry_data=json.dumps(TELEMETRY), use_cache="false")
+    assert [event for event, _ in events] == ["meta", "token", "done"]
+    assert events[0][1]["telemetry_summary"]["cpu_usage"] == 12.0
+
+
+def test_invalid_telemetry_is_rejected_before_streaming():
+    for method, value in (("get", "abc"), ("get", "[1, 2]"), ("post", [1, 2]), ("post", "abc")):
+        response, _ = stream(FakeStreamProvider(["ok"]), method=method, input_text="x", telemetry_data=value)
+        assert response.status_code == 400, (method, value, response.status_code)
+        assert not response.streaming
+    response, _ = stream(FakeStreamProvider(["ok"]), input_text="")
+    assert response.status_code == 400
+
+
+def test_provider_down_falls_back_to_offline_mode():
+    _, events = stream(FakeStreamProvider(["never sent"], fail_after=0), input_text="pc is slow",
+                       telemetry_data=TELEMETRY, use_cache=False)
+    assert [event for event, _ in events] == ["meta", "token", "done"]
+    assert events[0][1]["ai_provider"] == "Offline Mock Engine"
+    assert events[-1][1]["finish_reason"] == "offline_mode"
+
+
+def test_mid_stream_failure_ends_with_an_error_event():
+    _, events = stream(FakeStreamProvider(["The CPU ", "is"], fail_after=1), input_text="pc is slow",
+                       telemetry_data=TELEMETRY, use_cache=False)
+    assert [event for event, _ in events] == ["meta", "token", "error"]
+    assert events[-1][1] == {"error": "connection reset"}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing streaming diagnosis endpoint")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,101 @@
+"""
+Test the telemetry CBOR codec and request body decompression
+
+Exercises the built-in codec; when cbor2 is installed the output is also
+checked against it.
+
+Usage: python test_telemetry_codec.py   (or: python -m pytest test_telemetry_codec.py)
+"""
+
+import gzip
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic import telemetry_codec
+from pc_diagnostic.telemetry_codec import CBOR2_AVAILABLE, decode_cbor, decompress, encode_cbor
+
+
+def builtin(func, *args, **kwargs):
+    """Run a codec function with the built-in implementation even if cbor2 is installed"""
+    saved = telemetry_codec.CBOR2_AVAILABLE
+    telemetry_codec.CBOR2_AVAILABLE = False
+    try:
+        return func(*args, **kwargs)
+    finally:
+        telemetry_codec.CBOR2_AVAILABLE = saved
+
+
+def make_telemetry():
+    return {
+        "cpu": {"total_usage": 12.5, "usage_per_core": [0.0, 3.25, 100.0], "temperature": None},
+        "processes": [{"name": "chrome.exe", "status": "running", "cpu_percent": 1.5 * i} for i in range(40)],
+        "disk": [{"mountpoint": "/", "total": 512 * 1024 ** 3, "file_system": "ext4"}],
+        "flags": [True, False],
+        "serial": b"\x00\x01serial",
+        "offsets": [-1, -300, -2 ** 40],
+    }
+
+
+def test_roundtrip_with_string_references():
+    telemetry = make_telemetry()
+    with_refs = builtin(encode_cbor, telemetry)
+    without_refs = builtin(encode_cbor, telemetry, string_refs=False)
+    assert builtin(decode_cbor, with_refs) == telemetry
+    assert builtin(decode_cbor, without_refs) == telemetry
+    assert len(with_refs) < len(without_refs)
+
+
+def test_bignums_keep_later_string_references_aligned():
+    payload = {"big": 2 ** 70, "negative": -2 ** 70 - 5,
+               "after": {"alpha_key": "alpha_key", "beta_key": "beta_key"}, "again": [2 ** 70, "beta_key"]}
+    assert builtin(decode_cbor, builtin(encode_cbor, payload)) == payload
+    if CBOR2_AVAILABLE:
+        import cbor2
+        assert builtin(encode_cbor, payload) == cbor2.dumps(payload, string_referencing=True)
+
+
+def test_floats_use_shortest_exact_width():
+    assert builtin(encode_cbor, 1.5, string_refs=False) == b"\xfa\x3f\xc0\x00\x00"
+    assert builtin(decode_cbor, builtin(encode_cbor, 0.1)) == 0.1
+    assert math.isnan(builtin(decode_cbor, builtin(encode_cbor, float("nan"))))
+
+
+def test_malformed_bodies_raise_value_error():
+    nested = b"\x81" * 100000 + b"\x00"
+    for data in (nested, b"\xa1\x61", b"\x01\x02", b"\xd8\x19\x05", b"\x1c", b"\xa1\x80\x01", b"\xc2\x01"):
+        try:
+            builtin(decode_cbor, data)
+            assert False, f"expected ValueError for {data[:8]!r}"
+        except ValueError:
+            pass
+
+
+def test_decompress_limits():
+    body = b'{"cpu": 1}' * 1000
+    assert decompress(gzip.compress(body), "gzip") == body
+    assert decompress(body, "identity") == body
+    for encoding, data in (("gzip", gzip.compress(body)), ("br", body)):
+        try:
+            decompress(data, encoding, limit=100)
+            assert False, f"expected ValueError for {encoding}"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing telemetry CBOR codec")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
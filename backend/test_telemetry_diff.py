@@ -0,0 +1,86 @@
+"""
+Test telemetry delta encoding (JSON-patch diffs and version tokens)
+
+Usage: python test_telemetry_diff.py   (or: python -m pytest test_telemetry_diff.py)
+"""
+
+import copy
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.telemetry_diff import TelemetryVersionCache, diff
+
+
+def apply_patch(document, ops):
+    """Minimal RFC 6902 add/remove/replace, as a dashboard client would apply it"""
+    document = copy.deepcopy(document)
+    for op in ops:
+        if op["path"] == "":
+            document = op["value"]
+            continue
+        *parents, last = [p.replace("~1", "/").replace("~0", "~") for p in op["path"].split("/")[1:]]
+        target = document
+        for part in parents:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        if isinstance(target, list):
+            index = int(last)
+            if op["op"] == "remove":
+                del target[index]
+            elif op["op"] == "add" and index == len(target):
+                target.append(op["value"])
+            else:
+                target[index] = op["value"]
+        elif op["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = op["value"]
+    return document
+
+
+def test_patch_turns_old_into_new():
+    old = {"cpu": {"total_usage": 10.0, "per_core": [1, 2, 3]}, "disk": [{"mountpoint": "/"}], "a/b": 1}
+    new = {"cpu": {"total_usage": 12.5, "per_core": [1, 5]}, "disk": [{"mountpoint": "/"}, {"mountpoint": "/home"}],
+           "a/b": 2, "memory": {"percentage": 40}}
+    ops = diff(old, new)
+    assert apply_patch(old, ops) == new
+    assert not any(op["path"].startswith("/disk/0") for op in ops)
+    assert diff(new, copy.deepcopy(new)) == []
+
+
+def test_tokens_do_not_match_across_restarts():
+    first = TelemetryVersionCache()
+    version = first.publish("general", {"cpu": 1})
+    restarted = TelemetryVersionCache()
+    restarted.publish("general", {"cpu": 2})
+    assert restarted.get(version, "general") is None
+    assert first.get(version, "general") == {"cpu": 1}
+    assert first.get(version, "display") is None
+
+
+def test_busy_scope_does_not_evict_other_scopes():
+    cache = TelemetryVersionCache(versions_per_scope=2, max_scopes=4)
+    quiet = cache.publish("display", {"n": 0})
+    busy = [cache.publish("general", {"n": i}) for i in range(50)]
+    assert cache.get(quiet, "display") == {"n": 0}
+    assert cache.get(busy[-1], "general") == {"n": 49} and cache.get(busy[-3], "general") is None
+    for scope in ("a", "b", "c", "d"):
+        cache.publish(scope, {})
+    assert cache.get(quiet, "display") is None
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing telemetry delta encoding")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
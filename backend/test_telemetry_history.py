@@ -0,0 +1,100 @@
+"""
+Test the mmap-backed telemetry history store (tiers, peaks, trends, locking)
+
+Usage: python test_telemetry_history.py   (or: python -m pytest test_telemetry_history.py)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic import telemetry_history
+from pc_diagnostic.telemetry_history import HistoryStoreLocked, TelemetryHistoryStore
+
+
+def fill(store, start, seconds, step=5, spike_at=None):
+    """Record cpu_total=10 every `step` seconds, with one 100% sample at `spike_at`"""
+    for offset in range(0, seconds, step):
+        timestamp = start + offset
+        value = 100.0 if spike_at is not None and offset == spike_at else 10.0
+        store.record({"cpu_total": value, "memory_percent": 50.0}, timestamp)
+
+
+def test_raw_query_roundtrip_and_reopen():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TelemetryHistoryStore(directory, raw_interval=5.0)
+        fill(store, 1000.0, 60)
+        result = store.query(["cpu_total"], 1000.0, 1055.0, tier="raw")
+        assert result["points"] == 12 and result["series"]["cpu_total"] == [10.0] * 12
+        store.close()
+        reopened = TelemetryHistoryStore(directory, raw_interval=5.0)
+        assert reopened.query(["memory_percent"], 1000.0, 1055.0, tier="raw")["points"] == 12
+        reopened.close()
+
+
+def test_downsampled_tiers_keep_peaks():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TelemetryHistoryStore(directory, raw_interval=5.0)
+        fill(store, 3600.0 * 10, 7200, spike_at=1800)
+        minute = store.query(["cpu_total", "cpu_total.max"], 3600.0 * 10, 3600.0 * 12, tier="1m")
+        assert max(minute["series"]["cpu_total"]) == 17.5  # averaged away...
+        assert max(minute["series"]["cpu_total.max"]) == 100.0  # ...but kept in the max column
+        store.close()
+
+
+def test_summarize_reports_the_true_peak():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TelemetryHistoryStore(directory, raw_interval=5.0)
+        now = time.time()
+        fill(store, now - 7200, 7200, spike_at=3600)
+        for seconds in (3600 * 2, 86400):
+            summary = store.summarize("cpu_total", seconds, now=now)
+            assert summary["max"] == 100.0, (seconds, summary)
+            assert 10.0 <= summary["avg"] < 11.0
+        store.close()
+
+
+def test_trends_are_cached_between_requests():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TelemetryHistoryStore(directory, raw_interval=5.0)
+        now = time.time()
+        fill(store, now - 600, 480)
+        first = store.trends()
+        assert first["cpu_total"]["last_hour"]["avg"] == 10.0
+        # Spike early enough that its minute bucket is complete (the open one isn't queryable yet)
+        fill(store, now - 120, 120, spike_at=0)
+        assert store.trends() is first
+        store._trends_cache = (time.monotonic() - telemetry_history.TRENDS_TTL, *store._trends_cache[1:])
+        assert store.trends()["cpu_total"]["last_hour"]["max"] == 100.0
+        store.close()
+
+
+def test_second_writer_is_refused():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TelemetryHistoryStore(directory)
+        try:
+            TelemetryHistoryStore(directory)
+            assert False, "expected HistoryStoreLocked"
+        except HistoryStoreLocked:
+            pass
+        store.close()
+        TelemetryHistoryStore(directory).close()  # free again once closed
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing telemetry history store")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,157 @@
+"""
+Test remote telemetry ingestion (agent auth, batch validation, pruning, device list)
+
+Uses a throwaway in-memory test database; the agent round trip pushes a
+real sample over HTTP to a local server thread.
+
+Usage: python test_telemetry_ingest.py   (or: python -m pytest test_telemetry_ingest.py)
+"""
+
+import gzip
+import json
+import os
+import sys
+import threading
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pc_diagnostic.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test import Client
+
+from ai_diagnostic import telemetry_views
+from ai_diagnostic.models import Device, TelemetrySample
+from pc_diagnostic.telemetry_codec import CBOR_MEDIA_TYPE, encode_cbor
+
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver", "127.0.0.1"]
+connection.creation.create_test_db(verbosity=0)
+
+TOKEN = "test-ingest-token"
+
+
+def with_env(**env):
+    """Set (or with None, unset) environment variables; returns the previous values"""
+    saved = {name: os.environ.get(name) for name in env}
+    for name, value in env.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    return saved
+
+
+def push(batch, token=TOKEN, cbor=False):
+    body = gzip.compress(encode_cbor(batch) if cbor else json.dumps(batch).encode("utf-8"))
+    headers = {"HTTP_CONTENT_ENCODING": "gzip"}
+    if token:
+        headers["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return Client().post("/api/telemetry/ingest/", body,
+                         content_type=CBOR_MEDIA_TYPE if cbor else "application/json", **headers)
+
+
+def devices(token=TOKEN):
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+    return Client().get("/api/telemetry/devices/", **headers)
+
+
+def batch(device_id="ws-1", samples=None):
+    if samples is None:
+        samples = [{"collected_at": 1730000000.0, "telemetry": {"cpu": {"total_usage": 5.0}}}]
+    return {"device_id": device_id, "hostname": "WS-1", "samples": samples}
+
+
+def test_token_is_required_for_ingest_and_device_list():
+    saved = with_env(TELEMETRY_INGEST_TOKEN=None, TELEMETRY_INGEST_ALLOW_OPEN=None)
+    try:
+        assert push(batch(), token=None).status_code == 403
+        assert devices(token=None).status_code == 403
+        with_env(TELEMETRY_INGEST_TOKEN=TOKEN)
+        assert push(batch(), token=None).status_code == 401
+        assert push(batch(), token="wrong").status_code == 401
+        assert devices(token=None).status_code == 401
+        assert devices().status_code == 200
+        with_env(TELEMETRY_INGEST_TOKEN=None, TELEMETRY_INGEST_ALLOW_OPEN="true")
+        assert push(batch("open-1"), token=None).status_code == 200
+    finally:
+        with_env(**saved)
+
+
+def test_invalid_batches_are_rejected():
+    saved = with_env(TELEMETRY_INGEST_TOKEN=TOKEN)
+    try:
+        for bad in ([1, 2], {"samples": []}, batch("x" * 201), batch(samples=[1]),
+                    batch(samples=[{"collected_at": 1.0, "telemetry": "cpu"}]),
+                    batch(samples=[{"collected_at": 1e300, "telemetry": {}}]),
+                    batch(samples=[{"collected_at": True, "telemetry": {}}]),
+                    batch(samples=[{"telemetry": {}}])):
+            response = push(bad)
+            assert response.status_code == 400, (bad if len(str(bad)) < 80 else "long device_id", response.content)
+        assert push(batch("y" * 200)).status_code == 200
+        assert not Device.objects.filter(device_id="x" * 201).exists()
+    finally:
+        with_env(**saved)
+
+
+def test_pruning_keeps_the_newest_samples():
+    saved = with_env(TELEMETRY_INGEST_TOKEN=TOKEN)
+    saved_max = telemetry_views.MAX_SAMPLES_PER_DEVICE
+    telemetry_views.MAX_SAMPLES_PER_DEVICE = 3
+    try:
+        samples = [{"collected_at": 1730000000.0 + (n // 2), "telemetry": {"n": n}} for n in range(6)]
+        response = push(batch("prune-1", samples), cbor=True)
+        assert response.status_code == 200 and response.json()["accepted"] == 6
+        kept = TelemetrySample.objects.filter(device_id="prune-1")
+        assert kept.count() == 3  # samples sharing the cutoff timestamp are not all dropped
+        assert sorted(sample.data["n"] for sample in kept) == [3, 4, 5]
+        assert telemetry_views.latest_device_telemetry("prune-1")[0]["n"] in (4, 5)
+    finally:
+        telemetry_views.MAX_SAMPLES_PER_DEVICE = saved_max
+        with_env(**saved)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def test_agent_round_trip():
+    from telemetry_agent import TelemetryAgent
+
+    saved = with_env(TELEMETRY_INGEST_TOKEN=TOKEN)
+    server = make_server("127.0.0.1", 0, get_wsgi_application(), handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        agent = TelemetryAgent(f"http://127.0.0.1:{server.server_port}", "agent-1", batch_size=5, token=TOKEN)
+        agent.collect()
+        assert agent.flush() == 1 and not agent.buffer
+        telemetry, _ = telemetry_views.latest_device_telemetry("agent-1")
+        assert "cpu" in telemetry and "memory" in telemetry
+        listed = {device["device_id"]: device for device in devices().json()["devices"]}
+        assert listed["agent-1"]["sample_count"] == 1 and listed["agent-1"]["hostname"]
+    finally:
+        server.shutdown()
+        server.server_close()
+        with_env(**saved)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing telemetry ingestion")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,104 @@
+"""
+Test the token-budgeted telemetry reducer on synthetic telemetry
+
+Usage: python test_telemetry_reducer.py   (or: python -m pytest test_telemetry_reducer.py)
+"""
+
+import copy
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pc_diagnostic.telemetry_reducer import TelemetryReducer
+
+RELEVANCE = {
+    "cpu": {"*": 1.0},
+    "processes": {"*": 0.5, "performance": 1.0},
+    "network": {"*": 0.5, "network": 1.0},
+    "display": {"display": 1.0},
+}
+
+
+def make_telemetry():
+    return {
+        "timestamp": "2026-01-01T00:00:00",
+        "issue_types_detected": ["display"],
+        "user_description": "screen flickers",
+        "cpu": {"total_usage": 12.5, "usage_per_core": [float(i % 7) for i in range(64)]},
+        "processes": [{"pid": i, "name": f"proc{i}", "cpu_percent": 0.1 * i} for i in range(300)],
+        "network": {"interfaces": {f"eth{i}": {"bytes_sent": i * 1000, "errors": 0} for i in range(40)}},
+        "issue_specific": {
+            "display": {"monitors": [{"name": "HDMI-A-1", "status": "connected", "notes": "x" * 2000}]},
+        },
+    }
+
+
+def test_sizes_match_json():
+    reducer = TelemetryReducer(RELEVANCE)
+    telemetry = make_telemetry()
+    assert reducer.size(telemetry) == len(json.dumps(telemetry, indent=2))
+    assert reducer.size(telemetry["cpu"], depth=1) - reducer.size(telemetry["cpu"]) == \
+        json.dumps(telemetry["cpu"], indent=2).count("\n") * 2
+
+
+def test_fits_budget_and_keeps_input():
+    reducer = TelemetryReducer(RELEVANCE)
+    telemetry = make_telemetry()
+    original = copy.deepcopy(telemetry)
+    reduced, report = reducer.reduce(telemetry, budget_tokens=1000)
+    assert telemetry == original
+    assert report["fits"] and report["tokens_after"] <= 1000
+    assert len(json.dumps(reduced, indent=2)) / 4 <= 1000
+    assert reduced["user_description"] == "screen flickers"
+
+
+def test_least_relevant_sections_go_first():
+    reducer = TelemetryReducer(RELEVANCE)
+    reduced, report = reducer.reduce(make_telemetry(), budget_tokens=700)
+    # Display issue: processes/network are reduced before the display section
+    assert report["steps"][0].split(":")[1] in ("processes", "network")
+    assert reduced["issue_specific"]["display"]["monitors"][0]["status"] == "connected"
+    assert isinstance(reduced["cpu"]["usage_per_core"], (list, dict))
+
+
+def test_aggregates_numeric_arrays():
+    reducer = TelemetryReducer(RELEVANCE)
+    telemetry = {"cpu": {"usage_per_core": [1.0, 3.0] * 50}}
+    reduced, _ = reducer.reduce(telemetry, budget_tokens=80)
+    assert reduced["cpu"]["usage_per_core"] == {"count": 100, "min": 1.0, "max": 3.0, "mean": 2.0}
+
+
+def test_under_budget_is_untouched():
+    reducer = TelemetryReducer(RELEVANCE)
+    telemetry = make_telemetry()
+    reduced, report = reducer.reduce(telemetry, budget_tokens=10 ** 6)
+    assert reduced == telemetry and report["steps"] == []
+
+
+def test_shared_reducer_is_safe_across_threads():
+    reducer = TelemetryReducer(RELEVANCE)
+    jobs = [(make_telemetry(), budget) for budget in (300, 500, 700, 1000) * 8]
+    expected = [TelemetryReducer(RELEVANCE).reduce(telemetry, budget) for telemetry, budget in jobs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda job: reducer.reduce(*job), jobs))
+    assert results == expected
+    assert all(report["fits"] for _, report in results)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔍 Testing token-budgeted telemetry reducer")
+    print("=" * 60)
+    failed = 0
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            try:
+                func()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)